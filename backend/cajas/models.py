@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import connection, models, transaction
 
 class Caja(models.Model):
     CONTRATO_CHOICES = [
@@ -22,6 +22,48 @@ class Caja(models.Model):
     def __str__(self):
         return f"{self.codigo} - {self.get_sucursal_display()} ({self.tipo_contrato})"
     
+    def descontar(self, cantidad=1):
+        """
+        Descuenta stock con un único UPDATE atómico (nunca queda negativo).
+        
+        Retorna el stock resultante, o None si no alcanzaba. El valor viene
+        de la propia actualización, así que dos descuentos concurrentes
+        nunca ven el mismo stock. Emite cajas.signals.stock_descontado.
+        """
+        from .signals import stock_descontado
+        
+        tabla = connection.ops.quote_name(self._meta.db_table)
+        
+        if connection.vendor in ('postgresql', 'sqlite'):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {tabla} SET cantidad_disponible = cantidad_disponible - %s '
+                    f'WHERE id = %s AND cantidad_disponible >= %s '
+                    f'RETURNING cantidad_disponible',
+                    [cantidad, self.pk, cantidad]
+                )
+                fila = cursor.fetchone()
+            restante = fila[0] if fila else None
+        else:
+            # Sin UPDATE ... RETURNING (MySQL): bloquear la fila y luego actualizar
+            with transaction.atomic():
+                actual = Caja.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'cantidad_disponible', flat=True
+                ).first()
+                restante = None
+                if actual is not None and actual >= cantidad:
+                    restante = actual - cantidad
+                    Caja.objects.filter(pk=self.pk).update(cantidad_disponible=restante)
+        
+        if restante is None:
+            return None
+        
+        self.cantidad_disponible = restante
+        stock_descontado.send(
+            sender=Caja, caja=self, anterior=restante + cantidad, restante=restante
+        )
+        return restante
+    
     class Meta:
         verbose_name = 'Caja'
         verbose_name_plural = 'Cajas'
\ No newline at end of file
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# Enviada por Caja.descontar() tras descontar stock con éxito.
+# Argumentos: caja, anterior, restante
+stock_descontado = Signal()
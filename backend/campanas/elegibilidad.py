@@ -0,0 +1,240 @@
+"""
+Índice de elegibilidad de campañas compilado en memoria.
+
+Las campañas se compilan en un dict con clave (sucursal, tipo_contrato, área)
+cuyo valor es la lista de campañas que aplican, de la más reciente a la más
+antigua. Verificar a un trabajador es entonces una búsqueda en el dict, sin
+consultas.
+
+Cada proceso mantiene su propio índice y lo reconstruye cuando cambia la
+versión guardada en la caché (se incrementa al guardar o eliminar una
+campaña, ver signals.py) o cuando pasa CAMPANAS_ELEGIBILIDAD_TTL.
+"""
+import threading
+import time
+from operator import attrgetter
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import CampanaEntrega, SUCURSAL_TO_SEDE
+
+
+CLAVE_VERSION = 'campanas:elegibilidad:version'
+
+# Comodín de área para campañas de tipo 'general'
+TODAS_LAS_AREAS = '*'
+
+SEDE_TO_SUCURSAL = {sede: sucursal for sucursal, sede in SUCURSAL_TO_SEDE.items()}
+
+
+def normalizar_sucursal(sede):
+    """
+    Código de sucursal de una sede de trabajador.
+    Acepta el código ('valparaiso_bif') o el nombre ('Valparaíso – Planta BIF').
+    Retorna None si no corresponde a ninguna sucursal.
+    """
+    if sede in SUCURSAL_TO_SEDE:
+        return sede
+    return SEDE_TO_SUCURSAL.get(sede)
+
+
+class ReglaCampana(NamedTuple):
+    pk: int
+    orden: int
+    activa: bool
+    fecha_inicio: object
+    fecha_fin: object
+
+    def vigente_en(self, dia):
+        return self.activa and self.fecha_inicio <= dia <= self.fecha_fin
+
+
+class IndiceElegibilidad:
+    """Campañas indexadas por (sucursal, tipo_contrato, área)"""
+
+    def __init__(self, version):
+        self.version = version
+        self.construido_en = time.monotonic()
+
+        reglas = {}
+        campanas = CampanaEntrega.objects.order_by('-fecha_creacion', '-pk').values_list(
+            'pk', 'sucursal', 'tipo_entrega', 'tipo_contrato', 'areas_seleccionadas',
+            'activa', 'fecha_inicio', 'fecha_fin'
+        )
+
+        for orden, (pk, sucursal, tipo_entrega, contratos, areas, activa, inicio, fin) in enumerate(campanas):
+            regla = ReglaCampana(pk, orden, activa, inicio, fin)
+            if tipo_entrega == 'general':
+                areas = [TODAS_LAS_AREAS]
+
+            for tipo_contrato in contratos or []:
+                for area in areas or []:
+                    reglas.setdefault((sucursal, tipo_contrato, area), []).append(regla)
+
+        self._reglas = reglas
+
+    def reglas_para(self, trabajador):
+        """Campañas (vigentes o no) cuyos criterios cumple el trabajador"""
+        if not trabajador.activo:
+            return []
+
+        sucursal = normalizar_sucursal(trabajador.sede)
+        if sucursal is None:
+            return []
+
+        especificas = self._reglas.get((sucursal, trabajador.tipo_contrato, trabajador.area), [])
+        generales = self._reglas.get((sucursal, trabajador.tipo_contrato, TODAS_LAS_AREAS), [])
+
+        if not especificas or not generales:
+            return especificas or generales
+        return sorted(especificas + generales, key=attrgetter('orden'))
+
+    def campanas_para(self, trabajador):
+        """IDs de las campañas en que el trabajador es elegible"""
+        return {regla.pk for regla in self.reglas_para(trabajador)}
+
+    def campana_vigente_para(self, trabajador, dia=None):
+        """ID de la campaña vigente más reciente que aplica al trabajador, o None"""
+        dia = dia or timezone.now().date()
+        for regla in self.reglas_para(trabajador):
+            if regla.vigente_en(dia):
+                return regla.pk
+        return None
+
+
+_indice = None
+_lock = threading.Lock()
+
+
+def _version_actual():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        # Valor inicial distinto en cada arranque de la caché
+        cache.add(CLAVE_VERSION, time.time_ns(), timeout=None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def _vigente(indice, version):
+    return (
+        indice is not None
+        and indice.version == version
+        and time.monotonic() - indice.construido_en < settings.CAMPANAS_ELEGIBILIDAD_TTL
+    )
+
+
+def obtener_indice():
+    """Índice del proceso actual, reconstruido si la versión cambió"""
+    global _indice
+
+    version = _version_actual()
+    indice = _indice
+    if _vigente(indice, version):
+        return indice
+
+    with _lock:
+        if not _vigente(_indice, version):
+            _indice = IndiceElegibilidad(version)
+        return _indice
+
+
+def invalidar():
+    """Fuerza la reconstrucción del índice en todos los procesos"""
+    global _indice
+
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, time.time_ns(), timeout=None)
+    _indice = None
+
+
+# ========== EVALUACIÓN MASIVA DE RUTS ==========
+
+VEREDICTOS = (
+    'puede_retirar',
+    'ya_retiro',
+    'sin_stock',
+    'sin_campana',
+    'inactivo',
+    'no_encontrado',
+    'rut_invalido',
+)
+
+
+def normalizar_rut(rut):
+    """'12.345.678-k ' -> '12345678-K'"""
+    return str(rut).strip().replace('.', '').replace(' ', '').upper()
+
+
+def evaluar_ruts(ruts, tamano_lote=5000):
+    """
+    Evalúa una lista de RUTs contra las campañas vigentes y el stock de cajas.
+
+    Por cada lote se hace una consulta de trabajadores y una de retiros; la
+    elegibilidad se resuelve con el índice en memoria y el stock con una
+    única consulta agrupada previa.
+
+    Genera, en el orden de entrada, dicts {'rut', 'veredicto', 'campana_id'}.
+    """
+    from cajas.models import Caja
+    from trabajadores.models import Trabajador
+    from .models import MiembroCampana
+
+    indice = obtener_indice()
+    hoy = timezone.now().date()
+
+    stock = {
+        (sucursal, tipo_contrato): total
+        for sucursal, tipo_contrato, total in Caja.objects.filter(
+            activa=True,
+            cantidad_disponible__gt=0
+        ).order_by().values_list('sucursal', 'tipo_contrato').annotate(Sum('cantidad_disponible'))
+    }
+
+    for inicio in range(0, len(ruts), tamano_lote):
+        lote = ruts[inicio:inicio + tamano_lote]
+        normalizados = [normalizar_rut(rut) for rut in lote]
+
+        trabajadores = {
+            trabajador.rut: trabajador
+            for trabajador in Trabajador.objects.filter(rut__in=set(normalizados)).only(
+                'id', 'rut', 'sede', 'tipo_contrato', 'area', 'activo'
+            )
+        }
+        campanas = {
+            trabajador.pk: indice.campana_vigente_para(trabajador, hoy)
+            for trabajador in trabajadores.values()
+        }
+        retirados = set(
+            MiembroCampana.objects.filter(
+                campana_id__in={campana_id for campana_id in campanas.values() if campana_id},
+                trabajador_id__in=campanas.keys(),
+                estado=MiembroCampana.ENTREGADO
+            ).values_list('campana_id', 'trabajador_id')
+        )
+
+        for original, rut in zip(lote, normalizados):
+            trabajador = trabajadores.get(rut)
+            campana_id = campanas.get(trabajador.pk) if trabajador else None
+
+            if not rut:
+                veredicto = 'rut_invalido'
+            elif trabajador is None:
+                veredicto = 'no_encontrado'
+            elif not trabajador.activo:
+                veredicto = 'inactivo'
+            elif campana_id is None:
+                veredicto = 'sin_campana'
+            elif (campana_id, trabajador.pk) in retirados:
+                veredicto = 'ya_retiro'
+            elif not stock.get((normalizar_sucursal(trabajador.sede), trabajador.tipo_contrato)):
+                veredicto = 'sin_stock'
+            else:
+                veredicto = 'puede_retirar'
+
+            yield {'rut': str(original).strip(), 'veredicto': veredicto, 'campana_id': campana_id}
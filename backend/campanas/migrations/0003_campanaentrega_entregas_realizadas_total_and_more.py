@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campanas', '0002_alter_campanaentrega_tipo_contrato_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campanaentrega',
+            name='entregas_realizadas_total',
+            field=models.PositiveIntegerField(default=0, help_text='Entregas registradas bajo esta campaña', verbose_name='Entregas Realizadas'),
+        ),
+        migrations.AddField(
+            model_name='campanaentrega',
+            name='trabajadores_elegibles_total',
+            field=models.PositiveIntegerField(default=0, help_text='Se recalcula al cambiar los criterios y se ajusta al crear/editar trabajadores', verbose_name='Trabajadores Elegibles'),
+        ),
+    ]
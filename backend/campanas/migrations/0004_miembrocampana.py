@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SUCURSAL_TO_SEDE = {
+    'casablanca': 'Casablanca',
+    'valparaiso_bif': 'Valparaíso – Planta BIF',
+    'valparaiso_bic': 'Valparaíso – Planta BIC',
+}
+
+
+def construir_miembros(apps, schema_editor):
+    """Materializa los miembros de las campañas existentes"""
+    CampanaEntrega = apps.get_model('campanas', 'CampanaEntrega')
+    MiembroCampana = apps.get_model('campanas', 'MiembroCampana')
+    Trabajador = apps.get_model('trabajadores', 'Trabajador')
+    Entrega = apps.get_model('entregas', 'Entrega')
+
+    for campana in CampanaEntrega.objects.all():
+        elegibles = Trabajador.objects.filter(
+            sede__in=[campana.sucursal, SUCURSAL_TO_SEDE.get(campana.sucursal, campana.sucursal)],
+            tipo_contrato__in=campana.tipo_contrato,
+            activo=True
+        )
+        if campana.tipo_entrega == 'grupo':
+            elegibles = elegibles.filter(area__in=campana.areas_seleccionadas)
+
+        ids = set(elegibles.values_list('id', flat=True))
+        entregados = dict(
+            Entrega.objects.filter(campana=campana, estado='entregado').order_by('fecha_entrega').values_list('trabajador_id', 'fecha_entrega')
+        )
+
+        MiembroCampana.objects.bulk_create(
+            [
+                MiembroCampana(
+                    campana=campana,
+                    trabajador_id=trabajador_id,
+                    estado='entregado' if trabajador_id in entregados else 'pendiente',
+                    entregado_en=entregados.get(trabajador_id)
+                )
+                for trabajador_id in ids | entregados.keys()
+            ],
+            batch_size=1000
+        )
+        CampanaEntrega.objects.filter(pk=campana.pk).update(trabajadores_elegibles_total=len(ids))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campanas', '0003_campanaentrega_entregas_realizadas_total_and_more'),
+        ('entregas', '0003_entrega_campana'),
+        ('trabajadores', '0003_trabajador_qr_codigo_trabajador_qr_fecha_generacion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MiembroCampana',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('entregado', 'Entregado')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('entregado_en', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Entrega')),
+                ('actualizado_en', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('campana', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='miembros', to='campanas.campanaentrega', verbose_name='Campaña')),
+                ('trabajador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='campanas_miembro', to='trabajadores.trabajador', verbose_name='Trabajador')),
+            ],
+            options={
+                'verbose_name': 'Miembro de Campaña',
+                'verbose_name_plural': 'Miembros de Campaña',
+                'db_table': 'campanas_miembros',
+                'indexes': [models.Index(fields=['campana', 'estado', 'trabajador'], name='campanas_mi_campana_682d1c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campana', 'trabajador'), name='campana_miembro_unico')],
+            },
+        ),
+        migrations.RunPython(construir_miembros, migrations.RunPython.noop),
+    ]
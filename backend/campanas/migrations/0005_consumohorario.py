@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:15
+
+import django.db.models.deletion
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+SEDE_TO_SUCURSAL = {
+    'Casablanca': 'casablanca',
+    'Valparaíso – Planta BIF': 'valparaiso_bif',
+    'Valparaíso – Planta BIC': 'valparaiso_bic',
+}
+
+
+def agregar_entregas(apps, schema_editor):
+    """Agrega por hora las entregas realizadas ya asociadas a una campaña"""
+    Entrega = apps.get_model('entregas', 'Entrega')
+    ConsumoHorario = apps.get_model('campanas', 'ConsumoHorario')
+
+    filas = (
+        Entrega.objects.filter(campana__isnull=False, estado='entregado')
+        .annotate(hora=TruncHour('fecha_entrega', tzinfo=datetime.timezone.utc))
+        .values('campana_id', 'trabajador__sede', 'trabajador__tipo_contrato', 'hora')
+        .annotate(cantidad=Count('id'))
+        .order_by()
+    )
+
+    buckets = {}
+    for fila in filas:
+        sede = fila['trabajador__sede']
+        clave = (
+            fila['campana_id'],
+            SEDE_TO_SUCURSAL.get(sede, sede),
+            fila['trabajador__tipo_contrato'],
+            fila['hora'],
+        )
+        buckets[clave] = buckets.get(clave, 0) + fila['cantidad']
+
+    ConsumoHorario.objects.bulk_create(
+        [
+            ConsumoHorario(campana_id=campana_id, sucursal=sucursal, tipo_contrato=tipo_contrato, hora=hora, cantidad=cantidad)
+            for (campana_id, sucursal, tipo_contrato, hora), cantidad in buckets.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campanas', '0004_miembrocampana'),
+        ('entregas', '0003_entrega_campana'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoHorario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sucursal', models.CharField(max_length=50, verbose_name='Sucursal')),
+                ('tipo_contrato', models.CharField(max_length=20, verbose_name='Tipo de Contrato')),
+                ('hora', models.DateTimeField(help_text='Inicio de la hora (minutos y segundos en cero)', verbose_name='Hora')),
+                ('cantidad', models.PositiveIntegerField(default=0, verbose_name='Entregas')),
+                ('campana', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumo_horario', to='campanas.campanaentrega', verbose_name='Campaña')),
+            ],
+            options={
+                'verbose_name': 'Consumo Horario',
+                'verbose_name_plural': 'Consumo Horario',
+                'db_table': 'campanas_consumo_horario',
+                'ordering': ['hora'],
+                'constraints': [models.UniqueConstraint(fields=('campana', 'sucursal', 'tipo_contrato', 'hora'), name='consumo_horario_unico')],
+            },
+        ),
+        migrations.RunPython(agregar_entregas, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,18 @@
-from django.db import models
+import copy
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from usuarios.models import Usuario
 
 
+# Mapear sucursal de campaña a sede de trabajador
+SUCURSAL_TO_SEDE = {
+    'casablanca': 'Casablanca',
+    'valparaiso_bif': 'Valparaíso – Planta BIF',
+    'valparaiso_bic': 'Valparaíso – Planta BIC',
+}
+
+
 class CampanaEntrega(models.Model):
     """
     Modelo para gestionar campañas de entrega de cajas de seguridad
@@ -74,6 +85,18 @@ class CampanaEntrega(models.Model):
         help_text='Indica si la campaña está actualmente activa'
     )
     
+    # Contadores (mantenidos en la misma transacción que la escritura que los afecta)
+    trabajadores_elegibles_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Trabajadores Elegibles',
+        help_text='Se recalcula al cambiar los criterios y se ajusta al crear/editar trabajadores'
+    )
+    entregas_realizadas_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Entregas Realizadas',
+        help_text='Entregas registradas bajo esta campaña'
+    )
+    
     # Auditoría
     creado_por = models.ForeignKey(
         Usuario,
@@ -97,9 +120,66 @@ class CampanaEntrega(models.Model):
         verbose_name_plural = 'Campañas de Entrega'
         ordering = ['-fecha_creacion']
     
+    # Campos que definen qué trabajadores son elegibles
+    CAMPOS_CRITERIO = ('sucursal', 'tipo_entrega', 'areas_seleccionadas', 'tipo_contrato')
+    CAMPOS_CONTADOR = ('trabajadores_elegibles_total', 'entregas_realizadas_total')
+    
     def __str__(self):
         return f"{self.nombre} - {self.get_sucursal_display()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._criterio_guardado = instancia._valores_criterio()
+        return instancia
+    
+    def _valores_criterio(self):
+        """Criterios cargados (los diferidos no están en __dict__)"""
+        return {
+            campo: copy.deepcopy(self.__dict__[campo])
+            for campo in self.CAMPOS_CRITERIO if campo in self.__dict__
+        }
+    
+    def _criterios_modificados(self, update_fields):
+        guardado = getattr(self, '_criterio_guardado', {})
+        actual = self._valores_criterio()
+        return [
+            campo for campo in self.CAMPOS_CRITERIO
+            if campo in update_fields and (campo not in guardado or guardado[campo] != actual.get(campo))
+        ]
+    
+    def save(self, *args, **kwargs):
+        """
+        Reconstruye los miembros solo si cambió algún criterio y nunca
+        sobrescribe los contadores con valores en memoria posiblemente
+        desactualizados (se modifican con UPDATE ... F() + 1).
+        """
+        update_fields = kwargs.get('update_fields')
+        
+        if self._state.adding:
+            self.entregas_realizadas_total = 0
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self.reconstruir_miembros()
+            self._criterio_guardado = self._valores_criterio()
+            return
+        
+        if update_fields is None:
+            update_fields = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.CAMPOS_CONTADOR
+            ]
+        else:
+            update_fields = [f for f in update_fields if f not in self.CAMPOS_CONTADOR]
+        
+        kwargs['update_fields'] = update_fields
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self._criterios_modificados(update_fields):
+                self.reconstruir_miembros()
+        self._criterio_guardado = self._valores_criterio()
+    
     @property
     def esta_vigente(self):
         """Verifica si la campaña está dentro del período de vigencia"""
@@ -122,6 +202,19 @@ class CampanaEntrega(models.Model):
         
         return ', '.join([AREAS_MAP.get(area, area) for area in self.areas_seleccionadas])
     
+    @classmethod
+    def campana_vigente_para(cls, trabajador):
+        """
+        Retorna la campaña vigente bajo la cual el trabajador puede retirar
+        (la más reciente si hay varias), o None.
+        """
+        from .elegibilidad import obtener_indice
+        
+        campana_id = obtener_indice().campana_vigente_para(trabajador)
+        if campana_id is None:
+            return None
+        return cls.objects.select_related('creado_por').filter(pk=campana_id).first()
+    
     def trabajador_puede_retirar(self, trabajador):
         """
         Verifica si un trabajador puede retirar caja en esta campaña
@@ -130,8 +223,10 @@ class CampanaEntrega(models.Model):
         if not self.esta_vigente:
             return False, "La campaña no está vigente"
         
-        # Verificar sucursal
-        if trabajador.sede.lower() != self.get_sucursal_display().lower():
+        from .elegibilidad import normalizar_sucursal
+        
+        # Verificar sucursal (la sede puede venir como código o como nombre)
+        if normalizar_sucursal(trabajador.sede) != self.sucursal:
             return False, "El trabajador no pertenece a la sucursal de esta campaña"
         
         # Verificar tipo de contrato (ahora es una lista)
@@ -151,23 +246,18 @@ class CampanaEntrega(models.Model):
         'plazo_fijo': 'Plazo Fijo',
     }
     
-    def contar_trabajadores_elegibles(self):
+    def sedes_trabajador(self):
+        """Valores de Trabajador.sede que corresponden a la sucursal (código y nombre)"""
+        return [self.sucursal, SUCURSAL_TO_SEDE.get(self.sucursal, self.sucursal)]
+    
+    def trabajadores_elegibles(self):
         """
-        Cuenta cuántos trabajadores son elegibles para esta campaña
+        QuerySet de los trabajadores que cumplen los criterios de la campaña
         """
         from trabajadores.models import Trabajador
         
-        # Mapear sucursal de campaña a sede de trabajador
-        SUCURSAL_TO_SEDE = {
-            'casablanca': 'Casablanca',
-            'valparaiso_bif': 'Valparaíso – Planta BIF',
-            'valparaiso_bic': 'Valparaíso – Planta BIC',
-        }
-        
-        sede_trabajador = SUCURSAL_TO_SEDE.get(self.sucursal, self.sucursal)
-        
         trabajadores = Trabajador.objects.filter(
-            sede=sede_trabajador,
+            sede__in=self.sedes_trabajador(),
             tipo_contrato__in=self.tipo_contrato,  # Cambiado a __in para lista
             activo=True
         )
@@ -176,35 +266,78 @@ class CampanaEntrega(models.Model):
         if self.tipo_entrega == 'grupo':
             trabajadores = trabajadores.filter(area__in=self.areas_seleccionadas)
         
-        return trabajadores.count()
+        return trabajadores
     
-    def contar_entregas_realizadas(self):
+    def contar_trabajadores_elegibles(self):
         """
-        Cuenta cuántas entregas se han realizado en esta campaña
+        Cuenta cuántos trabajadores son elegibles para esta campaña
         """
-        from entregas.models import Entrega
-        
-        # Mapear sucursal
-        SUCURSAL_TO_SEDE = {
-            'casablanca': 'Casablanca',
-            'valparaiso_bif': 'Valparaíso – Planta BIF',
-            'valparaiso_bic': 'Valparaíso – Planta BIC',
-        }
+        return self.trabajadores_elegibles().count()
+    
+    def reconstruir_miembros(self, tamano_lote=1000):
+        """
+        Sincroniza en bloque la tabla de miembros con los criterios actuales
+        y actualiza trabajadores_elegibles_total.
         
-        sede_trabajador = SUCURSAL_TO_SEDE.get(self.sucursal, self.sucursal)
+        Quienes ya retiraron en esta campaña se conservan como 'entregado'
+        aunque hayan dejado de cumplir los criterios.
+        """
+        from django.utils import timezone
         
-        entregas = Entrega.objects.filter(
-            trabajador__sede=sede_trabajador,
-            trabajador__tipo_contrato__in=self.tipo_contrato,  # Cambiado a __in para lista
-            fecha_entrega__date__gte=self.fecha_inicio,
-            fecha_entrega__date__lte=self.fecha_fin
+        elegibles = set(self.trabajadores_elegibles().order_by().values_list('id', flat=True))
+        entregados = dict(
+            self.entregas.filter(estado='entregado').order_by('fecha_entrega').values_list('trabajador_id', 'fecha_entrega')
         )
+        actuales = dict(self.miembros.values_list('trabajador_id', 'estado'))
         
-        # Si es por grupo, filtrar por áreas
-        if self.tipo_entrega == 'grupo':
-            entregas = entregas.filter(trabajador__area__in=self.areas_seleccionadas)
+        sobrantes = [
+            trabajador_id for trabajador_id in actuales
+            if trabajador_id not in elegibles and trabajador_id not in entregados
+        ]
+        a_pendiente = [
+            trabajador_id for trabajador_id, estado in actuales.items()
+            if estado == MiembroCampana.ENTREGADO and trabajador_id in elegibles
+            and trabajador_id not in entregados
+        ]
+        a_entregado = [
+            trabajador_id for trabajador_id, estado in actuales.items()
+            if estado != MiembroCampana.ENTREGADO and trabajador_id in entregados
+        ]
+        nuevos = [
+            MiembroCampana(
+                campana=self,
+                trabajador_id=trabajador_id,
+                estado=MiembroCampana.ENTREGADO if trabajador_id in entregados else MiembroCampana.PENDIENTE,
+                entregado_en=entregados.get(trabajador_id)
+            )
+            for trabajador_id in (elegibles | entregados.keys()) - actuales.keys()
+        ]
         
-        return entregas.count()
+        with transaction.atomic():
+            for inicio in range(0, len(sobrantes), tamano_lote):
+                self.miembros.filter(trabajador_id__in=sobrantes[inicio:inicio + tamano_lote]).delete()
+            
+            for inicio in range(0, len(a_pendiente), tamano_lote):
+                self.miembros.filter(trabajador_id__in=a_pendiente[inicio:inicio + tamano_lote]).update(
+                    estado=MiembroCampana.PENDIENTE, entregado_en=None, actualizado_en=timezone.now()
+                )
+            
+            for inicio in range(0, len(a_entregado), tamano_lote):
+                # La fecha exacta de cada entrega no es necesaria para el estado
+                self.miembros.filter(trabajador_id__in=a_entregado[inicio:inicio + tamano_lote]).update(
+                    estado=MiembroCampana.ENTREGADO, entregado_en=timezone.now(), actualizado_en=timezone.now()
+                )
+            
+            MiembroCampana.objects.bulk_create(nuevos, batch_size=tamano_lote, ignore_conflicts=True)
+            
+            self.trabajadores_elegibles_total = len(elegibles)
+            CampanaEntrega.objects.filter(pk=self.pk).update(trabajadores_elegibles_total=len(elegibles))
+    
+    def contar_entregas_realizadas(self):
+        """
+        Cuenta cuántas entregas se han realizado (estado 'entregado') bajo esta campaña
+        """
+        return self.entregas.filter(estado='entregado').count()
     
     def get_tipos_contrato_display(self):
         """Retorna los tipos de contrato en formato legible"""
@@ -224,4 +357,149 @@ class CampanaEntrega(models.Model):
             nombres.append(nombre)
         
         # Retornar unidos con "/"
-        return ' / '.join(nombres)
\ No newline at end of file
+        return ' / '.join(nombres)
+
+
+class MiembroCampana(models.Model):
+    """
+    Pertenencia materializada de un trabajador a una campaña.
+    
+    Se construye en bloque al crear/editar la campaña
+    (CampanaEntrega.reconstruir_miembros) y se mantiene incrementalmente
+    al modificar trabajadores y registrar entregas (ver signals.py).
+    Permite listar quién falta por retirar con una consulta indexada.
+    """
+    
+    PENDIENTE = 'pendiente'
+    ENTREGADO = 'entregado'
+    
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (ENTREGADO, 'Entregado'),
+    ]
+    
+    campana = models.ForeignKey(
+        CampanaEntrega,
+        on_delete=models.CASCADE,
+        related_name='miembros',
+        verbose_name='Campaña'
+    )
+    trabajador = models.ForeignKey(
+        'trabajadores.Trabajador',
+        on_delete=models.CASCADE,
+        related_name='campanas_miembro',
+        verbose_name='Trabajador'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=PENDIENTE,
+        verbose_name='Estado'
+    )
+    entregado_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Entrega'
+    )
+    actualizado_en = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Actualización'
+    )
+    
+    class Meta:
+        db_table = 'campanas_miembros'
+        verbose_name = 'Miembro de Campaña'
+        verbose_name_plural = 'Miembros de Campaña'
+        constraints = [
+            models.UniqueConstraint(fields=['campana', 'trabajador'], name='campana_miembro_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['campana', 'estado', 'trabajador']),
+        ]
+    
+    def __str__(self):
+        return f"{self.campana_id} - {self.trabajador_id} ({self.get_estado_display()})"
+
+
+class ConsumoHorario(models.Model):
+    """
+    Entregas por hora de una campaña, por sucursal y tipo de contrato.
+    
+    Se incrementa al registrar cada entrega (ver signals.py), de modo que
+    los gráficos y la proyección de stock leen unas pocas filas
+    preagregadas en lugar de recorrer Entrega.
+    """
+    
+    campana = models.ForeignKey(
+        CampanaEntrega,
+        on_delete=models.CASCADE,
+        related_name='consumo_horario',
+        verbose_name='Campaña'
+    )
+    sucursal = models.CharField(
+        max_length=50,
+        verbose_name='Sucursal'
+    )
+    tipo_contrato = models.CharField(
+        max_length=20,
+        verbose_name='Tipo de Contrato'
+    )
+    hora = models.DateTimeField(
+        verbose_name='Hora',
+        help_text='Inicio de la hora (minutos y segundos en cero)'
+    )
+    cantidad = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Entregas'
+    )
+    
+    class Meta:
+        db_table = 'campanas_consumo_horario'
+        verbose_name = 'Consumo Horario'
+        verbose_name_plural = 'Consumo Horario'
+        ordering = ['hora']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['campana', 'sucursal', 'tipo_contrato', 'hora'],
+                name='consumo_horario_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.campana_id} {self.sucursal}/{self.tipo_contrato} {self.hora:%d/%m/%Y %H:00}: {self.cantidad}"
+    
+    @classmethod
+    def registrar(cls, campana_id, sucursal, tipo_contrato, fecha):
+        """Suma una entrega al bucket de su hora (UPDATE o INSERT, seguro ante concurrencia)"""
+        bucket = cls.objects.filter(
+            campana_id=campana_id,
+            sucursal=sucursal,
+            tipo_contrato=tipo_contrato,
+            hora=fecha.replace(minute=0, second=0, microsecond=0)
+        )
+        if bucket.update(cantidad=F('cantidad') + 1):
+            return
+        
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    campana_id=campana_id,
+                    sucursal=sucursal,
+                    tipo_contrato=tipo_contrato,
+                    hora=fecha.replace(minute=0, second=0, microsecond=0),
+                    cantidad=1
+                )
+        except IntegrityError:
+            # Otro proceso creó el bucket entre el UPDATE y el INSERT
+            bucket.update(cantidad=F('cantidad') + 1)
+    
+    @classmethod
+    def descontar(cls, campana_id, sucursal, tipo_contrato, fecha):
+        """Resta una entrega eliminada de su bucket"""
+        cls.objects.filter(
+            campana_id=campana_id,
+            sucursal=sucursal,
+            tipo_contrato=tipo_contrato,
+            hora=fecha.replace(minute=0, second=0, microsecond=0),
+            cantidad__gt=0
+        ).update(cantidad=F('cantidad') - 1)
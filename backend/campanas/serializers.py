@@ -8,8 +8,8 @@ class CampanaEntregaSerializer(serializers.ModelSerializer):
     tipo_entrega_nombre = serializers.CharField(source='get_tipo_entrega_display', read_only=True)
     tipos_contrato_display = serializers.SerializerMethodField()
     areas_display = serializers.SerializerMethodField()
-    trabajadores_elegibles = serializers.SerializerMethodField()
-    entregas_realizadas = serializers.SerializerMethodField()
+    trabajadores_elegibles = serializers.IntegerField(source='trabajadores_elegibles_total', read_only=True)
+    entregas_realizadas = serializers.IntegerField(source='entregas_realizadas_total', read_only=True)
     esta_vigente = serializers.BooleanField(read_only=True)
     creado_por_nombre = serializers.SerializerMethodField()
     
@@ -46,12 +46,6 @@ class CampanaEntregaSerializer(serializers.ModelSerializer):
     def get_tipos_contrato_display(self, obj):
         return obj.get_tipos_contrato_display()
     
-    def get_trabajadores_elegibles(self, obj):
-        return obj.contar_trabajadores_elegibles()
-    
-    def get_entregas_realizadas(self, obj):
-        return obj.contar_entregas_realizadas()
-    
     def get_creado_por_nombre(self, obj):
         if obj.creado_por:
             return f"{obj.creado_por.first_name} {obj.creado_por.last_name}"
@@ -0,0 +1,203 @@
+"""
+Mantenimiento incremental de los contadores y miembros de CampanaEntrega.
+
+- Entrega: al crearse se asocia a la campaña vigente que le corresponde.
+  Solo cuenta con estado 'entregado' (el mismo criterio de la restricción
+  entrega_unica_por_campana): al pasar a ese estado suma 1 a
+  `entregas_realizadas_total`, se acumula en el bucket de su hora en
+  ConsumoHorario y marca al miembro como entregado; al dejarlo (cambio de
+  estado o eliminación) resta 1 y lo devuelve a pendiente.
+- Trabajador: al crear/editar/eliminar se ajusta
+  `trabajadores_elegibles_total` y se agregan/quitan miembros pendientes
+  en las campañas cuyo resultado de elegibilidad cambió (según el índice
+  de elegibilidad.py).
+- CampanaEntrega: al guardar o eliminar se invalida el índice de
+  elegibilidad compilado de todos los procesos.
+
+Todo se hace con UPDATE ... F() ± 1 dentro de la transacción de la escritura
+original, así que no hay lecturas-modificación-escritura concurrentes.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from entregas.models import Entrega
+from trabajadores.models import Trabajador
+from .elegibilidad import invalidar, normalizar_sucursal, obtener_indice
+from .models import CampanaEntrega, ConsumoHorario, MiembroCampana
+
+
+CAMPOS_CRITERIO_TRABAJADOR = {'sede', 'tipo_contrato', 'area', 'activo'}
+
+
+def _bucket_consumo(entrega, campana_id):
+    """(campana_id, sucursal, tipo_contrato, fecha) del bucket horario de la entrega"""
+    trabajador = entrega.trabajador
+    return (
+        campana_id,
+        normalizar_sucursal(trabajador.sede) or trabajador.sede,
+        trabajador.tipo_contrato,
+        entrega.fecha_entrega,
+    )
+
+
+def _ajustar(campo, sumar=(), restar=()):
+    if sumar:
+        CampanaEntrega.objects.filter(pk__in=sumar).update(**{campo: F(campo) + 1})
+    if restar:
+        CampanaEntrega.objects.filter(pk__in=restar, **{f'{campo}__gt': 0}).update(**{campo: F(campo) - 1})
+
+
+# ========== CAMPAÑAS ==========
+
+@receiver(post_save, sender=CampanaEntrega)
+@receiver(post_delete, sender=CampanaEntrega)
+def invalidar_indice_elegibilidad(sender, **kwargs):
+    # Tras el commit, para que otros procesos no reconstruyan con datos anteriores
+    transaction.on_commit(invalidar)
+
+
+# ========== ENTREGAS ==========
+
+@receiver(pre_save, sender=Entrega)
+def asignar_campana_entrega(sender, instance, raw=False, **kwargs):
+    """Asocia la entrega nueva a la campaña vigente del trabajador"""
+    if raw or not instance._state.adding or instance.campana_id:
+        return
+    instance.campana_id = obtener_indice().campana_vigente_para(instance.trabajador)
+
+
+def _campana_contada(estado, campana_id):
+    """Campaña en la que cuenta la entrega, o None si no cuenta"""
+    return campana_id if estado == 'entregado' else None
+
+
+@receiver(pre_save, sender=Entrega)
+def recordar_estado_entrega(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda en qué campaña contaba la entrega antes del cambio"""
+    instance._campana_contada_previa = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {'estado', 'campana'} & set(update_fields):
+        instance._campana_contada_previa = _campana_contada(instance.estado, instance.campana_id)
+        return
+
+    anterior = Entrega.objects.filter(pk=instance.pk).values('estado', 'campana_id').first()
+    if anterior:
+        instance._campana_contada_previa = _campana_contada(anterior['estado'], anterior['campana_id'])
+
+
+def _sumar_entrega(entrega, campana_id):
+    _ajustar('entregas_realizadas_total', sumar=[campana_id])
+    ConsumoHorario.registrar(*_bucket_consumo(entrega, campana_id))
+
+    miembros = MiembroCampana.objects.filter(
+        campana_id=campana_id,
+        trabajador_id=entrega.trabajador_id
+    )
+    if not miembros.update(estado=MiembroCampana.ENTREGADO, entregado_en=entrega.fecha_entrega, actualizado_en=timezone.now()):
+        MiembroCampana.objects.create(
+            campana_id=campana_id,
+            trabajador_id=entrega.trabajador_id,
+            estado=MiembroCampana.ENTREGADO,
+            entregado_en=entrega.fecha_entrega
+        )
+
+
+def _restar_entrega(entrega, campana_id):
+    _ajustar('entregas_realizadas_total', restar=[campana_id])
+    ConsumoHorario.descontar(*_bucket_consumo(entrega, campana_id))
+
+    otra_entrega = Entrega.objects.filter(
+        campana_id=campana_id,
+        trabajador_id=entrega.trabajador_id,
+        estado='entregado'
+    ).exclude(pk=entrega.pk).exists()
+    if otra_entrega:
+        return
+
+    miembros = MiembroCampana.objects.filter(
+        campana_id=campana_id,
+        trabajador_id=entrega.trabajador_id
+    )
+    trabajador = Trabajador.objects.filter(pk=entrega.trabajador_id).first()
+    if trabajador and campana_id in obtener_indice().campanas_para(trabajador):
+        miembros.update(estado=MiembroCampana.PENDIENTE, entregado_en=None, actualizado_en=timezone.now())
+    else:
+        miembros.delete()
+
+
+@receiver(post_save, sender=Entrega)
+def contar_entrega_campana(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previa = None if created else getattr(instance, '_campana_contada_previa', None)
+    actual = _campana_contada(instance.estado, instance.campana_id)
+    if previa == actual:
+        return
+
+    if previa:
+        _restar_entrega(instance, previa)
+    if actual:
+        _sumar_entrega(instance, actual)
+
+
+@receiver(post_delete, sender=Entrega)
+def restar_entrega_campana(sender, instance, **kwargs):
+    campana_id = _campana_contada(instance.estado, instance.campana_id)
+    if campana_id:
+        _restar_entrega(instance, campana_id)
+
+
+# ========== TRABAJADORES ==========
+
+def _campanas_donde_cumple(trabajador):
+    return obtener_indice().campanas_para(trabajador)
+
+
+@receiver(pre_save, sender=Trabajador)
+def recordar_criterios_trabajador(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda las campañas donde el trabajador era elegible antes del cambio"""
+    instance._campanas_previas = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not CAMPOS_CRITERIO_TRABAJADOR & set(update_fields):
+        return
+
+    anterior = Trabajador.objects.filter(pk=instance.pk).only(*CAMPOS_CRITERIO_TRABAJADOR).first()
+    instance._campanas_previas = _campanas_donde_cumple(anterior) if anterior else set()
+
+
+@receiver(post_save, sender=Trabajador)
+def ajustar_elegibles_trabajador(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    previas = set() if created else getattr(instance, '_campanas_previas', None)
+    if previas is None:
+        return  # No cambió ningún campo que afecte la elegibilidad
+
+    actuales = _campanas_donde_cumple(instance)
+    nuevas, perdidas = actuales - previas, previas - actuales
+    _ajustar('trabajadores_elegibles_total', sumar=nuevas, restar=perdidas)
+
+    if nuevas:
+        MiembroCampana.objects.bulk_create(
+            [MiembroCampana(campana_id=campana_id, trabajador=instance) for campana_id in nuevas],
+            ignore_conflicts=True
+        )
+    if perdidas:
+        # Quien ya retiró se conserva como 'entregado'
+        MiembroCampana.objects.filter(
+            trabajador=instance,
+            campana_id__in=perdidas,
+            estado=MiembroCampana.PENDIENTE
+        ).delete()
+
+
+@receiver(post_delete, sender=Trabajador)
+def restar_elegible_trabajador(sender, instance, **kwargs):
+    _ajustar('trabajadores_elegibles_total', restar=_campanas_donde_cumple(instance))
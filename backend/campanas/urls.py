@@ -7,6 +7,9 @@ from .views import (
     ReactivarCampanaView,
     ValidarTrabajadorCampanaView,
     EstadisticasCampanaView,
+    CampanaMiembrosView,
+    CampanaConsumoView,
+    ValidarTrabajadoresMasivoView,
 )
 
 urlpatterns = [
@@ -28,6 +31,15 @@ urlpatterns = [
     # Estadísticas de campaña
     path('campanas/<int:pk>/estadisticas/', EstadisticasCampanaView.as_view(), name='estadisticas-campana'),
     
+    # Trabajadores pendientes / que ya retiraron
+    path('campanas/<int:pk>/miembros/', CampanaMiembrosView.as_view(), name='campana-miembros'),
+    
+    # Consumo por hora y proyección de stock
+    path('campanas/<int:pk>/consumo/', CampanaConsumoView.as_view(), name='campana-consumo'),
+    
     # Validar trabajador
     path('validar-trabajador/', ValidarTrabajadorCampanaView.as_view(), name='validar-trabajador-campana'),
+    
+    # Validar RUTs en bloque
+    path('validar-trabajadores/masivo/', ValidarTrabajadoresMasivoView.as_view(), name='validar-trabajadores-masivo'),
 ]
\ No newline at end of file
@@ -3,10 +3,16 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
+from django.db.models import Count, Sum
 from django.utils import timezone
-from datetime import date
+from datetime import date, datetime, time, timedelta
+from collections import Counter
+import csv
+import re
 
-from .models import CampanaEntrega
+from .models import CampanaEntrega, MiembroCampana
+from .elegibilidad import VEREDICTOS, evaluar_ruts, normalizar_sucursal
 from .serializers import CampanaEntregaSerializer, CrearCampanaSerializer
 from trabajadores.models import Trabajador
 from cajas.models import Caja
@@ -17,7 +23,9 @@ class CampanasListView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        campanas = CampanaEntrega.objects.all()
+        # Los conteos son columnas de la campaña y el creador viene en el mismo JOIN:
+        # cantidad de consultas constante
+        campanas = CampanaEntrega.objects.select_related('creado_por')
         
         # Filtrar por estado si se proporciona
         estado = request.query_params.get('estado', None)
@@ -113,7 +121,7 @@ class FinalizarCampanaView(APIView):
     def post(self, request, pk):
         campana = get_object_or_404(CampanaEntrega, pk=pk)
         campana.activa = False
-        campana.save()
+        campana.save(update_fields=['activa', 'fecha_actualizacion'])
         
         serializer = CampanaEntregaSerializer(campana)
         return Response({
@@ -129,7 +137,7 @@ class ReactivarCampanaView(APIView):
     def post(self, request, pk):
         campana = get_object_or_404(CampanaEntrega, pk=pk)
         campana.activa = True
-        campana.save()
+        campana.save(update_fields=['activa', 'fecha_actualizacion'])
         
         serializer = CampanaEntregaSerializer(campana)
         return Response({
@@ -159,17 +167,8 @@ class ValidarTrabajadorCampanaView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Buscar campañas vigentes para este trabajador
-        hoy = date.today()
-        
-        # Mapear sede del trabajador a sucursal de campaña
-        SEDE_TO_SUCURSAL = {
-            'Casablanca': 'casablanca',
-            'Valparaíso – Planta BIF': 'valparaiso_bif',
-            'Valparaíso – Planta BIC': 'valparaiso_bic',
-        }
-        
-        sucursal_campana = SEDE_TO_SUCURSAL.get(trabajador.sede)
+        # Mapear sede del trabajador (código o nombre) a sucursal de campaña
+        sucursal_campana = normalizar_sucursal(trabajador.sede)
         
         if not sucursal_campana:
             return Response({
@@ -184,32 +183,19 @@ class ValidarTrabajadorCampanaView(APIView):
                 }
             })
         
-        campanas_vigentes = CampanaEntrega.objects.filter(
-            activa=True,
-            fecha_inicio__lte=hoy,
-            fecha_fin__gte=hoy,
-            sucursal=sucursal_campana,
-            tipo_contrato__contains=[trabajador.tipo_contrato]  # Buscar en la lista
-        )
-        
-        # Verificar si alguna campaña le aplica
-        campana_aplicable = None
-        for campana in campanas_vigentes:
-            puede, mensaje = campana.trabajador_puede_retirar(trabajador)
-            if puede:
-                campana_aplicable = campana
-                break
+        # Buscar la campaña vigente que le aplica a este trabajador (índice en memoria)
+        campana_aplicable = CampanaEntrega.campana_vigente_para(trabajador)
         
         if campana_aplicable:
-            # Verificar si hay cajas disponibles
+            # Verificar si hay cajas disponibles (una sola consulta)
             cajas_disponibles = Caja.objects.filter(
                 sucursal=sucursal_campana,
                 tipo_contrato=trabajador.tipo_contrato,
                 activa=True,
                 cantidad_disponible__gt=0
-            )
+            ).count()
             
-            if not cajas_disponibles.exists():
+            if not cajas_disponibles:
                 return Response({
                     'puede_retirar': False,
                     'mensaje': 'No hay cajas disponibles en este momento',
@@ -234,7 +220,7 @@ class ValidarTrabajadorCampanaView(APIView):
                     'area': trabajador.get_area_display(),
                     'tipo_contrato': trabajador.get_tipo_contrato_display(),
                 },
-                'cajas_disponibles': cajas_disponibles.count()
+                'cajas_disponibles': cajas_disponibles
             })
         else:
             return Response({
@@ -255,10 +241,11 @@ class EstadisticasCampanaView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, pk):
-        campana = get_object_or_404(CampanaEntrega, pk=pk)
+        campana = get_object_or_404(CampanaEntrega.objects.select_related('creado_por'), pk=pk)
         
-        trabajadores_elegibles = campana.contar_trabajadores_elegibles()
-        entregas_realizadas = campana.contar_entregas_realizadas()
+        # Contadores mantenidos incrementalmente: lectura O(1)
+        trabajadores_elegibles = campana.trabajadores_elegibles_total
+        entregas_realizadas = campana.entregas_realizadas_total
         
         porcentaje = 0
         if trabajadores_elegibles > 0:
@@ -268,6 +255,277 @@ class EstadisticasCampanaView(APIView):
             'campana': CampanaEntregaSerializer(campana).data,
             'trabajadores_elegibles': trabajadores_elegibles,
             'entregas_realizadas': entregas_realizadas,
-            'entregas_pendientes': trabajadores_elegibles - entregas_realizadas,
+            'entregas_pendientes': max(trabajadores_elegibles - entregas_realizadas, 0),
             'porcentaje_completado': porcentaje
-        })
\ No newline at end of file
+        })
+
+
+class CampanaMiembrosView(APIView):
+    """
+    Trabajadores de una campaña según su estado de retiro, paginados por cursor.
+    
+    GET /api/campanas/<pk>/miembros/?estado=pendiente&limit=50&cursor=123
+    
+    Lee la tabla materializada de miembros (índice campana, estado, trabajador),
+    así que "quién falta por retirar" no recorre todos los trabajadores.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    LIMITE_DEFECTO = 50
+    LIMITE_MAXIMO = 500
+    
+    CAMPOS = (
+        'trabajador_id',
+        'trabajador__rut',
+        'trabajador__nombre',
+        'trabajador__apellido_paterno',
+        'trabajador__apellido_materno',
+        'trabajador__area',
+        'trabajador__tipo_contrato',
+        'estado',
+        'entregado_en',
+    )
+    
+    def get(self, request, pk):
+        campana = get_object_or_404(CampanaEntrega, pk=pk)
+        
+        estado = request.query_params.get('estado', MiembroCampana.PENDIENTE)
+        if estado not in dict(MiembroCampana.ESTADO_CHOICES):
+            return Response(
+                {'error': 'Estado inválido. Use pendiente o entregado'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        miembros = campana.miembros.filter(estado=estado)
+        
+        # Cursor (id del último trabajador recibido) y límite
+        try:
+            limite = min(
+                max(int(request.query_params.get('limit', self.LIMITE_DEFECTO)), 1),
+                self.LIMITE_MAXIMO
+            )
+            cursor = request.query_params.get('cursor')
+            if cursor:
+                miembros = miembros.filter(trabajador_id__gt=int(cursor))
+        except ValueError:
+            return Response(
+                {'error': 'Los parámetros limit y cursor deben ser numéricos'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Se pide un registro extra para saber si hay otra página
+        filas = list(miembros.order_by('trabajador_id').values(*self.CAMPOS)[:limite + 1])
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        
+        # Resumen por estado con una sola consulta agrupada
+        por_estado = dict(
+            campana.miembros.order_by().values_list('estado').annotate(total=Count('id'))
+        )
+        entregados = por_estado.get(MiembroCampana.ENTREGADO, 0)
+        pendientes = por_estado.get(MiembroCampana.PENDIENTE, 0)
+        total = entregados + pendientes
+        
+        return Response({
+            'resumen': {
+                'total': total,
+                'entregados': entregados,
+                'pendientes': pendientes,
+                'porcentaje_completado': round(entregados / total * 100, 2) if total else 0,
+            },
+            'results': [
+                {
+                    'trabajador_id': fila['trabajador_id'],
+                    'rut': fila['trabajador__rut'],
+                    'nombre': f"{fila['trabajador__nombre']} {fila['trabajador__apellido_paterno']} {fila['trabajador__apellido_materno']}",
+                    'area': fila['trabajador__area'],
+                    'tipo_contrato': fila['trabajador__tipo_contrato'],
+                    'estado': fila['estado'],
+                    'entregado_en': fila['entregado_en'],
+                }
+                for fila in filas
+            ],
+            'siguiente_cursor': filas[-1]['trabajador_id'] if hay_mas else None,
+        })
+
+
+class CampanaConsumoView(APIView):
+    """
+    Serie horaria de entregas de una campaña y proyección de agotamiento de stock.
+    
+    GET /api/campanas/<pk>/consumo/?ventana_horas=24
+    
+    La serie sale de ConsumoHorario (una fila por hora, sucursal y tipo de
+    contrato). La tasa de consumo es el promedio por hora de las últimas
+    `ventana_horas`, y con el stock actual de cajas se estima cuándo se agota.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    VENTANA_DEFECTO = 24
+    VENTANA_MAXIMA = 24 * 30
+    
+    def get(self, request, pk):
+        campana = get_object_or_404(CampanaEntrega, pk=pk)
+        
+        try:
+            ventana = int(request.query_params.get('ventana_horas', self.VENTANA_DEFECTO))
+        except ValueError:
+            return Response(
+                {'error': 'ventana_horas debe ser numérico'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ventana = max(1, min(ventana, self.VENTANA_MAXIMA))
+        
+        ahora = timezone.now()
+        desde = ahora.replace(minute=0, second=0, microsecond=0) - timedelta(hours=ventana - 1)
+        
+        serie = list(
+            campana.consumo_horario.values('hora', 'sucursal', 'tipo_contrato', 'cantidad')
+        )
+        
+        consumo_ventana = dict(
+            campana.consumo_horario.filter(hora__gte=desde)
+            .order_by().values_list('tipo_contrato').annotate(total=Sum('cantidad'))
+        )
+        stock = dict(
+            Caja.objects.filter(
+                sucursal=campana.sucursal,
+                tipo_contrato__in=campana.tipo_contrato,
+                activa=True
+            ).order_by().values_list('tipo_contrato').annotate(total=Sum('cantidad_disponible'))
+        )
+        pendientes = dict(
+            campana.miembros.filter(estado=MiembroCampana.PENDIENTE)
+            .order_by().values_list('trabajador__tipo_contrato').annotate(total=Count('id'))
+        )
+        
+        fin_campana = timezone.make_aware(datetime.combine(campana.fecha_fin, time.max))
+        
+        proyeccion = []
+        for tipo_contrato in campana.tipo_contrato:
+            stock_actual = stock.get(tipo_contrato) or 0
+            tasa = (consumo_ventana.get(tipo_contrato) or 0) / ventana
+            
+            agotamiento = None
+            if stock_actual <= 0:
+                agotamiento = ahora
+            elif tasa > 0:
+                agotamiento = ahora + timedelta(hours=stock_actual / tasa)
+            
+            proyeccion.append({
+                'sucursal': campana.sucursal,
+                'tipo_contrato': tipo_contrato,
+                'stock_disponible': stock_actual,
+                'pendientes_por_retirar': pendientes.get(tipo_contrato, 0),
+                'entregas_por_hora': round(tasa, 2),
+                'agotamiento_estimado': agotamiento,
+                'alcanza_hasta_fin': agotamiento is None or agotamiento > fin_campana,
+                'alcanza_para_pendientes': stock_actual >= pendientes.get(tipo_contrato, 0),
+            })
+        
+        return Response({
+            'campana_id': campana.id,
+            'fecha_fin': campana.fecha_fin,
+            'ventana_horas': ventana,
+            'serie': serie,
+            'proyeccion': proyeccion,
+        })
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer que retorna la línea en vez de guardarla"""
+    
+    def write(self, valor):
+        return valor
+
+
+class ValidarTrabajadoresMasivoView(APIView):
+    """
+    Pre-validación masiva de RUTs contra las campañas vigentes y el stock.
+    
+    POST /api/validar-trabajadores/masivo/
+    Body JSON: {"ruts": ["12345678-9", ...]} o {"ruts": "texto pegado, uno por línea"}
+    Multipart: archivo .csv / .xlsx (columna 'rut' o la primera) o .txt
+    
+    ?formato=csv retorna el resultado como CSV en streaming (para listas grandes).
+    """
+    permission_classes = [IsAuthenticated]
+    
+    MAXIMO_RUTS = 50000
+    
+    def post(self, request):
+        try:
+            ruts = self._leer_ruts(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not ruts:
+            return Response(
+                {'error': 'Debe enviar una lista de RUTs o un archivo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if len(ruts) > self.MAXIMO_RUTS:
+            return Response(
+                {'error': f'Máximo {self.MAXIMO_RUTS} RUTs por solicitud'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if request.query_params.get('formato') == 'csv':
+            writer = csv.writer(_Eco())
+            
+            def filas():
+                yield writer.writerow(['rut', 'veredicto', 'campana_id'])
+                for resultado in evaluar_ruts(ruts, tamano_lote=1000):
+                    yield writer.writerow([
+                        resultado['rut'],
+                        resultado['veredicto'],
+                        resultado['campana_id'] or ''
+                    ])
+            
+            response = StreamingHttpResponse(filas(), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = 'attachment; filename="validacion_ruts.csv"'
+            return response
+        
+        resultados = list(evaluar_ruts(ruts))
+        conteo = Counter(resultado['veredicto'] for resultado in resultados)
+        
+        return Response({
+            'total': len(resultados),
+            'resumen': {veredicto: conteo.get(veredicto, 0) for veredicto in VEREDICTOS},
+            'resultados': resultados,
+        })
+    
+    def _leer_ruts(self, request):
+        """Lista de RUTs desde el archivo subido o el campo 'ruts'"""
+        archivo = request.FILES.get('archivo')
+        
+        if archivo:
+            nombre = archivo.name.lower()
+            
+            if nombre.endswith('.txt'):
+                texto = archivo.read().decode('utf-8-sig', errors='ignore')
+                return [linea.split(',')[0] for linea in texto.splitlines() if linea.strip()]
+            
+            from trabajadores.importacion import ImportacionError, leer_archivo
+            try:
+                df = leer_archivo(archivo, nombre)
+            except ImportacionError as e:
+                raise ValueError(str(e))
+            
+            columnas = [str(col).strip().lower() for col in df.columns]
+            if 'rut' in columnas:
+                valores = df.iloc[:, columnas.index('rut')]
+            else:
+                # Sin encabezado: la primera fila también es un RUT
+                valores = [df.columns[0], *df.iloc[:, 0]]
+            return [str(valor) for valor in valores if str(valor).strip() and str(valor) != 'nan']
+        
+        ruts = request.data.get('ruts')
+        if isinstance(ruts, str):
+            return [rut for rut in re.split(r'[\s,;]+', ruts) if rut]
+        if isinstance(ruts, list):
+            return [str(rut) for rut in ruts]
+        if ruts is not None:
+            raise ValueError('El campo ruts debe ser una lista o texto')
+        return []
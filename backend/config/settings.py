@@ -4,7 +4,7 @@ Django settings for config project.
 
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
     'supervisor',
     'campanas',
     'configuracion',
+    'tareas',
 ]
 
 MIDDLEWARE = [
@@ -141,6 +143,100 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Sistema QR
+# Cantidad máxima de imágenes QR renderizadas que se mantienen en memoria (LRU)
+QR_RENDER_CACHE_SIZE = config('QR_RENDER_CACHE_SIZE', default=2048, cast=int)
+
+# Email
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Tres Montes <no-reply@tresmontes.cl>')
+
+# Envío masivo de QR: conexiones SMTP simultáneas, mensajes por lote,
+# tasa máxima (0 = sin límite), reintentos y backoff base en segundos
+QR_EMAIL_CONCURRENCIA = config('QR_EMAIL_CONCURRENCIA', default=4, cast=int)
+QR_EMAIL_TAMANO_LOTE = config('QR_EMAIL_TAMANO_LOTE', default=100, cast=int)
+QR_EMAIL_MAX_POR_SEGUNDO = config('QR_EMAIL_MAX_POR_SEGUNDO', default=20, cast=float)
+QR_EMAIL_REINTENTOS = config('QR_EMAIL_REINTENTOS', default=3, cast=int)
+QR_EMAIL_BACKOFF = config('QR_EMAIL_BACKOFF', default=1.0, cast=float)
+
+# Tareas en segundo plano (manage.py run_workers)
+# Minutos sin latido tras los cuales una tarea 'en_proceso' se considera abandonada
+TAREAS_TIMEOUT_MINUTOS = config('TAREAS_TIMEOUT_MINUTOS', default=30, cast=int)
+# Cada cuántos segundos el worker refresca el latido de la tarea en curso (muy por debajo del timeout)
+TAREAS_LATIDO_SEGUNDOS = config('TAREAS_LATIDO_SEGUNDOS', default=60, cast=int)
+# Veces que se reclama una tarea abandonada antes de darla por fallida (p. ej. una que tumba al worker)
+TAREAS_MAX_INTENTOS = config('TAREAS_MAX_INTENTOS', default=3, cast=int)
+
+# Caché. Con varios procesos (gunicorn/uvicorn workers) debe ser compartida para que
+# las invalidaciones lleguen a todos, p. ej.:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Campañas: segundos máximos que un proceso reutiliza el índice de elegibilidad
+# compilado sin reconstruirlo (cota de seguridad si se pierde una invalidación)
+CAMPANAS_ELEGIBILIDAD_TTL = config('CAMPANAS_ELEGIBILIDAD_TTL', default=300, cast=int)
+
+# Supervisor: segundos que se reutilizan las estadísticas del panel (se descartan
+# al guardar o eliminar una incidencia; el TTL refleja las que vencen sin cambios)
+SUPERVISOR_ESTADISTICAS_TTL = config('SUPERVISOR_ESTADISTICAS_TTL', default=30, cast=int)
+# Incidencias por página en el listado del supervisor (?por_pagina=) y máximo permitido
+SUPERVISOR_INCIDENCIAS_POR_PAGINA = config('SUPERVISOR_INCIDENCIAS_POR_PAGINA', default=50, cast=int)
+SUPERVISOR_INCIDENCIAS_POR_PAGINA_MAXIMA = config('SUPERVISOR_INCIDENCIAS_POR_PAGINA_MAXIMA', default=200, cast=int)
+
+# Imágenes de evidencia de incidencias: lado mayor del original y lado de la miniatura
+# (px), calidad JPEG, y tamaño hasta el que se procesan en la petición (las más
+# grandes van a la cola de tareas, ver incidencias/imagenes.py)
+INCIDENCIAS_IMAGEN_LADO_MAXIMO = config('INCIDENCIAS_IMAGEN_LADO_MAXIMO', default=1600, cast=int)
+INCIDENCIAS_MINIATURA_LADO = config('INCIDENCIAS_MINIATURA_LADO', default=320, cast=int)
+INCIDENCIAS_IMAGEN_CALIDAD = config('INCIDENCIAS_IMAGEN_CALIDAD', default=82, cast=int)
+INCIDENCIAS_IMAGEN_MAXIMO_EN_LINEA = config('INCIDENCIAS_IMAGEN_MAXIMO_EN_LINEA', default=1024 * 1024, cast=int)
+
+# Notificaciones: segundos de vida del contador de no leídas por usuario en caché
+# (se ajusta en cada cambio; el TTL solo corrige posibles desvíos)
+NOTIFICACIONES_CONTADOR_TTL = config('NOTIFICACIONES_CONTADOR_TTL', default=300, cast=int)
+
+# Umbrales de stock por caja que generan una alerta al cruzarlos hacia abajo
+# (la prioridad es alta con 5 o menos cajas)
+NOTIFICACIONES_UMBRALES_STOCK = config('NOTIFICACIONES_UMBRALES_STOCK', default='10,5', cast=Csv(int))
+
+# Notificaciones en vivo (SSE, requiere servir con ASGI: uvicorn/daphne config.asgi:application).
+# Con varios workers usar el backend Redis para que los eventos lleguen a todos:
+#   NOTIFICACIONES_EVENTOS_BACKEND=notificaciones.eventos.BackendRedis
+#   NOTIFICACIONES_EVENTOS_REDIS_URL=redis://127.0.0.1:6379/2
+NOTIFICACIONES_EVENTOS_BACKEND = config('NOTIFICACIONES_EVENTOS_BACKEND', default='notificaciones.eventos.BackendMemoria')
+NOTIFICACIONES_EVENTOS_REDIS_URL = config('NOTIFICACIONES_EVENTOS_REDIS_URL', default='redis://127.0.0.1:6379/2')
+# Segundos sin eventos tras los que se envía un comentario para mantener viva la conexión
+NOTIFICACIONES_SSE_KEEPALIVE = config('NOTIFICACIONES_SSE_KEEPALIVE', default=15, cast=int)
+# Eventos en cola por conexión; si un cliente se atrasa más, se descartan
+NOTIFICACIONES_SSE_COLA_MAXIMA = config('NOTIFICACIONES_SSE_COLA_MAXIMA', default=100, cast=int)
+
+# Tamaño de página del listado de notificaciones (?limit=) y máximo permitido
+NOTIFICACIONES_PAGINA = config('NOTIFICACIONES_PAGINA', default=50, cast=int)
+NOTIFICACIONES_PAGINA_MAXIMA = config('NOTIFICACIONES_PAGINA_MAXIMA', default=200, cast=int)
+
+# Segundos durante los que se agrupan las notificaciones de trabajador nuevo, stock
+# bajo e incidencia nueva de un mismo tipo y audiencia en una sola (0 = sin agrupar)
+NOTIFICACIONES_AGRUPAR_SEGUNDOS = config('NOTIFICACIONES_AGRUPAR_SEGUNDOS', default=5, cast=float)
+
+# Retención: días que se conservan las notificaciones (en PostgreSQL se eliminan
+# particiones mensuales completas, ver notificaciones/particiones.py), meses futuros
+# con partición creada por adelantado y filas por lote al borrar el resto
+NOTIFICACIONES_RETENCION_DIAS = config('NOTIFICACIONES_RETENCION_DIAS', default=90, cast=int)
+NOTIFICACIONES_PARTICIONES_ADELANTE = config('NOTIFICACIONES_PARTICIONES_ADELANTE', default=3, cast=int)
+NOTIFICACIONES_RETENCION_LOTE = config('NOTIFICACIONES_RETENCION_LOTE', default=5000, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SUCURSAL_TO_SEDE = {
+    'casablanca': 'Casablanca',
+    'valparaiso_bif': 'Valparaíso – Planta BIF',
+    'valparaiso_bic': 'Valparaíso – Planta BIC',
+}
+
+
+def asignar_campanas(apps, schema_editor):
+    """
+    Asocia las entregas existentes a su campaña con el criterio anterior
+    (sede, contrato, área y rango de fechas) y calcula los contadores.
+    Si las campañas se traslapan, la entrega queda en la más antigua.
+    """
+    CampanaEntrega = apps.get_model('campanas', 'CampanaEntrega')
+    Entrega = apps.get_model('entregas', 'Entrega')
+    Trabajador = apps.get_model('trabajadores', 'Trabajador')
+
+    for campana in CampanaEntrega.objects.order_by('fecha_creacion'):
+        sede = SUCURSAL_TO_SEDE.get(campana.sucursal, campana.sucursal)
+
+        entregas = Entrega.objects.filter(
+            campana__isnull=True,
+            trabajador__sede=sede,
+            trabajador__tipo_contrato__in=campana.tipo_contrato,
+            fecha_entrega__date__gte=campana.fecha_inicio,
+            fecha_entrega__date__lte=campana.fecha_fin
+        )
+        elegibles = Trabajador.objects.filter(
+            sede=sede,
+            tipo_contrato__in=campana.tipo_contrato,
+            activo=True
+        )
+        if campana.tipo_entrega == 'grupo':
+            entregas = entregas.filter(trabajador__area__in=campana.areas_seleccionadas)
+            elegibles = elegibles.filter(area__in=campana.areas_seleccionadas)
+
+        entregas.update(campana=campana)
+
+        CampanaEntrega.objects.filter(pk=campana.pk).update(
+            trabajadores_elegibles_total=elegibles.count(),
+            entregas_realizadas_total=Entrega.objects.filter(campana=campana, estado='entregado').count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campanas', '0003_campanaentrega_entregas_realizadas_total_and_more'),
+        ('entregas', '0002_initial'),
+        ('trabajadores', '0003_trabajador_qr_codigo_trabajador_qr_fecha_generacion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entrega',
+            name='campana',
+            field=models.ForeignKey(blank=True, help_text='Campaña vigente bajo la cual se realizó la entrega', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entregas', to='campanas.campanaentrega', verbose_name='Campaña'),
+        ),
+        migrations.RunPython(asignar_campanas, migrations.RunPython.noop),
+    ]
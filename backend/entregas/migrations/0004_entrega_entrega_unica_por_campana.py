@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def marcar_duplicadas(apps, schema_editor):
+    """
+    Deja una sola entrega 'entregado' por trabajador y campaña (la primera).
+    Las repetidas pasan a 'no_entregado' con una observación, para que la
+    restricción pueda crearse sin perder el histórico.
+    """
+    Entrega = apps.get_model('entregas', 'Entrega')
+
+    duplicados = Entrega.objects.filter(
+        campana__isnull=False,
+        estado='entregado'
+    ).values('campana', 'trabajador').annotate(
+        total=Count('id'),
+        primera=Min('id')
+    ).filter(total__gt=1)
+
+    for fila in duplicados:
+        repetidas = Entrega.objects.filter(
+            campana=fila['campana'],
+            trabajador=fila['trabajador'],
+            estado='entregado'
+        ).exclude(pk=fila['primera'])
+
+        for entrega in repetidas:
+            entrega.estado = 'no_entregado'
+            entrega.observaciones = (
+                f"{entrega.observaciones}\n" if entrega.observaciones else ''
+            ) + 'Entrega duplicada en la campaña'
+            entrega.save(update_fields=['estado', 'observaciones'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cajas', '0001_initial'),
+        ('campanas', '0005_consumohorario'),
+        ('entregas', '0003_entrega_campana'),
+        ('trabajadores', '0004_remove_trabajador_estado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(marcar_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='entrega',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado', 'entregado')), fields=('campana', 'trabajador'), name='entrega_unica_por_campana', violation_error_message='El trabajador ya retiró su caja en esta campaña'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from trabajadores.models import Trabajador
 from cajas.models import Caja
 from usuarios.models import Usuario
+from campanas.models import CampanaEntrega
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
@@ -31,6 +32,15 @@ class Entrega(models.Model):
         verbose_name='Caja Entregada',
         help_text='Caja específica que se entrega'
     )
+    campana = models.ForeignKey(
+        CampanaEntrega,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='entregas',
+        verbose_name='Campaña',
+        help_text='Campaña vigente bajo la cual se realizó la entrega'
+    )
     guardia = models.ForeignKey(
         Usuario, 
         on_delete=models.SET_NULL, 
@@ -98,6 +108,16 @@ class Entrega(models.Model):
             models.Index(fields=['guardia', '-fecha_entrega']),
             models.Index(fields=['estado']),
         ]
+        constraints = [
+            # Estado de retiro por campaña: una sola entrega efectiva por trabajador.
+            # El índice parcial también sirve para consultar si ya retiró.
+            models.UniqueConstraint(
+                fields=['campana', 'trabajador'],
+                condition=models.Q(estado='entregado'),
+                name='entrega_unica_por_campana',
+                violation_error_message='El trabajador ya retiró su caja en esta campaña'
+            ),
+        ]
     
     def clean(self):
         """
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from django.db import transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from .models import Entrega
 from trabajadores.serializers import TrabajadorSerializer
@@ -7,6 +8,32 @@ from cajas.serializers import CajaSerializer
 from usuarios.serializers import UsuarioSerializer
 from cajas.models import Caja
 from trabajadores.models import Trabajador
+from campanas.elegibilidad import obtener_indice
+
+def crear_entrega(**datos):
+    """
+    Crea la entrega en la campaña vigente del trabajador, traduciendo la
+    restricción de una entrega por trabajador y campaña a un error de validación.
+    Sin campaña vigente no se entrega: la restricción no cubre campana NULL.
+    """
+    campana_id = obtener_indice().campana_vigente_para(datos['trabajador'])
+    if campana_id is None:
+        raise serializers.ValidationError({
+            'trabajador': 'No hay campañas activas para este trabajador'
+        })
+    datos['campana_id'] = campana_id
+    
+    try:
+        with transaction.atomic():
+            return Entrega.objects.create(**datos)
+    except IntegrityError:
+        raise serializers.ValidationError({
+            'trabajador': 'El trabajador ya retiró su caja en esta campaña'
+        })
+    except DjangoValidationError as e:
+        # full_clean() en Entrega.save(): 400 en vez de 500
+        raise serializers.ValidationError(serializers.as_serializer_error(e))
+
 
 class EntregaSerializer(serializers.ModelSerializer):
     """
@@ -30,7 +57,8 @@ class EntregaSerializer(serializers.ModelSerializer):
             'fecha_entrega', 
             'validado_supervisor', 
             'fecha_validacion',
-            'supervisor'
+            'supervisor',
+            'campana'
         )
     
     def validate_trabajador(self, value):
@@ -101,22 +129,18 @@ class EntregaSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Crear entrega y descontar automáticamente del inventario.
-        También actualiza el estado del trabajador a 'retirado'.
+        El estado de retiro del trabajador en la campaña se actualiza
+        por señal (campanas.MiembroCampana).
         Usa transacción atómica para garantizar consistencia.
         """
         caja = validated_data.get('caja')
-        trabajador = validated_data.get('trabajador')
         
         # Crear la entrega
-        entrega = Entrega.objects.create(**validated_data)
+        entrega = crear_entrega(**validated_data)
         
         # Descontar del inventario de manera atómica
-        caja.cantidad_disponible -= 1
-        caja.save(update_fields=['cantidad_disponible'])
-        
-        # Actualizar estado del trabajador a 'retirado'
-        trabajador.estado = 'retirado'
-        trabajador.save(update_fields=['estado'])
+        if caja.descontar() is None:
+            raise serializers.ValidationError({'caja': 'No hay stock disponible de esta caja'})
         
         return entrega
 
@@ -264,7 +288,7 @@ class EntregaCreateSerializer(serializers.Serializer):
         guardia = self.context['request'].user
         
         # Crear la entrega
-        entrega = Entrega.objects.create(
+        entrega = crear_entrega(
             trabajador=trabajador,
             caja=caja,
             guardia=guardia,
@@ -275,12 +299,8 @@ class EntregaCreateSerializer(serializers.Serializer):
         )
         
         # Descontar stock
-        caja.cantidad_disponible -= 1
-        caja.save(update_fields=['cantidad_disponible'])
-        
-        # Actualizar estado del trabajador
-        trabajador.estado = 'retirado'
-        trabajador.save(update_fields=['estado'])
+        if caja.descontar() is None:
+            raise serializers.ValidationError({'caja': 'No hay stock disponible de esta caja'})
         
         return entrega
 
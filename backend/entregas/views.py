@@ -18,6 +18,7 @@ from trabajadores.models import Trabajador
 from trabajadores.serializers import TrabajadorSerializer
 from cajas.models import Caja
 from cajas.serializers import CajaSerializer
+from campanas.elegibilidad import obtener_indice
 
 class EntregaViewSet(viewsets.ModelViewSet):
     """
@@ -237,7 +238,7 @@ class EntregaViewSet(viewsets.ModelViewSet):
         Retorna:
         - Información completa del trabajador
         - Última entrega recibida
-        - Validación si ya retiró caja
+        - Validación de campaña vigente y si ya retiró caja
         """
         rut = request.data.get('rut')
         qr_code = request.data.get('qr_code')
@@ -255,35 +256,37 @@ class EntregaViewSet(viewsets.ModelViewSet):
             else:
                 trabajador = Trabajador.objects.get(rut=rut, activo=True)
             
-            # VALIDACIÓN: Verificar si ya retiró su caja
-            if trabajador.estado == 'retirado':
+            # Campaña vigente del trabajador (índice en memoria, sin consultas)
+            campana_id = obtener_indice().campana_vigente_para(trabajador)
+            
+            # VALIDACIÓN: Sin campaña vigente no puede retirar
+            if campana_id is None:
                 return Response(
                     {
-                        'error': 'Este trabajador ya retiró su caja',
+                        'error': 'No hay campañas activas para este trabajador',
                         'trabajador': {
                             'nombre': trabajador.nombre_completo,
-                            'rut': trabajador.rut,
-                            'estado': 'retirado'
+                            'rut': trabajador.rut
                         }
                     },
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Verificar si tiene entregas activas
-            entregas_activas = Entrega.objects.filter(
+            # VALIDACIÓN: Verificar si ya retiró su caja en esa campaña
+            if Entrega.objects.filter(
+                campana_id=campana_id,
                 trabajador=trabajador,
-                estado__in=['entregado', 'pendiente']
-            ).count()
-            
-            if entregas_activas > 0:
+                estado='entregado'
+            ).exists():
                 return Response(
                     {
-                        'error': 'Este trabajador ya tiene una entrega registrada',
+                        'error': 'Este trabajador ya retiró su caja',
                         'trabajador': {
                             'nombre': trabajador.nombre_completo,
                             'rut': trabajador.rut,
-                            'entregas_activas': entregas_activas
-                        }
+                            'estado': 'retirado'
+                        },
+                        'campana_id': campana_id
                     },
                     status=status.HTTP_400_BAD_REQUEST
                 )
@@ -297,6 +300,7 @@ class EntregaViewSet(viewsets.ModelViewSet):
             trabajador_data = TrabajadorSerializer(trabajador).data
             trabajador_data['ultima_entrega'] = None
             trabajador_data['puede_recibir_caja'] = True
+            trabajador_data['campana_id'] = campana_id
             
             if ultima_entrega:
                 trabajador_data['ultima_entrega'] = {
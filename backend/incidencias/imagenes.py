@@ -0,0 +1,143 @@
+"""
+Procesamiento de las imágenes de evidencia de incidencias.
+
+Las fotos llegan desde el celular del guardia: varios MB, con EXIF (GPS,
+modelo del equipo) y rotadas según la orientación del sensor. Al subirlas:
+
+- se aplica la orientación EXIF y se descartan todos los metadatos
+- el original se reduce a INCIDENCIAS_IMAGEN_LADO_MAXIMO y se recomprime en JPEG
+- se genera una miniatura cuadrada de INCIDENCIAS_MINIATURA_LADO para los listados
+
+Las imágenes de hasta INCIDENCIAS_IMAGEN_MAXIMO_EN_LINEA bytes se procesan en
+la misma petición; las más grandes, en la cola de tareas
+('incidencias_procesar_imagen'). Mientras tanto la incidencia no tiene
+miniatura y los listados muestran solo la imagen original.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+
+class ImagenInvalida(Exception):
+    """El archivo no es una imagen que Pillow pueda abrir"""
+
+
+def _a_rgb(imagen):
+    """JPEG no admite transparencia: se compone sobre fondo blanco"""
+    if imagen.mode in ('RGBA', 'LA', 'P'):
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        return fondo
+    return imagen.convert('RGB')
+
+
+def _jpeg(imagen):
+    buffer = BytesIO()
+    # Sin exif= ni icc_profile= Pillow no escribe metadatos
+    imagen.save(buffer, 'JPEG', quality=settings.INCIDENCIAS_IMAGEN_CALIDAD, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def validar(archivo):
+    """Verifica que el archivo subido sea una imagen. Raises ImagenInvalida"""
+    try:
+        Image.open(archivo).verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ImagenInvalida(f'El archivo no es una imagen válida: {e}')
+    finally:
+        archivo.seek(0)
+
+
+def procesar(archivo):
+    """
+    Reduce, limpia y recomprime una imagen.
+
+    Args:
+        archivo: Archivo abierto (UploadedFile, FieldFile, ...)
+
+    Returns:
+        (bytes del original procesado, bytes de la miniatura), ambos JPEG
+
+    Raises:
+        ImagenInvalida: si el archivo no es una imagen
+    """
+    try:
+        imagen = Image.open(archivo)
+        imagen.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImagenInvalida(f'El archivo no es una imagen válida: {e}')
+
+    imagen = _a_rgb(ImageOps.exif_transpose(imagen))
+
+    lado = settings.INCIDENCIAS_IMAGEN_LADO_MAXIMO
+    original = imagen.copy()
+    original.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+
+    lado = settings.INCIDENCIAS_MINIATURA_LADO
+    miniatura = ImageOps.fit(imagen, (lado, lado), Image.Resampling.LANCZOS)
+
+    return _jpeg(original), _jpeg(miniatura)
+
+
+def procesar_evidencia(incidencia):
+    """
+    Reemplaza la imagen de evidencia por su versión procesada y guarda la
+    miniatura. Retorna False si la incidencia no tiene imagen.
+    """
+    from .models import Incidencia
+
+    campo = incidencia.imagen_evidencia
+    if not campo:
+        return False
+
+    with campo.open('rb') as archivo:
+        original, miniatura = procesar(archivo)
+
+    anterior = campo.name
+    nombre = os.path.splitext(os.path.basename(anterior))[0] + '.jpg'
+    campo.save(nombre, ContentFile(original), save=False)
+    incidencia.imagen_miniatura.save(nombre, ContentFile(miniatura), save=False)
+
+    # update() en vez de save(): no recalcula SLA ni búsqueda ni vuelve a disparar post_save
+    Incidencia.objects.filter(pk=incidencia.pk).update(
+        imagen_evidencia=campo.name,
+        imagen_miniatura=incidencia.imagen_miniatura.name
+    )
+    if anterior != campo.name:
+        campo.storage.delete(anterior)
+    return True
+
+
+def programar(incidencia):
+    """
+    Procesa la evidencia ahora si es pequeña, o encola una tarea al
+    confirmarse la transacción si supera INCIDENCIAS_IMAGEN_MAXIMO_EN_LINEA.
+
+    La incidencia ya está guardada: si la imagen no se puede procesar (p. ej.
+    un JPEG truncado que pasó la validación del ImageField) se registra y
+    se conserva el original, sin miniatura.
+    """
+    from tareas.models import Tarea
+
+    campo = incidencia.imagen_evidencia
+    if not campo:
+        return
+
+    if campo.size <= settings.INCIDENCIAS_IMAGEN_MAXIMO_EN_LINEA:
+        try:
+            procesar_evidencia(incidencia)
+        except (ImagenInvalida, OSError):
+            logger.exception('No se pudo procesar la evidencia de la incidencia %s', incidencia.pk)
+    else:
+        transaction.on_commit(
+            lambda: Tarea.encolar('incidencias_procesar_imagen', parametros={'incidencia_id': incidencia.pk})
+        )
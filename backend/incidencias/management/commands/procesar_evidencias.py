@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from incidencias.imagenes import ImagenInvalida, procesar_evidencia
+from incidencias.models import Incidencia
+
+
+class Command(BaseCommand):
+    help = 'Reduce las imágenes de evidencia sin procesar y genera sus miniaturas'
+
+    def handle(self, *args, **options):
+        pendientes = Incidencia.objects.exclude(imagen_evidencia='').exclude(
+            imagen_evidencia__isnull=True
+        ).filter(
+            # Las filas guardadas por el modelo tienen '' (no NULL) sin miniatura
+            Q(imagen_miniatura='') | Q(imagen_miniatura__isnull=True)
+        )
+
+        procesadas = 0
+        for incidencia in pendientes.iterator():
+            try:
+                procesar_evidencia(incidencia)
+                procesadas += 1
+            except (ImagenInvalida, OSError) as e:
+                self.stderr.write(f'  Incidencia {incidencia.pk}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Imágenes procesadas: {procesadas}'))
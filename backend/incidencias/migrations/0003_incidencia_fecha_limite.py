@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:05
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+SLA_POR_PRIORIDAD = {
+    'critica': timedelta(hours=2),
+    'alta': timedelta(hours=4),
+    'media': timedelta(hours=24),
+    'baja': timedelta(hours=48),
+}
+SLA_POR_DEFECTO = timedelta(hours=24)
+
+
+def calcular_fecha_limite(apps, schema_editor):
+    Incidencia = apps.get_model('incidencias', 'Incidencia')
+    for prioridad, sla in SLA_POR_PRIORIDAD.items():
+        Incidencia.objects.filter(prioridad=prioridad).update(fecha_limite=F('fecha_reporte') + sla)
+    Incidencia.objects.filter(fecha_limite__isnull=True).update(fecha_limite=F('fecha_reporte') + SLA_POR_DEFECTO)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidencias', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidencia',
+            name='fecha_limite',
+            field=models.DateTimeField(editable=False, help_text='Fecha de reporte más el plazo de su prioridad', null=True, verbose_name='Fecha Límite (SLA)'),
+        ),
+        migrations.RunPython(calcular_fecha_limite, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='incidencia',
+            name='fecha_limite',
+            field=models.DateTimeField(editable=False, help_text='Fecha de reporte más el plazo de su prioridad', verbose_name='Fecha Límite (SLA)'),
+        ),
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['estado', 'fecha_limite'], name='incidencia_sla_idx'),
+        ),
+    ]
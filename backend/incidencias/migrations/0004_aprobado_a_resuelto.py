@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:40
+
+from django.db import migrations
+
+
+def aprobado_a_resuelto(apps, schema_editor):
+    """El panel de supervisor guardaba 'aprobado', que no es un estado del modelo"""
+    Incidencia = apps.get_model('incidencias', 'Incidencia')
+    Incidencia.objects.filter(estado='aprobado').update(estado='resuelto')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidencias', '0003_incidencia_fecha_limite'),
+    ]
+
+    operations = [
+        migrations.RunPython(aprobado_a_resuelto, migrations.RunPython.noop),
+    ]
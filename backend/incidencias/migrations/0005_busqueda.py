@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Value
+
+
+def calcular_busqueda(apps, schema_editor):
+    """Mismo texto que Incidencia.textos_busqueda"""
+    Incidencia = apps.get_model('incidencias', 'Incidencia')
+    tipos = dict(Incidencia._meta.get_field('tipo').choices)
+
+    for incidencia in Incidencia.objects.select_related('trabajador').iterator(chunk_size=500):
+        principal = [
+            incidencia.descripcion,
+            tipos.get(incidencia.tipo, ''),
+            incidencia.tipo.replace('_', ' '),
+            incidencia.rut_trabajador_manual,
+        ]
+        trabajador = incidencia.trabajador
+        if trabajador:
+            principal += [trabajador.rut, trabajador.nombre, trabajador.apellido_paterno, trabajador.apellido_materno]
+
+        Incidencia.objects.filter(pk=incidencia.pk).update(busqueda=(
+            django.contrib.postgres.search.SearchVector(Value(' '.join(filter(None, principal))), config='spanish', weight='A')
+            + django.contrib.postgres.search.SearchVector(Value(incidencia.solucion or ''), config='spanish', weight='B')
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregas', '0004_entrega_entrega_unica_por_campana'),
+        ('incidencias', '0004_aprobado_a_resuelto'),
+        ('trabajadores', '0004_remove_trabajador_estado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidencia',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Descripción, tipo y trabajador (peso A) y solución (peso B)', null=True, verbose_name='Texto de Búsqueda'),
+        ),
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['busqueda'], name='incidencia_busqueda_idx'),
+        ),
+        migrations.RunPython(calcular_busqueda, migrations.RunPython.noop),
+    ]
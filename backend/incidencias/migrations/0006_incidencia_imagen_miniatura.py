@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidencias', '0005_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidencia',
+            name='imagen_miniatura',
+            field=models.ImageField(blank=True, editable=False, help_text='Generada desde la imagen de evidencia (ver imagenes.py)', null=True, upload_to='incidencias/miniaturas/%Y/%m/', verbose_name='Miniatura de Evidencia'),
+        ),
+        migrations.AlterField(
+            model_name='incidencia',
+            name='imagen_evidencia',
+            field=models.ImageField(blank=True, help_text='Foto del problema (opcional); se reduce y se le quitan los metadatos', null=True, upload_to='incidencias/%Y/%m/', verbose_name='Imagen de Evidencia'),
+        ),
+    ]
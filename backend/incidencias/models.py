@@ -1,9 +1,75 @@
+import re
+from datetime import timedelta
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import BooleanField, Case, F, Value, When
 from trabajadores.models import Trabajador
 from usuarios.models import Usuario
 from entregas.models import Entrega
 from django.utils import timezone
 
+
+# Estados en los que corre el SLA
+ESTADOS_ABIERTOS = ['pendiente', 'en_proceso']
+
+# Plazo de resolución por prioridad
+SLA_POR_PRIORIDAD = {
+    'critica': timedelta(hours=2),
+    'alta': timedelta(hours=4),
+    'media': timedelta(hours=24),
+    'baja': timedelta(hours=48),
+}
+SLA_POR_DEFECTO = timedelta(hours=24)
+
+# Configuración de texto de PostgreSQL para la búsqueda (stemming en español)
+CONFIG_BUSQUEDA = 'spanish'
+
+PALABRA = re.compile(r'\w+')
+
+
+class IncidenciaQuerySet(models.QuerySet):
+    """Consultas de SLA resueltas en la BD sobre (estado, fecha_limite)"""
+
+    def abiertas(self):
+        return self.filter(estado__in=ESTADOS_ABIERTOS)
+
+    def vencidas(self, ahora=None):
+        return self.abiertas().filter(fecha_limite__lt=ahora or timezone.now())
+
+    def con_vencimiento(self, ahora=None):
+        """Anota `vencida` (abierta y fuera de plazo)"""
+        return self.annotate(vencida=Case(
+            When(estado__in=ESTADOS_ABIERTOS, fecha_limite__lt=ahora or timezone.now(), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField()
+        ))
+
+    def vencidas_primero(self, ahora=None):
+        """Vencidas primero; dentro de cada grupo, la de plazo más próximo"""
+        return self.con_vencimiento(ahora).order_by('-vencida', 'fecha_limite')
+
+    def buscar(self, texto):
+        """
+        Búsqueda de texto completo sobre la columna `busqueda` (índice GIN),
+        ordenada por relevancia. Cada palabra se busca como prefijo, así
+        'resp' encuentra 'respaldo' y '1234' un RUT que empieza así.
+        """
+        palabras = PALABRA.findall(texto)
+        if not palabras:
+            return self.none()
+
+        consulta = SearchQuery(
+            ' & '.join(f'{palabra}:*' for palabra in palabras),
+            config=CONFIG_BUSQUEDA,
+            search_type='raw'
+        )
+        return self.filter(busqueda=consulta).annotate(
+            relevancia=SearchRank(F('busqueda'), consulta)
+        ).order_by('-relevancia', '-fecha_reporte')
+
+
 class Incidencia(models.Model):
     """
     Modelo mejorado para registro de incidencias.
@@ -103,6 +169,11 @@ class Incidencia(models.Model):
         blank=True, 
         verbose_name='Fecha de Resolución'
     )
+    fecha_limite = models.DateTimeField(
+        editable=False,
+        verbose_name='Fecha Límite (SLA)',
+        help_text='Fecha de reporte más el plazo de su prioridad'
+    )
     
     # Solución
     solucion = models.TextField(
@@ -123,7 +194,15 @@ class Incidencia(models.Model):
         null=True,
         blank=True,
         verbose_name='Imagen de Evidencia',
-        help_text='Foto del problema (opcional)'
+        help_text='Foto del problema (opcional); se reduce y se le quitan los metadatos'
+    )
+    imagen_miniatura = models.ImageField(
+        upload_to='incidencias/miniaturas/%Y/%m/',
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Miniatura de Evidencia',
+        help_text='Generada desde la imagen de evidencia (ver imagenes.py)'
     )
     
     # Metadata
@@ -132,6 +211,12 @@ class Incidencia(models.Model):
         verbose_name='Notificado a Supervisor',
         help_text='Si se notificó al supervisor'
     )
+    busqueda = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Texto de Búsqueda',
+        help_text='Descripción, tipo y trabajador (peso A) y solución (peso B)'
+    )
     
     class Meta:
         verbose_name = 'Incidencia'
@@ -142,8 +227,16 @@ class Incidencia(models.Model):
             models.Index(fields=['estado', '-fecha_reporte']),
             models.Index(fields=['prioridad', 'estado']),
             models.Index(fields=['guardia', '-fecha_reporte']),
+            # Abiertas fuera de plazo: estado IN (...) AND fecha_limite < ahora
+            models.Index(fields=['estado', 'fecha_limite'], name='incidencia_sla_idx'),
+            GinIndex(fields=['busqueda'], name='incidencia_busqueda_idx'),
         ]
     
+    objects = IncidenciaQuerySet.as_manager()
+    
+    # Campos que alimentan la columna de búsqueda (ver textos_busqueda)
+    CAMPOS_BUSQUEDA = {'descripcion', 'tipo', 'solucion', 'rut_trabajador_manual', 'trabajador', 'trabajador_id'}
+    
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.estado} - {self.fecha_reporte.strftime('%d/%m/%Y')}"
     
@@ -152,17 +245,61 @@ class Incidencia(models.Model):
         Sobrescribir save para:
         - Asignar prioridad automática si no se especificó
         - Actualizar fecha de resolución cuando se resuelve
+        - Calcular la fecha límite del SLA según la prioridad
+        - Recalcular la búsqueda solo si se guardó algún campo indexado
         """
         # Asignar prioridad automática
         if not self.pk and not self.prioridad:
             self.asignar_prioridad_automatica()
         
+        # fecha_reporte se fija al insertar (auto_now_add); la diferencia es despreciable
+        self.fecha_limite = (self.fecha_reporte or timezone.now()) + self.sla
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'prioridad' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'fecha_limite'}
+        
         # Actualizar fecha de resolución
         if self.estado == 'resuelto' and not self.fecha_resolucion:
             self.fecha_resolucion = timezone.now()
         
+        # Imagen recién subida: la miniatura anterior ya no corresponde
+        imagen_nueva = bool(self.imagen_evidencia) and not self.imagen_evidencia._committed
+        if imagen_nueva:
+            self.imagen_miniatura = None
+        
         super().save(*args, **kwargs)
-    
+        if update_fields is None or self.CAMPOS_BUSQUEDA & set(update_fields):
+            self.actualizar_busqueda()
+        
+        if imagen_nueva:
+            from .imagenes import programar
+            programar(self)
+
+    def textos_busqueda(self):
+        """(texto principal, texto secundario) que se indexan para la búsqueda"""
+        principal = [
+            self.descripcion,
+            self.get_tipo_display(),
+            self.tipo.replace('_', ' '),
+            self.rut_trabajador_manual,
+        ]
+        if self.trabajador:
+            principal += [
+                self.trabajador.rut,
+                self.trabajador.nombre,
+                self.trabajador.apellido_paterno,
+                self.trabajador.apellido_materno,
+            ]
+        return ' '.join(filter(None, principal)), self.solucion or ''
+
+    def actualizar_busqueda(self):
+        """Recalcula la columna de búsqueda (se llama al guardar)"""
+        principal, secundario = self.textos_busqueda()
+        Incidencia.objects.filter(pk=self.pk).update(busqueda=(
+            SearchVector(Value(principal), config=CONFIG_BUSQUEDA, weight='A')
+            + SearchVector(Value(secundario), config=CONFIG_BUSQUEDA, weight='B')
+        ))
+
     def asignar_prioridad_automatica(self):
         """
         Asignar prioridad según tipo de incidencia.
@@ -220,6 +357,11 @@ class Incidencia(models.Model):
         self.supervisor = supervisor
         self.save(update_fields=['estado', 'supervisor'])
     
+    @property
+    def sla(self):
+        """Plazo de resolución según la prioridad"""
+        return SLA_POR_PRIORIDAD.get(self.prioridad, SLA_POR_DEFECTO)
+    
     @property
     def tiempo_sin_resolver(self):
         """
@@ -236,24 +378,10 @@ class Incidencia(models.Model):
     @property
     def esta_vencida(self):
         """
-        Determina si la incidencia está vencida según SLA.
-        
-        SLA por prioridad:
-        - Crítica: 2 horas
-        - Alta: 4 horas
-        - Media: 24 horas
-        - Baja: 48 horas
+        Determina si la incidencia está vencida según SLA (ver SLA_POR_PRIORIDAD).
+        En consultas usar Incidencia.objects.vencidas() / con_vencimiento().
         """
-        if self.estado in ['resuelto', 'rechazado']:
+        if self.estado not in ESTADOS_ABIERTOS:
             return False
         
-        tiempo = self.tiempo_sin_resolver
-        
-        sla = {
-            'critica': timezone.timedelta(hours=2),
-            'alta': timezone.timedelta(hours=4),
-            'media': timezone.timedelta(hours=24),
-            'baja': timezone.timedelta(hours=48),
-        }
-        
-        return tiempo > sla.get(self.prioridad, timezone.timedelta(hours=24))
+        return timezone.now() > self.fecha_limite
@@ -52,9 +52,11 @@ class IncidenciaSerializer(serializers.ModelSerializer):
             'estado_display',
             'fecha_reporte',
             'fecha_resolucion',
+            'fecha_limite',
             'solucion',
             'rut_trabajador_manual',
             'imagen_evidencia',
+            'imagen_miniatura',
             'notificado',
             'tiempo_sin_resolver',
             'esta_vencida'
@@ -65,6 +67,7 @@ class IncidenciaSerializer(serializers.ModelSerializer):
             'guardia', 
             'supervisor',
             'fecha_resolucion',
+            'fecha_limite',
             'notificado',
             'prioridad'
         ]
@@ -147,7 +150,8 @@ class IncidenciaListSerializer(serializers.ModelSerializer):
             'prioridad',
             'prioridad_display',
             'fecha_reporte',
-            'descripcion'
+            'descripcion',
+            'imagen_miniatura'
         ]
 
 
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from trabajadores.models import Trabajador
+from .models import Incidencia
+
+
+# ========== BÚSQUEDA ==========
+
+@receiver(post_save, sender=Trabajador)
+def actualizar_busqueda_trabajador(sender, instance, created, **kwargs):
+    """El RUT y el nombre del trabajador forman parte del texto de búsqueda"""
+    if created:
+        return
+    for incidencia in Incidencia.objects.filter(trabajador=instance).select_related('trabajador'):
+        incidencia.actualizar_busqueda()
@@ -0,0 +1,16 @@
+from tareas.registro import registrar_tarea
+
+from .imagenes import procesar_evidencia
+from .models import Incidencia
+
+
+@registrar_tarea('incidencias_procesar_imagen')
+def tarea_procesar_imagen(tarea):
+    """Reduce la imagen de evidencia y genera su miniatura"""
+    incidencia = Incidencia.objects.get(pk=tarea.parametros['incidencia_id'])
+
+    # Ya procesada (tarea repetida) o imagen reemplazada por otra más chica
+    if incidencia.imagen_miniatura:
+        return {'procesada': False}
+
+    return {'procesada': procesar_evidencia(incidencia)}
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from .imagenes import ImagenInvalida, validar as validar_imagen
 from .models import Incidencia
 from .serializers import IncidenciaSerializer
 from trabajadores.models import Trabajador
@@ -63,6 +64,13 @@ class IncidenciaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Validar imagen (se procesa al guardar, ver imagenes.py)
+        if imagen:
+            try:
+                validar_imagen(imagen)
+            except ImagenInvalida as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
         # Validar trabajador si se proporciona RUT
         trabajador = None
         rut_manual = None
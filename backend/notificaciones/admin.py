@@ -9,12 +9,12 @@ class NotificacionAdmin(admin.ModelAdmin):
         'tipo',
         'titulo',
         'prioridad',
-        'leida',
+        'sucursal',
         'creado_en',
     ]
     list_filter = [
         'tipo',
-        'leida',
+        'sucursal',
         'prioridad',
         'creado_en',
     ]
@@ -24,7 +24,6 @@ class NotificacionAdmin(admin.ModelAdmin):
     ]
     readonly_fields = [
         'creado_en',
-        'leida_en',
     ]
     list_per_page = 50
     
@@ -36,11 +35,8 @@ class NotificacionAdmin(admin.ModelAdmin):
             'fields': ('datos_extra',),
             'classes': ('collapse',)
         }),
-        ('Estado', {
-            'fields': ('leida', 'leida_en')
-        }),
         ('Destinatario', {
-            'fields': ('usuario_destinatario',),
+            'fields': ('usuario_destinatario', 'sucursal'),
             'classes': ('collapse',)
         }),
         ('Auditoría', {
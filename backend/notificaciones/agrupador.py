@@ -0,0 +1,136 @@
+"""
+Agrupación de notificaciones en ráfagas.
+
+En una importación masiva o en plena jornada de entregas, crear_trabajador_nuevo,
+crear_stock_bajo y crear_incidencia_nueva pueden dispararse cientos de veces
+en segundos. En vez de un INSERT (y un aviso en pantalla) por cada una, se
+acumulan por (tipo, destinatario, sucursal) durante NOTIFICACIONES_AGRUPAR_SEGUNDOS
+y al vencer la ventana se escribe una sola notificación por grupo: la original
+si hubo una, o una agregada con el detalle en datos_extra['elementos'].
+
+Las notificaciones se acumulan al confirmarse la transacción que las originó
+(si se revierte, no se crean). Lo pendiente se escribe también al terminar
+el proceso (atexit), de modo que un worker que se detiene ordenadamente no
+pierde nada; `vaciar()` fuerza la escritura en cualquier momento.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Títulos de la notificación agregada, por tipo ({n}: cantidad agrupada)
+TITULOS_AGRUPADOS = {
+    'trabajador_nuevo': '👤 {n} Nuevos Trabajadores Registrados',
+    'stock_bajo': '⚠️ {n} Alertas de Stock Bajo',
+    'incidencia_nueva': '{n} Nuevas Incidencias Reportadas',
+}
+
+# Mensajes individuales que se citan en el mensaje agregado
+MENSAJES_CITADOS = 3
+
+# Detalle guardado en datos_extra['elementos'] de la notificación agregada
+MAXIMO_ELEMENTOS = 100
+
+PRIORIDADES = ['baja', 'media', 'alta']
+
+
+def agrupar(pendientes):
+    """Campos de una sola notificación que resume `pendientes` (mismo tipo y audiencia)"""
+    if len(pendientes) == 1:
+        return pendientes[0]
+
+    primera = pendientes[0]
+    n = len(pendientes)
+    citados = '; '.join(campos['mensaje'] for campos in pendientes[:MENSAJES_CITADOS])
+    if n > MENSAJES_CITADOS:
+        citados += f' y {n - MENSAJES_CITADOS} más'
+
+    return {
+        'tipo': primera['tipo'],
+        'titulo': TITULOS_AGRUPADOS.get(primera['tipo'], '{n} Notificaciones').format(n=n),
+        'mensaje': citados,
+        'prioridad': max((campos['prioridad'] for campos in pendientes), key=PRIORIDADES.index),
+        'usuario_destinatario_id': primera.get('usuario_destinatario_id'),
+        'sucursal': primera.get('sucursal'),
+        'datos_extra': {
+            'agrupadas': n,
+            'elementos': [campos.get('datos_extra', {}) for campos in pendientes[:MAXIMO_ELEMENTOS]],
+        },
+    }
+
+
+class Agrupador:
+    """Buffer de notificaciones pendientes del proceso actual"""
+
+    def __init__(self):
+        self._grupos = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._registrado_atexit = False
+
+    def agregar(self, campos):
+        """Acumula una notificación (dict de campos de Notificacion)"""
+        clave = (campos['tipo'], campos.get('usuario_destinatario_id'), campos.get('sucursal'))
+
+        with self._lock:
+            self._grupos.setdefault(clave, []).append(campos)
+            if not self._registrado_atexit:
+                atexit.register(self.vaciar)
+                self._registrado_atexit = True
+            if self._timer is None:
+                self._timer = threading.Timer(settings.NOTIFICACIONES_AGRUPAR_SEGUNDOS, self._vencer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def vaciar(self):
+        """Escribe todo lo pendiente. Retorna las notificaciones creadas"""
+        from .models import Notificacion
+
+        with self._lock:
+            grupos, self._grupos = self._grupos, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        creadas = []
+        for pendientes in grupos.values():
+            try:
+                creadas.append(Notificacion.objects.create(**agrupar(pendientes)))
+            except Exception:
+                logger.exception('No se pudieron escribir %s notificaciones agrupadas', len(pendientes))
+        return creadas
+
+    def _vencer(self):
+        """Fin de la ventana, en el hilo del timer (con su propia conexión)"""
+        close_old_connections()
+        try:
+            self.vaciar()
+        finally:
+            connection.close()
+
+
+_agrupador = Agrupador()
+
+
+def emitir(campos):
+    """
+    Crea la notificación o la deja en el buffer si la agrupación está activa.
+    Retorna la notificación creada, o None si quedó pendiente.
+    """
+    from .models import Notificacion
+
+    if settings.NOTIFICACIONES_AGRUPAR_SEGUNDOS <= 0:
+        return Notificacion.objects.create(**campos)
+
+    transaction.on_commit(lambda: _agrupador.agregar(campos))
+    return None
+
+
+def vaciar():
+    """Escribe ya las notificaciones pendientes (p. ej. al final de una importación)"""
+    return _agrupador.vaciar()
@@ -0,0 +1,90 @@
+"""
+Contador de notificaciones no leídas por usuario, guardado en la caché.
+
+El badge del frontend consulta `/notificaciones/no-leidas/` cada pocos
+segundos; con el contador en caché esa consulta no toca la BD. El valor se
+calcula con un COUNT la primera vez (o al expirar) y luego se ajusta:
+
+- +1 a la audiencia al crear una notificación (signals.py)
+- -1 al usuario que la marca como leída
+- 0 al usuario que marca todas como leídas
+- al eliminar una notificación se descartan los contadores de su audiencia
+  (no se sabe quiénes ya la habían leído)
+
+Los ajustes solo tocan claves existentes; si falta una, la siguiente
+lectura la recalcula. NOTIFICACIONES_CONTADOR_TTL acota cualquier deriva.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from usuarios.models import Usuario
+from . import eventos
+
+
+def clave(usuario_id):
+    return f'notificaciones:no_leidas:{usuario_id}'
+
+
+def obtener(usuario):
+    """Cantidad de notificaciones no leídas visibles para el usuario"""
+    from .models import Notificacion
+
+    total = cache.get(clave(usuario.pk))
+    if total is None:
+        total = Notificacion.objects.para_usuario(usuario).no_leidas(usuario).count()
+        cache.add(clave(usuario.pk), total, timeout=settings.NOTIFICACIONES_CONTADOR_TTL)
+    return max(total, 0)
+
+
+def audiencia(usuario_destinatario_id=None, sucursal=None):
+    """IDs de los usuarios que ven una notificación con esos datos"""
+    if usuario_destinatario_id:
+        return [usuario_destinatario_id]
+
+    usuarios = Usuario.objects.all()
+    if sucursal:
+        # Quien no tiene sucursal ve las de todas
+        usuarios = usuarios.filter(Q(sucursal=sucursal) | Q(sucursal=''))
+    return list(usuarios.values_list('id', flat=True))
+
+
+def ajustar(usuarios_ids, delta):
+    """Suma delta a los contadores ya cacheados, al confirmar la transacción"""
+    if not usuarios_ids or not delta:
+        return
+
+    def aplicar():
+        for usuario_id in usuarios_ids:
+            try:
+                cache.incr(clave(usuario_id), delta)
+            except ValueError:
+                # Clave ausente: se recalculará en la próxima lectura
+                pass
+
+    transaction.on_commit(aplicar)
+    for usuario_id in usuarios_ids:
+        eventos.publicar(f'usuario:{usuario_id}', 'no_leidas')
+
+
+def ajustar_notificacion(notificacion, delta):
+    ajustar(audiencia(notificacion.usuario_destinatario_id, notificacion.sucursal), delta)
+
+
+def invalidar(usuarios_ids):
+    """Descarta los contadores para que se recalculen en la próxima lectura"""
+    if not usuarios_ids:
+        return
+
+    transaction.on_commit(lambda: cache.delete_many([clave(usuario_id) for usuario_id in usuarios_ids]))
+    for usuario_id in usuarios_ids:
+        eventos.publicar(f'usuario:{usuario_id}', 'no_leidas')
+
+
+def reiniciar(usuario_id, total=0):
+    """Fija el contador del usuario (p. ej. tras marcar todas como leídas)"""
+    transaction.on_commit(
+        lambda: cache.set(clave(usuario_id), total, timeout=settings.NOTIFICACIONES_CONTADOR_TTL)
+    )
+    eventos.publicar(f'usuario:{usuario_id}', 'no_leidas')
@@ -0,0 +1,183 @@
+"""
+Difusión de eventos en vivo (notificaciones, no leídas, entregas) hacia las
+conexiones SSE abiertas en `/notificaciones/stream/`.
+
+Los eventos se publican en canales:
+
+- 'usuario:<id>'       dirigidos a un usuario
+- 'sucursal:<codigo>'  para quienes pertenecen a esa sucursal
+- 'todos'              para cualquier usuario conectado
+
+El backend se elige con NOTIFICACIONES_EVENTOS_BACKEND:
+
+- BackendMemoria (por defecto): reparte solo dentro del proceso actual;
+  basta con un único worker ASGI.
+- BackendRedis: publica en Redis y cada proceso reparte a sus propias
+  conexiones, de modo que varios workers reciben los mismos eventos.
+  Requiere el paquete `redis`.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+def canales_de(usuario):
+    """Canales que escucha la conexión de un usuario"""
+    canales = [f'usuario:{usuario.pk}', 'todos']
+    if getattr(usuario, 'sucursal', None):
+        canales.append(f'sucursal:{usuario.sucursal}')
+    return canales
+
+
+def canal_audiencia(usuario_destinatario_id=None, sucursal=None):
+    """Canal que alcanza a la misma audiencia que Notificacion.objects.para_usuario"""
+    if usuario_destinatario_id:
+        return f'usuario:{usuario_destinatario_id}'
+    if sucursal:
+        return f'sucursal:{sucursal}'
+    return 'todos'
+
+
+class Suscripcion:
+    """Cola asyncio de una conexión, alimentada desde cualquier hilo"""
+
+    def __init__(self, canales, maximo):
+        self.canales = canales
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=maximo)
+
+    def entregar(self, evento):
+        """Llamado desde el hilo que publica"""
+        self.loop.call_soon_threadsafe(self._poner, evento)
+
+    def _poner(self, evento):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: se descarta y el cliente se resincroniza al reconectar
+            pass
+
+    async def siguiente(self, timeout):
+        """Próximo evento o None si pasa `timeout` segundos sin eventos"""
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BackendMemoria:
+    """Reparte los eventos entre las suscripciones del proceso actual"""
+
+    def __init__(self):
+        self._suscripciones = {}
+        self._lock = threading.Lock()
+
+    def suscribir(self, canales):
+        """Debe llamarse desde el event loop de la conexión"""
+        suscripcion = Suscripcion(canales, settings.NOTIFICACIONES_SSE_COLA_MAXIMA)
+        with self._lock:
+            for canal in canales:
+                self._suscripciones.setdefault(canal, set()).add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            for canal in suscripcion.canales:
+                suscritas = self._suscripciones.get(canal)
+                if suscritas:
+                    suscritas.discard(suscripcion)
+                    if not suscritas:
+                        del self._suscripciones[canal]
+
+    def publicar(self, canal, evento):
+        self.repartir(canal, evento)
+
+    def repartir(self, canal, evento):
+        with self._lock:
+            suscritas = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscritas:
+            try:
+                suscripcion.entregar(evento)
+            except RuntimeError:
+                # Event loop ya cerrado (conexión terminando)
+                self.cancelar(suscripcion)
+
+
+class BackendRedis(BackendMemoria):
+    """
+    Publica en Redis (pub/sub) y reparte localmente lo recibido.
+    Un hilo por proceso escucha todos los canales del prefijo.
+    """
+
+    PREFIJO = 'notificaciones:eventos:'
+
+    def __init__(self):
+        super().__init__()
+        import redis
+
+        self._redis = redis.Redis.from_url(settings.NOTIFICACIONES_EVENTOS_REDIS_URL)
+        self._escuchando = False
+
+    def suscribir(self, canales):
+        self._iniciar_escucha()
+        return super().suscribir(canales)
+
+    def publicar(self, canal, evento):
+        self._redis.publish(self.PREFIJO + canal, json.dumps(evento, cls=DjangoJSONEncoder))
+
+    def _iniciar_escucha(self):
+        with self._lock:
+            if self._escuchando:
+                return
+            self._escuchando = True
+        threading.Thread(target=self._escuchar, name='notificaciones-eventos', daemon=True).start()
+
+    def _escuchar(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.PREFIJO + '*')
+                for mensaje in pubsub.listen():
+                    canal = mensaje['channel'].decode()[len(self.PREFIJO):]
+                    self.repartir(canal, json.loads(mensaje['data']))
+            except Exception:
+                logger.exception('Escucha de eventos en Redis interrumpida; reconectando')
+                threading.Event().wait(1)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def obtener_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.NOTIFICACIONES_EVENTOS_BACKEND)()
+    return _backend
+
+
+def publicar(canal, tipo, datos=None):
+    """
+    Publica un evento al confirmarse la transacción actual.
+    Los errores del backend se registran y no afectan la operación que publica.
+    """
+    evento = {'tipo': tipo, 'datos': datos or {}}
+
+    def enviar():
+        try:
+            obtener_backend().publicar(canal, evento)
+        except Exception:
+            logger.exception('No se pudo publicar el evento %s en %s', tipo, canal)
+
+    transaction.on_commit(enviar)
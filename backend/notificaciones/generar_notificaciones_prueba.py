@@ -34,7 +34,7 @@ print("✅ Notificación de stock bajo (alta prioridad) creada")
 
 # 3. Stock bajo - Media prioridad
 Notificacion.crear_stock_bajo(
-    sucursal='Valparaíso BIF',
+    sucursal='Valparaíso – Planta BIF',
     tipo_contrato='Plazo Fijo',
     cantidad=8
 )
@@ -0,0 +1,40 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notificaciones.resumen import generar_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera la notificación de resumen de entregas de cada día pendiente '
+        '(por defecto, desde el último día resumido hasta ayer)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=date.fromisoformat,
+            help='Primer día a resumir (AAAA-MM-DD); los ya resumidos se omiten'
+        )
+        parser.add_argument(
+            '--hasta',
+            type=date.fromisoformat,
+            help='Último día a resumir (AAAA-MM-DD, por defecto ayer)'
+        )
+
+    def handle(self, *args, **options):
+        desde = options['desde']
+        hasta = options['hasta']
+
+        if desde and hasta and desde > hasta:
+            raise CommandError('--desde debe ser anterior o igual a --hasta')
+
+        resultado = generar_resumenes(desde=desde, hasta=hasta)
+
+        for resumen in resultado['resumidos']:
+            self.stdout.write(f"  {resumen['fecha']}: {resumen['total']} entregas")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Días resumidos: {len(resultado['resumidos'])} (omitidos: {resultado['omitidos']})"
+        ))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notificaciones.particiones import asegurar_particiones, purgar
+
+
+class Command(BaseCommand):
+    help = (
+        'Crea las particiones mensuales de notificaciones de los próximos meses '
+        'y elimina las notificaciones fuera del período de retención'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            help='Días que se conservan (por defecto NOTIFICACIONES_RETENCION_DIAS)'
+        )
+        parser.add_argument(
+            '--meses-adelante',
+            type=int,
+            help='Meses futuros con partición (por defecto NOTIFICACIONES_PARTICIONES_ADELANTE)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            help='Filas por lote al borrar fuera de particiones (por defecto NOTIFICACIONES_RETENCION_LOTE)'
+        )
+        parser.add_argument(
+            '--sin-purgar',
+            action='store_true',
+            help='Solo crear particiones'
+        )
+
+    def handle(self, *args, **options):
+        for opcion in ('dias', 'meses_adelante', 'lote'):
+            if options[opcion] is not None and options[opcion] < 0:
+                raise CommandError(f"--{opcion.replace('_', '-')} no puede ser negativo")
+
+        for nombre in asegurar_particiones(options['meses_adelante']):
+            self.stdout.write(f'  Partición creada: {nombre}')
+
+        if options['sin_purgar']:
+            return
+
+        resultado = purgar(dias=options['dias'], tamano_lote=options['lote'])
+
+        for nombre in resultado['particiones']:
+            self.stdout.write(f'  Partición eliminada: {nombre}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Notificaciones eliminadas: {resultado['eliminadas']}"
+        ))
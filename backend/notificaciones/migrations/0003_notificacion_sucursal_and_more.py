@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+SUCURSALES = {
+    'casablanca': 'Casablanca',
+    'valparaiso_bif': 'Valparaíso – Planta BIF',
+    'valparaiso_bic': 'Valparaíso – Planta BIC',
+}
+
+
+def copiar_sucursal(apps, schema_editor):
+    """Copia datos_extra['sucursal'] (código o nombre completo) a la columna"""
+    Notificacion = apps.get_model('notificaciones', 'Notificacion')
+
+    for codigo, nombre in SUCURSALES.items():
+        Notificacion.objects.filter(
+            datos_extra__sucursal__in=[codigo, nombre]
+        ).update(sucursal=codigo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0002_alter_notificacion_options_remove_notificacion_leido_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='sucursal',
+            field=models.CharField(blank=True, choices=[('casablanca', 'Casablanca'), ('valparaiso_bif', 'Valparaíso – Planta BIF'), ('valparaiso_bic', 'Valparaíso – Planta BIC')], help_text='Si es None, es para todas las sucursales', max_length=50, null=True, verbose_name='Sucursal'),
+        ),
+        migrations.RunPython(copiar_sucursal, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['sucursal', 'usuario_destinatario', '-creado_en'], include=('leida', 'tipo', 'prioridad'), name='notif_audiencia_idx'),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copiar_lecturas(apps, schema_editor):
+    """
+    Convierte el indicador global `leida` en lecturas por usuario: una
+    notificación leída queda leída para cada usuario que podía verla.
+    """
+    Notificacion = apps.get_model('notificaciones', 'Notificacion')
+    LecturaNotificacion = apps.get_model('notificaciones', 'LecturaNotificacion')
+    Usuario = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    usuarios = list(Usuario.objects.values_list('id', 'sucursal'))
+    lecturas = []
+
+    leidas = Notificacion.objects.filter(leida=True).values_list(
+        'id', 'usuario_destinatario_id', 'sucursal', 'leida_en', 'creado_en'
+    )
+    for notificacion_id, destinatario_id, sucursal, leida_en, creado_en in leidas.iterator():
+        if destinatario_id:
+            audiencia = [destinatario_id]
+        else:
+            audiencia = [
+                usuario_id for usuario_id, sucursal_usuario in usuarios
+                if not sucursal or not sucursal_usuario or sucursal_usuario == sucursal
+            ]
+        lecturas.extend(
+            LecturaNotificacion(
+                notificacion_id=notificacion_id,
+                usuario_id=usuario_id,
+                leida_en=leida_en or creado_en
+            )
+            for usuario_id in audiencia
+        )
+
+        if len(lecturas) >= 5000:
+            LecturaNotificacion.objects.bulk_create(lecturas, ignore_conflicts=True)
+            lecturas = []
+
+    LecturaNotificacion.objects.bulk_create(lecturas, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0003_notificacion_sucursal_and_more'),
+        ('usuarios', '0002_usuario_sucursal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LecturaNotificacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leida_en', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de Lectura')),
+            ],
+            options={
+                'verbose_name': 'Lectura de Notificación',
+                'verbose_name_plural': 'Lecturas de Notificaciones',
+                'db_table': 'notificaciones_lecturas',
+            },
+        ),
+        migrations.CreateModel(
+            name='MarcaLectura',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='marca_lectura', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+                ('leidas_hasta', models.DateTimeField(verbose_name='Leídas Hasta')),
+                ('actualizado_en', models.DateTimeField(verbose_name='Fecha de Marca')),
+            ],
+            options={
+                'verbose_name': 'Marca de Lectura',
+                'verbose_name_plural': 'Marcas de Lectura',
+                'db_table': 'notificaciones_marcas_lectura',
+            },
+        ),
+        migrations.AddField(
+            model_name='lecturanotificacion',
+            name='notificacion',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lecturas', to='notificaciones.notificacion', verbose_name='Notificación'),
+        ),
+        migrations.AddField(
+            model_name='lecturanotificacion',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lecturas_notificaciones', to=settings.AUTH_USER_MODEL, verbose_name='Usuario'),
+        ),
+        migrations.AddConstraint(
+            model_name='lecturanotificacion',
+            constraint=models.UniqueConstraint(fields=('usuario', 'notificacion'), name='lectura_unica'),
+        ),
+        migrations.RunPython(copiar_lecturas, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='notificacion',
+            name='notificacio_leida_5b016b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notificacion',
+            name='notif_audiencia_idx',
+        ),
+        migrations.RemoveField(
+            model_name='notificacion',
+            name='leida',
+        ),
+        migrations.RemoveField(
+            model_name='notificacion',
+            name='leida_en',
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['sucursal', 'usuario_destinatario', '-creado_en'], include=('tipo', 'prioridad'), name='notif_audiencia_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 20:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cajas', '0001_initial'),
+        ('notificaciones', '0004_lecturanotificacion_marcalectura_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertaStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('umbral', models.PositiveIntegerField(verbose_name='Umbral')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Alerta')),
+                ('caja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas_stock', to='cajas.caja', verbose_name='Caja')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Stock',
+                'verbose_name_plural': 'Alertas de Stock',
+                'db_table': 'notificaciones_alertas_stock',
+                'constraints': [models.UniqueConstraint(fields=('caja', 'umbral'), name='alerta_stock_unica')],
+            },
+        ),
+    ]
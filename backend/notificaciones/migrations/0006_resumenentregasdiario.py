@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 20:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0005_alertastock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenEntregasDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True, verbose_name='Fecha')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total de Entregas')),
+                ('por_sucursal', models.JSONField(blank=True, default=dict, verbose_name='Entregas por Sucursal')),
+                ('generado_en', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Generación')),
+                ('notificacion', models.ForeignKey(blank=True, help_text='Vacía si el día no tuvo entregas', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='notificaciones.notificacion', verbose_name='Notificación')),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Entregas',
+                'verbose_name_plural': 'Resúmenes Diarios de Entregas',
+                'db_table': 'notificaciones_resumenes_entregas',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:16
+
+from datetime import date, datetime, time
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Meses con partición creada más allá del actual
+MESES_ADELANTE = 3
+
+
+def _mes_siguiente(mes):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _limite(mes):
+    inicio = timezone.make_aware(datetime.combine(mes, time.min), timezone.get_current_timezone())
+    return f"'{inicio.isoformat()}'"
+
+
+def particionar(apps, schema_editor):
+    """
+    Recrea `notificaciones` como tabla particionada por rango de creado_en,
+    con una partición por mes (notificaciones_pAAAAMM) y una por defecto.
+    La clave primaria pasa a ser (id, creado_en), como exige PostgreSQL;
+    el id sigue saliendo de una secuencia única.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = 'notificaciones' "
+            "AND indexname <> 'notificaciones_pkey'"
+        )
+        indices = [fila[0] for fila in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = 'notificaciones'::regclass AND contype = 'f'"
+        )
+        claves_foraneas = cursor.fetchall()
+        cursor.execute("SELECT min(creado_en) FROM notificaciones")
+        primera = cursor.fetchone()[0]
+
+        cursor.execute("ALTER TABLE notificaciones RENAME TO notificaciones_anterior")
+        cursor.execute(
+            "CREATE TABLE notificaciones (LIKE notificaciones_anterior "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (creado_en)"
+        )
+
+        mes = timezone.localtime(primera or timezone.now()).date().replace(day=1)
+        ultimo = timezone.localdate().replace(day=1)
+        for _ in range(MESES_ADELANTE):
+            ultimo = _mes_siguiente(ultimo)
+        while mes <= ultimo:
+            cursor.execute(
+                f"CREATE TABLE notificaciones_p{mes:%Y%m} PARTITION OF notificaciones "
+                f"FOR VALUES FROM ({_limite(mes)}) TO ({_limite(_mes_siguiente(mes))})"
+            )
+            mes = _mes_siguiente(mes)
+        cursor.execute("CREATE TABLE notificaciones_pdefault PARTITION OF notificaciones DEFAULT")
+
+        cursor.execute("INSERT INTO notificaciones SELECT * FROM notificaciones_anterior")
+        cursor.execute("DROP TABLE notificaciones_anterior")
+
+        cursor.execute("CREATE SEQUENCE notificaciones_id_seq OWNED BY notificaciones.id")
+        cursor.execute(
+            "ALTER TABLE notificaciones ALTER COLUMN id SET DEFAULT nextval('notificaciones_id_seq')"
+        )
+        cursor.execute(
+            "SELECT setval('notificaciones_id_seq', COALESCE(max(id), 0) + 1, false) FROM notificaciones"
+        )
+        cursor.execute("ALTER TABLE notificaciones ADD PRIMARY KEY (id, creado_en)")
+
+        for indice in indices:
+            cursor.execute(indice)
+        for nombre, definicion in claves_foraneas:
+            cursor.execute(f"ALTER TABLE notificaciones ADD CONSTRAINT {nombre} {definicion}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0006_resumenentregasdiario'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lecturanotificacion',
+            name='notificacion',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='lecturas', to='notificaciones.notificacion', verbose_name='Notificación'),
+        ),
+        migrations.AlterField(
+            model_name='resumenentregasdiario',
+            name='notificacion',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Vacía si el día no tuvo entregas', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='notificaciones.notificacion', verbose_name='Notificación'),
+        ),
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,97 @@
+from datetime import datetime, timezone as dt_timezone
+
 from django.db import models
+from django.db.models import (
+    BooleanField, Case, DateTimeField, Exists, ExpressionWrapper, OuterRef, Q,
+    Subquery, Value, When
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from usuarios.models import Usuario
+from . import agrupador
+
+
+# Código de sucursal a partir del código o del nombre completo
+CODIGOS_SUCURSAL = {
+    **{codigo: codigo for codigo, _ in Usuario.SUCURSAL_CHOICES},
+    **{nombre: codigo for codigo, nombre in Usuario.SUCURSAL_CHOICES},
+}
+
+
+def codigo_sucursal(valor):
+    """'Valparaíso – Planta BIF' o 'valparaiso_bif' -> 'valparaiso_bif' (None si no aplica)"""
+    return CODIGOS_SUCURSAL.get(valor)
+
+
+# Marca de lectura de quien nunca marcó todas como leídas
+SIN_MARCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _leidas_hasta(usuario):
+    """Marca de lectura del usuario como expresión SQL (escalar, se evalúa una vez)"""
+    return Coalesce(
+        Subquery(MarcaLectura.objects.filter(usuario=usuario).values('leidas_hasta')[:1]),
+        Value(SIN_MARCA, output_field=DateTimeField())
+    )
+
+
+def _lectura(usuario):
+    return LecturaNotificacion.objects.filter(usuario=usuario, notificacion=OuterRef('pk'))
+
+
+def filtro_no_leida(usuario):
+    """
+    Q de las notificaciones no leídas por el usuario: posteriores a su marca
+    de lectura y sin lectura individual (anti-join sobre lectura_unica).
+    """
+    return Q(creado_en__gt=_leidas_hasta(usuario)) & ~Exists(_lectura(usuario))
+
+
+class NotificacionQuerySet(models.QuerySet):
+
+    def para_usuario(self, usuario):
+        """
+        Notificaciones visibles para el usuario: las dirigidas a él o a todos,
+        globales (sin sucursal) o de su sucursal.
+
+        Filtra solo por columnas del índice notif_audiencia_idx.
+        """
+        notificaciones = self.filter(
+            Q(usuario_destinatario=usuario) | Q(usuario_destinatario__isnull=True)
+        )
+
+        sucursal_usuario = getattr(usuario, 'sucursal', None)
+        if sucursal_usuario:
+            notificaciones = notificaciones.filter(
+                Q(sucursal__isnull=True) | Q(sucursal=sucursal_usuario)
+            )
+
+        return notificaciones
+
+    def no_leidas(self, usuario):
+        return self.filter(filtro_no_leida(usuario))
+
+    def con_lectura(self, usuario):
+        """Anota `leida` y `leida_en` según el estado de lectura del usuario"""
+        leidas_hasta = _leidas_hasta(usuario)
+        return self.annotate(
+            leida=ExpressionWrapper(~filtro_no_leida(usuario), output_field=BooleanField()),
+            leida_en=Coalesce(
+                Subquery(_lectura(usuario).values('leida_en')[:1]),
+                Case(When(
+                    creado_en__lte=leidas_hasta,
+                    then=Subquery(MarcaLectura.objects.filter(usuario=usuario).values('actualizado_en')[:1])
+                ))
+            )
+        )
 
 
 class Notificacion(models.Model):
     """
     Sistema de notificaciones para RRHH
+
+    En PostgreSQL la tabla está particionada por mes de creado_en; la
+    retención elimina particiones completas (ver particiones.py).
     """
     
     TIPO_CHOICES = [
@@ -48,13 +135,17 @@ class Notificacion(models.Model):
         verbose_name='Datos Adicionales',
         help_text='Información adicional en formato JSON'
     )
-    
-    # Estado
-    leida = models.BooleanField(
-        default=False,
-        verbose_name='Leída'
+    sucursal = models.CharField(
+        max_length=50,
+        choices=Usuario.SUCURSAL_CHOICES,
+        null=True,
+        blank=True,
+        verbose_name='Sucursal',
+        help_text='Si es None, es para todas las sucursales'
     )
     
+    # El estado de lectura es por usuario (LecturaNotificacion / MarcaLectura)
+    
     # Referencias opcionales
     usuario_destinatario = models.ForeignKey(
         Usuario,
@@ -71,11 +162,6 @@ class Notificacion(models.Model):
         auto_now_add=True,
         verbose_name='Fecha de Creación'
     )
-    leida_en = models.DateTimeField(
-        null=True,
-        blank=True,
-        verbose_name='Fecha de Lectura'
-    )
     
     class Meta:
         db_table = 'notificaciones'
@@ -85,19 +171,36 @@ class Notificacion(models.Model):
         indexes = [
             models.Index(fields=['-creado_en']),
             models.Index(fields=['tipo', '-creado_en']),
-            models.Index(fields=['leida', '-creado_en']),
+            # Audiencia (sucursal + destinatario); INCLUDE permite contar
+            # por tipo/prioridad sin leer la tabla (solo PostgreSQL)
+            models.Index(
+                fields=['sucursal', 'usuario_destinatario', '-creado_en'],
+                include=['tipo', 'prioridad'],
+                name='notif_audiencia_idx'
+            ),
         ]
     
+    objects = NotificacionQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.titulo}"
     
-    def marcar_como_leida(self):
-        """Marca la notificación como leída"""
-        from django.utils import timezone
-        if not self.leida:
-            self.leida = True
-            self.leida_en = timezone.now()
-            self.save()
+    def marcar_como_leida(self, usuario):
+        """
+        Marca la notificación como leída para el usuario.
+        Retorna True si no la había leído.
+        """
+        from . import contador
+        
+        no_leida = Notificacion.objects.filter(pk=self.pk).no_leidas(usuario).exists()
+        if no_leida:
+            lectura, no_leida = LecturaNotificacion.objects.get_or_create(usuario=usuario, notificacion=self)
+            self.leida_en = lectura.leida_en
+            if no_leida:
+                contador.ajustar([usuario.pk], -1)
+        
+        self.leida = True
+        return no_leida
     
     @property
     def icono(self):
@@ -134,7 +237,7 @@ class Notificacion(models.Model):
         return cls.objects.create(
             tipo='resumen_entregas',
             titulo=f'Resumen de Entregas - {fecha.strftime("%d/%m/%Y")}',
-            mensaje=f'Se realizaron {total_entregas} entregas hoy',
+            mensaje=f'Se realizaron {total_entregas} entregas ese día',
             prioridad='baja',
             datos_extra={
                 'fecha': fecha.isoformat(),
@@ -145,8 +248,13 @@ class Notificacion(models.Model):
     
     @classmethod
     def crear_incidencia_nueva(cls, incidencia):
-        """Crea una notificación para incidencia nueva"""
-        return cls.objects.create(
+        """
+        Crea una notificación para incidencia nueva.
+        Con NOTIFICACIONES_AGRUPAR_SEGUNDOS > 0 queda pendiente y retorna None
+        (ver agrupador.py); lo mismo vale para crear_stock_bajo y
+        crear_trabajador_nuevo.
+        """
+        return agrupador.emitir(dict(
             tipo='incidencia_nueva',
             titulo='Nueva Incidencia Reportada',
             mensaje=f'{incidencia.trabajador.nombre_completo} reportó: {incidencia.tipo_nombre}',
@@ -156,24 +264,30 @@ class Notificacion(models.Model):
                 'trabajador': incidencia.trabajador.nombre_completo,
                 'tipo': incidencia.tipo_nombre,
             }
-        )
+        ))
     
     @classmethod
     def crear_stock_bajo(cls, sucursal, tipo_contrato, cantidad):
-        """Crea una notificación de stock bajo"""
+        """
+        Crea una notificación de stock bajo, visible solo en su sucursal
+        
+        Args:
+            sucursal: Código o nombre completo de la sucursal
+        """
         prioridad = 'alta' if cantidad <= 5 else 'media'
         
-        return cls.objects.create(
+        return agrupador.emitir(dict(
             tipo='stock_bajo',
             titulo=f'⚠️ Stock Bajo - {sucursal}',
             mensaje=f'Solo quedan {cantidad} cajas tipo {tipo_contrato}',
             prioridad=prioridad,
+            sucursal=codigo_sucursal(sucursal),
             datos_extra={
                 'sucursal': sucursal,
                 'tipo_contrato': tipo_contrato,
                 'cantidad': cantidad
             }
-        )
+        ))
     
     @classmethod
     def crear_campana_vence(cls, campana, dias_restantes):
@@ -195,8 +309,8 @@ class Notificacion(models.Model):
     
     @classmethod
     def crear_trabajador_nuevo(cls, trabajador):
-        """Crea una notificación de trabajador nuevo"""
-        return cls.objects.create(
+        """Crea una notificación de trabajador nuevo (agrupable, ver crear_incidencia_nueva)"""
+        return agrupador.emitir(dict(
             tipo='trabajador_nuevo',
             titulo='👤 Nuevo Trabajador Registrado',
             mensaje=f'{trabajador.nombre_completo} necesita asignación de área',
@@ -207,4 +321,163 @@ class Notificacion(models.Model):
                 'rut': trabajador.rut,
                 'sede': trabajador.sede
             }
-        )
\ No newline at end of file
+        ))
+
+
+class LecturaNotificacion(models.Model):
+    """
+    Lectura individual de una notificación por un usuario.
+    Solo se guardan las posteriores a la MarcaLectura del usuario; al marcar
+    todas como leídas se eliminan las que quedan cubiertas por la marca.
+    """
+    
+    # Sin FK en la BD: la tabla de notificaciones está particionada por mes
+    # (ver particiones.py); al eliminar una partición se limpian sus lecturas
+    notificacion = models.ForeignKey(
+        Notificacion,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        related_name='lecturas',
+        verbose_name='Notificación'
+    )
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='lecturas_notificaciones',
+        verbose_name='Usuario'
+    )
+    leida_en = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de Lectura'
+    )
+    
+    class Meta:
+        db_table = 'notificaciones_lecturas'
+        verbose_name = 'Lectura de Notificación'
+        verbose_name_plural = 'Lecturas de Notificaciones'
+        constraints = [
+            # También es el índice del anti-join de no leídas
+            models.UniqueConstraint(fields=['usuario', 'notificacion'], name='lectura_unica'),
+        ]
+    
+    def __str__(self):
+        return f"{self.usuario} leyó #{self.notificacion_id}"
+
+
+class MarcaLectura(models.Model):
+    """
+    Marca de lectura de un usuario: todo lo creado hasta `leidas_hasta`
+    está leído. Marcar todas como leídas es un solo upsert de esta fila.
+    """
+    
+    usuario = models.OneToOneField(
+        Usuario,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='marca_lectura',
+        verbose_name='Usuario'
+    )
+    leidas_hasta = models.DateTimeField(
+        verbose_name='Leídas Hasta'
+    )
+    actualizado_en = models.DateTimeField(
+        verbose_name='Fecha de Marca'
+    )
+    
+    class Meta:
+        db_table = 'notificaciones_marcas_lectura'
+        verbose_name = 'Marca de Lectura'
+        verbose_name_plural = 'Marcas de Lectura'
+    
+    def __str__(self):
+        return f"{self.usuario} hasta {self.leidas_hasta:%d/%m/%Y %H:%M}"
+    
+    @classmethod
+    def marcar_todas(cls, usuario):
+        """Avanza la marca del usuario hasta ahora y descarta las lecturas ya cubiertas"""
+        ahora = timezone.now()
+        cls.objects.bulk_create(
+            [cls(usuario=usuario, leidas_hasta=ahora, actualizado_en=ahora)],
+            update_conflicts=True,
+            unique_fields=['usuario'],
+            update_fields=['leidas_hasta', 'actualizado_en']
+        )
+        # Una notificación se lee después de creada: leida_en <= ahora implica creado_en <= ahora
+        LecturaNotificacion.objects.filter(usuario=usuario, leida_en__lte=ahora).delete()
+        return ahora
+
+
+class AlertaStock(models.Model):
+    """
+    Umbral de stock bajo ya alertado para una caja. Mientras exista la fila
+    no se vuelve a alertar ese umbral; se elimina al reponer la caja.
+    """
+    
+    caja = models.ForeignKey(
+        'cajas.Caja',
+        on_delete=models.CASCADE,
+        related_name='alertas_stock',
+        verbose_name='Caja'
+    )
+    umbral = models.PositiveIntegerField(
+        verbose_name='Umbral'
+    )
+    creado_en = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Alerta'
+    )
+    
+    class Meta:
+        db_table = 'notificaciones_alertas_stock'
+        verbose_name = 'Alerta de Stock'
+        verbose_name_plural = 'Alertas de Stock'
+        constraints = [
+            models.UniqueConstraint(fields=['caja', 'umbral'], name='alerta_stock_unica'),
+        ]
+    
+    def __str__(self):
+        return f"{self.caja_id} <= {self.umbral}"
+
+
+class ResumenEntregasDiario(models.Model):
+    """
+    Resumen de entregas de un día ya generado (ver resumen.py).
+    La fecha única hace idempotente la generación y marca desde dónde seguir.
+    """
+    
+    fecha = models.DateField(
+        unique=True,
+        verbose_name='Fecha'
+    )
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Total de Entregas'
+    )
+    por_sucursal = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Entregas por Sucursal'
+    )
+    notificacion = models.ForeignKey(
+        Notificacion,
+        on_delete=models.SET_NULL,
+        db_constraint=False,  # Tabla particionada, ver LecturaNotificacion
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Notificación',
+        help_text='Vacía si el día no tuvo entregas'
+    )
+    generado_en = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Generación'
+    )
+    
+    class Meta:
+        db_table = 'notificaciones_resumenes_entregas'
+        verbose_name = 'Resumen Diario de Entregas'
+        verbose_name_plural = 'Resúmenes Diarios de Entregas'
+        ordering = ['-fecha']
+    
+    def __str__(self):
+        return f"Resumen {self.fecha:%d/%m/%Y}: {self.total} entregas"
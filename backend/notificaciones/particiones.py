@@ -0,0 +1,198 @@
+"""
+Particiones mensuales de la tabla `notificaciones` y retención.
+
+En PostgreSQL la tabla está particionada por rango de creado_en, con una
+partición por mes (notificaciones_pAAAAMM, límites a medianoche hora local)
+y una partición por defecto para lo que no calce en ninguna. La retención
+elimina particiones completas: DETACH + DROP cuesta lo mismo con 100 o con
+10 millones de filas.
+
+Lo que queda fuera de una partición completa (el mes parcial en el límite,
+la partición por defecto u otros motores de BD) se borra en lotes acotados.
+
+`manage.py mantener_notificaciones` crea las particiones de los próximos
+meses y aplica la retención; conviene programarlo a diario.
+"""
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+TABLA = 'notificaciones'
+PARTICION_DEFECTO = 'notificaciones_pdefault'
+PATRON_PARTICION = re.compile(r'^notificaciones_p(\d{4})(\d{2})$')
+
+
+def _mes_siguiente(mes):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _limite(mes):
+    """Medianoche local del primer día del mes, como literal SQL"""
+    inicio = timezone.make_aware(datetime.combine(mes, time.min), timezone.get_current_timezone())
+    return f"'{inicio.isoformat()}'"
+
+
+def nombre_particion(mes):
+    return f'notificaciones_p{mes:%Y%m}'
+
+
+def disponible():
+    """True si la tabla existe particionada (solo PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLA]
+        )
+        return cursor.fetchone() is not None
+
+
+def particiones():
+    """{primer día del mes: nombre} de las particiones mensuales existentes"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)", [TABLA]
+        )
+        nombres = [fila[0] for fila in cursor.fetchall()]
+
+    resultado = {}
+    for nombre in nombres:
+        coincidencia = PATRON_PARTICION.match(nombre)
+        if coincidencia:
+            resultado[date(int(coincidencia[1]), int(coincidencia[2]), 1)] = nombre
+    return resultado
+
+
+def crear_particion(mes):
+    """
+    Crea y adjunta la partición del mes. Si la partición por defecto tiene
+    filas de ese rango, se mueven primero (ATTACH lo exige).
+    """
+    nombre = nombre_particion(mes)
+    desde, hasta = _limite(mes), _limite(_mes_siguiente(mes))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {nombre} (LIKE {TABLA} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH movidas AS (DELETE FROM {PARTICION_DEFECTO} '
+            f'WHERE creado_en >= {desde} AND creado_en < {hasta} RETURNING *) '
+            f'INSERT INTO {nombre} SELECT * FROM movidas'
+        )
+        cursor.execute(f'ALTER TABLE {TABLA} ATTACH PARTITION {nombre} FOR VALUES FROM ({desde}) TO ({hasta})')
+
+    return nombre
+
+
+def asegurar_particiones(meses_adelante=None):
+    """Crea las particiones faltantes del mes actual y los siguientes. Retorna las creadas"""
+    if meses_adelante is None:
+        meses_adelante = settings.NOTIFICACIONES_PARTICIONES_ADELANTE
+    if not disponible():
+        return []
+
+    existentes = particiones()
+    mes = timezone.localdate().replace(day=1)
+    creadas = []
+
+    for _ in range(meses_adelante + 1):
+        if mes not in existentes:
+            creadas.append(crear_particion(mes))
+        mes = _mes_siguiente(mes)
+
+    return creadas
+
+
+def _limpiar_referencias(cursor, ids):
+    """
+    Borra lecturas y desvincula resúmenes de las notificaciones `ids`
+    (subconsulta o lista de IDs en SQL); sus FK no existen en la BD.
+    """
+    cursor.execute(f'DELETE FROM notificaciones_lecturas WHERE notificacion_id IN ({ids})')
+    cursor.execute(
+        f'UPDATE notificaciones_resumenes_entregas SET notificacion_id = NULL '
+        f'WHERE notificacion_id IN ({ids})'
+    )
+
+
+def _eliminar_particion(nombre):
+    """DETACH + DROP de la partición. Retorna las filas estimadas por la estadística"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)', [nombre])
+        estimadas = max(int(cursor.fetchone()[0]), 0)
+
+        _limpiar_referencias(cursor, f'SELECT id FROM {nombre}')
+        cursor.execute(f'ALTER TABLE {TABLA} DETACH PARTITION {nombre}')
+        cursor.execute(f'DROP TABLE {nombre}')
+
+    return estimadas
+
+
+def _eliminar_lote(limite, tamano_lote):
+    """Elimina hasta `tamano_lote` notificaciones anteriores a `limite`. Retorna cuántas"""
+    from .models import Notificacion
+
+    ids = list(
+        Notificacion.objects.filter(creado_en__lt=limite).order_by().values_list('id', flat=True)[:tamano_lote]
+    )
+    if not ids:
+        return 0
+
+    lista = ', '.join(str(int(notificacion_id)) for notificacion_id in ids)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # SQL directo: Collector.delete() enviaría post_delete fila por fila
+        _limpiar_referencias(cursor, lista)
+        cursor.execute(f'DELETE FROM {TABLA} WHERE id IN ({lista})')
+        return cursor.rowcount
+
+
+def purgar(dias=None, tamano_lote=None, max_lotes=None):
+    """
+    Elimina las notificaciones creadas hace más de `dias` días.
+
+    Primero las particiones mensuales que quedaron completas fuera de la
+    retención; luego, en lotes de `tamano_lote`, lo que quede (máximo
+    `max_lotes` lotes, sin límite si es None).
+
+    Returns:
+        Dict {'particiones': [...], 'eliminadas': n}. Para las particiones
+        se usa la estimación de filas de PostgreSQL.
+    """
+    from . import contador
+    from usuarios.models import Usuario
+
+    dias = settings.NOTIFICACIONES_RETENCION_DIAS if dias is None else dias
+    tamano_lote = tamano_lote or settings.NOTIFICACIONES_RETENCION_LOTE
+    limite = timezone.now() - timedelta(days=dias)
+
+    eliminadas = 0
+    particiones_eliminadas = []
+
+    if disponible():
+        limite_local = timezone.localtime(limite).date()
+        for mes, nombre in sorted(particiones().items()):
+            if _mes_siguiente(mes) > limite_local:
+                break
+            eliminadas += _eliminar_particion(nombre)
+            particiones_eliminadas.append(nombre)
+
+    lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        borradas = _eliminar_lote(limite, tamano_lote)
+        eliminadas += borradas
+        lotes += 1
+        if borradas < tamano_lote:
+            break
+
+    if eliminadas:
+        # Algunas podían estar sin leer
+        contador.invalidar(list(Usuario.objects.values_list('id', flat=True)))
+
+    return {
+        'particiones': particiones_eliminadas,
+        'eliminadas': eliminadas,
+    }
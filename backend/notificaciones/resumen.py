@@ -0,0 +1,113 @@
+"""
+Resumen diario de entregas (Notificacion tipo 'resumen_entregas').
+
+Cada día se resume con una consulta agrupada por sucursal sobre el rango
+[00:00, 24:00) hora local de fecha_entrega (índice -fecha_entrega). Los días
+resumidos quedan en ResumenEntregasDiario, así que volver a ejecutar no
+duplica nada y la siguiente ejecución continúa desde el último día resumido.
+
+Programar una vez al día, después de medianoche, por ejemplo con cron:
+
+    15 0 * * * python manage.py generar_resumen_entregas
+
+o encolando la tarea 'notificaciones_resumen_entregas'.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Notificacion, ResumenEntregasDiario
+
+
+def _rango_dia(fecha):
+    """Inicio y fin (exclusivo) del día en la zona horaria local"""
+    zona = timezone.get_current_timezone()
+    inicio = timezone.make_aware(datetime.combine(fecha, time.min), zona)
+    fin = timezone.make_aware(datetime.combine(fecha + timedelta(days=1), time.min), zona)
+    return inicio, fin
+
+
+def entregas_por_sucursal(fecha):
+    """{nombre de sucursal: entregas} del día, en una sola consulta"""
+    from cajas.models import Caja
+    from entregas.models import Entrega
+
+    nombres = dict(Caja.SUCURSAL_CHOICES)
+    inicio, fin = _rango_dia(fecha)
+
+    filas = Entrega.objects.filter(
+        fecha_entrega__gte=inicio,
+        fecha_entrega__lt=fin,
+        estado='entregado'
+    ).order_by().values_list('caja__sucursal').annotate(total=Count('id'))
+
+    return {
+        nombres.get(sucursal, sucursal or 'Sin sucursal'): total
+        for sucursal, total in filas
+    }
+
+
+def resumir_dia(fecha):
+    """
+    Genera el resumen del día si aún no existe.
+    Retorna el ResumenEntregasDiario creado, o None si ya estaba.
+    """
+    if ResumenEntregasDiario.objects.filter(fecha=fecha).exists():
+        return None
+
+    por_sucursal = entregas_por_sucursal(fecha)
+    total = sum(por_sucursal.values())
+
+    try:
+        with transaction.atomic():
+            notificacion = None
+            if total:
+                notificacion = Notificacion.crear_resumen_entregas(fecha, total, por_sucursal)
+            return ResumenEntregasDiario.objects.create(
+                fecha=fecha,
+                total=total,
+                por_sucursal=por_sucursal,
+                notificacion=notificacion
+            )
+    except IntegrityError:
+        # Otra ejecución concurrente lo generó primero; se revierte la notificación
+        return None
+
+
+def generar_resumenes(desde=None, hasta=None, progreso=None):
+    """
+    Resume los días pendientes entre `desde` y `hasta` (por defecto ayer).
+
+    Sin `desde` continúa desde el día siguiente al último resumido; si nunca
+    se ha resumido nada, solo resume `hasta`.
+
+    Returns:
+        Dict con los días resumidos y omitidos
+    """
+    hasta = hasta or timezone.localdate() - timedelta(days=1)
+
+    if desde is None:
+        ultimo = ResumenEntregasDiario.objects.order_by('-fecha').values_list('fecha', flat=True).first()
+        desde = ultimo + timedelta(days=1) if ultimo else hasta
+
+    dias = (hasta - desde).days + 1
+    resumidos = []
+    omitidos = 0
+
+    for indice in range(max(dias, 0)):
+        fecha = desde + timedelta(days=indice)
+        resumen = resumir_dia(fecha)
+        if resumen is None:
+            omitidos += 1
+        else:
+            resumidos.append({'fecha': fecha.isoformat(), 'total': resumen.total})
+
+        if progreso:
+            progreso(indice + 1, dias)
+
+    return {
+        'resumidos': resumidos,
+        'omitidos': omitidos,
+    }
@@ -8,6 +8,9 @@ class NotificacionSerializer(serializers.ModelSerializer):
     icono = serializers.CharField(read_only=True)
     color = serializers.CharField(read_only=True)
     tiempo_transcurrido = serializers.SerializerMethodField()
+    # Estado de lectura del usuario (anotado con Notificacion.objects.con_lectura)
+    leida = serializers.BooleanField(read_only=True, default=False)
+    leida_en = serializers.DateTimeField(read_only=True, default=None)
     
     class Meta:
         model = Notificacion
@@ -34,7 +37,8 @@ class NotificacionSerializer(serializers.ModelSerializer):
         from django.utils import timezone
         from datetime import timedelta
         
-        ahora = timezone.now()
+        # Los listados pasan 'ahora' en el contexto para no consultarlo por fila
+        ahora = self.context.get('ahora') or timezone.now()
         diferencia = ahora - obj.creado_en
         
         if diferencia < timedelta(minutes=1):
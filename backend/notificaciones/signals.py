@@ -1,9 +1,41 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from datetime import date
+from cajas.models import Caja
+from cajas.signals import stock_descontado
 from entregas.models import Entrega
-from .models import Notificacion
+from . import contador, eventos
+from .models import Notificacion, AlertaStock
+
+
+# ========== CONTADOR DE NO LEÍDAS ==========
+
+@receiver(post_save, sender=Notificacion)
+def sumar_no_leida(sender, instance, created, **kwargs):
+    """Una notificación nueva suma 1 al contador de toda su audiencia"""
+    if created:
+        contador.ajustar_notificacion(instance, 1)
+
+
+@receiver(post_save, sender=Notificacion)
+def publicar_notificacion(sender, instance, created, **kwargs):
+    """Envía la notificación nueva a las conexiones en vivo de su audiencia"""
+    if created:
+        from .serializers import NotificacionSerializer
+        eventos.publicar(
+            eventos.canal_audiencia(instance.usuario_destinatario_id, instance.sucursal),
+            'notificacion',
+            NotificacionSerializer(instance).data
+        )
+
+
+@receiver(post_delete, sender=Notificacion)
+def descartar_contadores(sender, instance, **kwargs):
+    """Al eliminarla no se sabe quiénes ya la habían leído: se recalculan"""
+    contador.invalidar(contador.audiencia(instance.usuario_destinatario_id, instance.sucursal))
+
+
+# ========== ENTREGAS ==========
 
 
 @receiver(post_save, sender=Entrega)
@@ -19,7 +51,8 @@ def crear_notificacion_entrega(sender, instance, created, **kwargs):
     3. Crear notificación de incidencia si hay problema
     
     Por ahora, lo desactivamos para evitar spam.
-    El resumen diario de entregas se genera con un comando programado.
+    El resumen diario de entregas se genera con un comando programado
+    (manage.py generar_resumen_entregas, ver resumen.py).
     """
     
     # OPCIÓN 1: Desactivar completamente (RECOMENDADO)
@@ -47,34 +80,45 @@ def crear_notificacion_entrega(sender, instance, created, **kwargs):
     # se genera el resumen automáticamente
 
 
-# NUEVO: Signal para detectar stock bajo después de una entrega
 @receiver(post_save, sender=Entrega)
-def verificar_stock_bajo(sender, instance, created, **kwargs):
+def publicar_entrega(sender, instance, created, **kwargs):
+    """Avisa a los dashboards conectados para que actualicen sus contadores"""
+    if created:
+        eventos.publicar('todos', 'entrega', {
+            'entrega_id': instance.pk,
+            'campana_id': instance.campana_id,
+            'sucursal': instance.caja.sucursal if instance.caja_id else None,
+            'estado': instance.estado,
+            'fecha_entrega': instance.fecha_entrega,
+        })
+
+
+# ========== STOCK BAJO ==========
+
+@receiver(stock_descontado)
+def detectar_stock_bajo(sender, caja, anterior, restante, **kwargs):
     """
-    Verificar si el stock de cajas está bajo después de una entrega.
-    Crear notificación si el stock está crítico.
+    Alerta cuando un descuento cruza hacia abajo alguno de los umbrales de
+    NOTIFICACIONES_UMBRALES_STOCK. Sin cruce no hay ninguna consulta; con
+    cruce, AlertaStock evita repetir la alerta hasta que la caja se reponga.
     """
-    if created and instance.caja:
-        caja = instance.caja
-        stock_actual = caja.cantidad_disponible
-        
-        # Si el stock está bajo (menos de 10 cajas)
-        if stock_actual > 0 and stock_actual <= 10:
-            # Verificar si ya existe una notificación reciente de stock bajo
-            from datetime import timedelta
-            hace_una_semana = timezone.now() - timedelta(days=7)
-            
-            existe_notificacion = Notificacion.objects.filter(
-                tipo='stock_bajo',
-                datos_extra__sucursal=caja.get_sucursal_display(),
-                datos_extra__tipo_contrato=caja.get_tipo_contrato_display(),
-                creado_en__gte=hace_una_semana
-            ).exists()
-            
-            # Solo crear notificación si no existe una reciente
-            if not existe_notificacion:
-                Notificacion.crear_stock_bajo(
-                    sucursal=caja.get_sucursal_display(),
-                    tipo_contrato=caja.get_tipo_contrato_display(),
-                    cantidad=stock_actual
-                )
\ No newline at end of file
+    cruzados = [umbral for umbral in settings.NOTIFICACIONES_UMBRALES_STOCK if restante <= umbral < anterior]
+    if not cruzados or restante <= 0:
+        return
+    
+    nuevos = [
+        umbral for umbral in cruzados
+        if AlertaStock.objects.get_or_create(caja_id=caja.pk, umbral=umbral)[1]
+    ]
+    if nuevos:
+        Notificacion.crear_stock_bajo(
+            sucursal=caja.get_sucursal_display(),
+            tipo_contrato=caja.get_tipo_contrato_display(),
+            cantidad=restante
+        )
+
+
+@receiver(post_save, sender=Caja)
+def rearmar_alertas_stock(sender, instance, **kwargs):
+    """Al reponer stock por sobre un umbral, ese umbral puede volver a alertar"""
+    AlertaStock.objects.filter(caja=instance, umbral__lt=instance.cantidad_disponible).delete()
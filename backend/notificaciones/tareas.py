@@ -0,0 +1,27 @@
+from datetime import date
+
+from tareas.registro import registrar_tarea
+
+from .particiones import asegurar_particiones, purgar
+from .resumen import generar_resumenes
+
+
+@registrar_tarea('notificaciones_resumen_entregas')
+def tarea_resumen_entregas(tarea):
+    """Genera los resúmenes diarios de entregas pendientes"""
+    desde = tarea.parametros.get('desde')
+    hasta = tarea.parametros.get('hasta')
+
+    return generar_resumenes(
+        desde=date.fromisoformat(desde) if desde else None,
+        hasta=date.fromisoformat(hasta) if hasta else None,
+        progreso=tarea.reportar_progreso
+    )
+
+
+@registrar_tarea('notificaciones_mantener')
+def tarea_mantener(tarea):
+    """Crea las particiones de los próximos meses y aplica la retención"""
+    creadas = asegurar_particiones(tarea.parametros.get('meses_adelante'))
+    resultado = purgar(dias=tarea.parametros.get('dias'))
+    return {'creadas': creadas, **resultado}
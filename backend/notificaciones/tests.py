@@ -0,0 +1,130 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from usuarios.models import Usuario
+from . import agrupador
+from .models import Notificacion
+from .views import EstadisticasNotificacionesView, NotificacionesListView
+
+
+@override_settings(NOTIFICACIONES_AGRUPAR_SEGUNDOS=0)
+class EstadisticasNotificacionesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(
+            username='rrhh', password='x', rol='rrhh', sucursal='casablanca'
+        )
+        otro = Usuario.objects.create_user(
+            username='otro', password='x', rol='rrhh', sucursal='casablanca'
+        )
+
+        Notificacion.crear_stock_bajo('Casablanca', 'Indefinido', 3)
+        Notificacion.crear_stock_bajo('casablanca', 'Plazo Fijo', 8).marcar_como_leida(cls.usuario)
+        Notificacion.crear_stock_bajo('Valparaíso – Planta BIF', 'Indefinido', 2)  # otra sucursal
+        Notificacion.objects.create(tipo='incidencia_nueva', titulo='a', mensaje='a', prioridad='media')
+        Notificacion.objects.create(
+            tipo='incidencia_nueva', titulo='b', mensaje='b', prioridad='baja', usuario_destinatario=otro
+        )
+        Notificacion.objects.create(
+            tipo='trabajador_nuevo', titulo='c', mensaje='c', prioridad='media', usuario_destinatario=cls.usuario
+        )
+
+    def obtener(self):
+        request = APIRequestFactory().get('/api/notificaciones/estadisticas/')
+        force_authenticate(request, user=self.usuario)
+        response = EstadisticasNotificacionesView.as_view()(request)
+        response.render()
+        return response
+
+    def test_una_sola_consulta(self):
+        with self.assertNumQueries(1):
+            self.obtener()
+
+    def test_conteos(self):
+        data = self.obtener().data
+
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(data['no_leidas'], 3)
+        self.assertEqual(data['por_tipo'], {
+            'incidencia_nueva': {'nombre': 'Incidencia Nueva', 'count': 1, 'no_leidas': 1},
+            'stock_bajo': {'nombre': 'Stock Bajo', 'count': 2, 'no_leidas': 1},
+            'trabajador_nuevo': {'nombre': 'Trabajador Nuevo', 'count': 1, 'no_leidas': 1},
+        })
+        self.assertEqual(data['por_prioridad'], {
+            'media': {'nombre': 'Media', 'count': 3},
+            'alta': {'nombre': 'Alta', 'count': 1},
+        })
+
+
+class NotificacionesListPaginacionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(username='rrhh', password='x', rol='rrhh')
+        cls.ids = [
+            Notificacion.objects.create(tipo='sistema', titulo=str(i), mensaje='m', prioridad='baja').pk
+            for i in range(5)
+        ]
+
+    def obtener(self, **params):
+        request = APIRequestFactory().get('/api/notificaciones/', params)
+        force_authenticate(request, user=self.usuario)
+        response = NotificacionesListView.as_view()(request)
+        response.render()
+        return response
+
+    def test_paginas_por_cursor(self):
+        primera = self.obtener(limit=2).data
+        self.assertEqual([n['id'] for n in primera['results']], [self.ids[4], self.ids[3]])
+        self.assertTrue(primera['hay_mas'])
+
+        vistos = [n['id'] for n in primera['results']]
+        siguiente = primera['siguiente']
+        while siguiente:
+            pagina = self.obtener(limit=2, cursor=siguiente).data
+            vistos += [n['id'] for n in pagina['results']]
+            siguiente = pagina['siguiente']
+
+        self.assertEqual(vistos, self.ids[::-1])
+
+    def test_desde_solo_nuevas(self):
+        cursor = self.obtener().data['cursor']
+        self.assertEqual(self.obtener(desde=cursor).data['results'], [])
+
+        nueva = Notificacion.objects.create(tipo='sistema', titulo='n', mensaje='m', prioridad='baja')
+        data = self.obtener(desde=cursor).data
+        self.assertEqual([n['id'] for n in data['results']], [nueva.pk])
+        self.assertFalse(data['hay_mas'])
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self.obtener(cursor='no-es-un-cursor').status_code, 400)
+
+
+@override_settings(NOTIFICACIONES_AGRUPAR_SEGUNDOS=60)
+class AgrupadorTest(TestCase):
+
+    def test_agrupa_por_tipo_y_audiencia(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for cantidad in (9, 4, 8):
+                self.assertIsNone(Notificacion.crear_stock_bajo('Casablanca', 'Indefinido', cantidad))
+            Notificacion.crear_stock_bajo('Valparaíso – Planta BIF', 'Indefinido', 7)
+
+        self.assertFalse(Notificacion.objects.exists())
+        agrupador.vaciar()
+
+        agregada = Notificacion.objects.get(sucursal='casablanca')
+        self.assertEqual(agregada.prioridad, 'alta')
+        self.assertEqual(agregada.datos_extra['agrupadas'], 3)
+        self.assertEqual([e['cantidad'] for e in agregada.datos_extra['elementos']], [9, 4, 8])
+
+        unica = Notificacion.objects.get(sucursal='valparaiso_bif')
+        self.assertEqual(unica.mensaje, 'Solo quedan 7 cajas tipo Indefinido')
+
+    def test_revertida_no_se_agrupa(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Notificacion.crear_stock_bajo('Casablanca', 'Indefinido', 3)
+        self.assertEqual(len(callbacks), 1)  # solo se acumula al confirmar
+
+        agrupador.vaciar()
+        self.assertFalse(Notificacion.objects.exists())
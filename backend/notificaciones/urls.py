@@ -5,6 +5,8 @@ from .views import (
     MarcarTodasLeidasView,
     EliminarNotificacionView,
     EstadisticasNotificacionesView,
+    NoLeidasView,
+    stream_notificaciones,
     LimpiarNotificacionesAntiguasView,
 )
 
@@ -15,6 +17,12 @@ urlpatterns = [
     # Estadísticas
     path('notificaciones/estadisticas/', EstadisticasNotificacionesView.as_view(), name='notificaciones-estadisticas'),
     
+    # Cantidad de no leídas (badge)
+    path('notificaciones/no-leidas/', NoLeidasView.as_view(), name='notificaciones-no-leidas'),
+    
+    # Eventos en vivo (SSE, requiere ASGI)
+    path('notificaciones/stream/', stream_notificaciones, name='notificaciones-stream'),
+    
     # Marcar como leída
     path('notificaciones/<int:pk>/marcar-leida/', MarcarComoLeidaView.as_view(), name='marcar-leida'),
     
@@ -3,44 +3,63 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+import base64
+import binascii
+import json
+from datetime import datetime
 
-from .models import Notificacion
+from . import contador, eventos
+from .models import Notificacion, MarcaLectura, filtro_no_leida
 from .serializers import NotificacionSerializer, EstadisticasNotificacionesSerializer
 
 
+def codificar_cursor(notificacion):
+    """Cursor opaco de una posición (creado_en, id) en el listado"""
+    valor = f'{notificacion.creado_en.isoformat()}|{notificacion.pk}'
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """(creado_en, id) de un cursor; ValueError si no es válido"""
+    try:
+        valor = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        creado_en, pk = valor.split('|')
+        creado_en = datetime.fromisoformat(creado_en)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Cursor inválido')
+    if creado_en.tzinfo is None:
+        raise ValueError('Cursor inválido')
+    return creado_en, int(pk)
+
+
 class NotificacionesListView(APIView):
-    """Listar notificaciones con filtros y por sucursal del usuario"""
+    """
+    Listar notificaciones con filtros y por sucursal del usuario.
+
+    Paginación por cursor sobre (creado_en, id), de la más reciente a la más
+    antigua; cada página es un rango del índice sin OFFSET:
+
+    - ?cursor=<siguiente>  página siguiente (más antiguas)
+    - ?desde=<cursor>      solo las más nuevas que el cursor (polling);
+                           si hay_mas, repetir con el nuevo cursor
+    - ?limit=<n>           tamaño de página (NOTIFICACIONES_PAGINA por defecto)
+
+    Responde {'results', 'siguiente', 'cursor', 'hay_mas'}; 'cursor' es la
+    posición de la más reciente de la página, para el próximo ?desde=.
+    """
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        # Obtener notificaciones (globales o del usuario)
-        notificaciones = Notificacion.objects.filter(
-            Q(usuario_destinatario=request.user) | Q(usuario_destinatario__isnull=True)
-        )
-        
-        # FILTRO POR SUCURSAL DEL USUARIO
-        # Mapear código de sucursal a nombre completo
-        SUCURSAL_MAP = {
-            'casablanca': 'Casablanca',
-            'valparaiso_bif': 'Valparaíso – Planta BIF',
-            'valparaiso_bic': 'Valparaíso – Planta BIC',
-        }
-        
-        sucursal_usuario = getattr(request.user, 'sucursal', None)
-        if sucursal_usuario:
-            sucursal_nombre = SUCURSAL_MAP.get(sucursal_usuario, sucursal_usuario)
-            
-            # Filtrar notificaciones que:
-            # 1. No tienen datos_extra (son globales)
-            # 2. Tienen datos_extra pero no especifican sucursal
-            # 3. Tienen datos_extra con la sucursal del usuario
-            notificaciones = notificaciones.filter(
-                Q(datos_extra={}) |  # Sin datos extra (globales)
-                Q(datos_extra__sucursal__isnull=True) |  # Sin sucursal específica
-                Q(datos_extra__sucursal=sucursal_nombre) |  # Sucursal coincide (nombre completo)
-                Q(datos_extra__sucursal=sucursal_usuario)  # Sucursal coincide (código)
-            )
+        # Notificaciones globales o del usuario, de su sucursal, con su estado de lectura
+        notificaciones = Notificacion.objects.para_usuario(request.user).con_lectura(request.user)
         
         # Filtrar por tipo
         tipo = request.query_params.get('tipo', None)
@@ -58,19 +77,53 @@ class NotificacionesListView(APIView):
         if prioridad:
             notificaciones = notificaciones.filter(prioridad=prioridad)
         
-        # Ordenar
-        notificaciones = notificaciones.order_by('-creado_en')
+        # Tamaño de página
+        limit = settings.NOTIFICACIONES_PAGINA
+        try:
+            limit = int(request.query_params.get('limit', limit))
+        except ValueError:
+            pass
+        limit = min(max(limit, 1), settings.NOTIFICACIONES_PAGINA_MAXIMA)
         
-        # Limitar cantidad
-        limit = request.query_params.get('limit', None)
-        if limit:
-            try:
-                notificaciones = notificaciones[:int(limit)]
-            except ValueError:
-                pass
+        try:
+            desde = request.query_params.get('desde')
+            cursor = request.query_params.get('cursor')
+            if desde:
+                creado_en, pk = decodificar_cursor(desde)
+            elif cursor:
+                creado_en, pk = decodificar_cursor(cursor)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = NotificacionSerializer(notificaciones, many=True)
-        return Response(serializer.data)
+        # El rango va sobre creado_en (índice) y el exclude desempata por id
+        if desde:
+            # Las más antiguas primero, para no saltarse ninguna si hay más de una página
+            notificaciones = notificaciones.filter(creado_en__gte=creado_en).exclude(
+                creado_en=creado_en, id__lte=pk
+            ).order_by('creado_en', 'id')
+        else:
+            if cursor:
+                notificaciones = notificaciones.filter(creado_en__lte=creado_en).exclude(
+                    creado_en=creado_en, id__gte=pk
+                )
+            notificaciones = notificaciones.order_by('-creado_en', '-id')
+        
+        pagina = list(notificaciones[:limit + 1])
+        hay_mas = len(pagina) > limit
+        pagina = pagina[:limit]
+        if desde:
+            pagina.reverse()
+        
+        siguiente = codificar_cursor(pagina[-1]) if hay_mas and not desde else None
+        ultimo_cursor = codificar_cursor(pagina[0]) if pagina else desde
+        
+        serializer = NotificacionSerializer(pagina, many=True, context={'ahora': timezone.now()})
+        return Response({
+            'results': serializer.data,
+            'siguiente': siguiente,
+            'cursor': ultimo_cursor,
+            'hay_mas': hay_mas,
+        })
 
 
 class MarcarComoLeidaView(APIView):
@@ -78,8 +131,8 @@ class MarcarComoLeidaView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request, pk):
-        notificacion = get_object_or_404(Notificacion, pk=pk)
-        notificacion.marcar_como_leida()
+        notificacion = get_object_or_404(Notificacion.objects.para_usuario(request.user), pk=pk)
+        notificacion.marcar_como_leida(request.user)
         
         serializer = NotificacionSerializer(notificacion)
         return Response({
@@ -93,33 +146,12 @@ class MarcarTodasLeidasView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        # Marcar todas las no leídas del usuario
-        notificaciones = Notificacion.objects.filter(
-            Q(usuario_destinatario=request.user) | Q(usuario_destinatario__isnull=True),
-            leida=False
-        )
-        
-        # FILTRO POR SUCURSAL
-        SUCURSAL_MAP = {
-            'casablanca': 'Casablanca',
-            'valparaiso_bif': 'Valparaíso – Planta BIF',
-            'valparaiso_bic': 'Valparaíso – Planta BIC',
-        }
+        # La lectura es por usuario: basta con avanzar su marca de lectura
+        count = contador.obtener(request.user)
         
-        sucursal_usuario = getattr(request.user, 'sucursal', None)
-        if sucursal_usuario:
-            sucursal_nombre = SUCURSAL_MAP.get(sucursal_usuario, sucursal_usuario)
-            notificaciones = notificaciones.filter(
-                Q(datos_extra={}) |
-                Q(datos_extra__sucursal__isnull=True) |
-                Q(datos_extra__sucursal=sucursal_nombre) |
-                Q(datos_extra__sucursal=sucursal_usuario)
-            )
-        
-        count = notificaciones.count()
-        
-        from django.utils import timezone
-        notificaciones.update(leida=True, leida_en=timezone.now())
+        with transaction.atomic():
+            MarcaLectura.marcar_todas(request.user)
+            contador.reiniciar(request.user.pk)
         
         return Response({
             'message': f'{count} notificaciones marcadas como leídas',
@@ -127,12 +159,23 @@ class MarcarTodasLeidasView(APIView):
         })
 
 
+class NoLeidasView(APIView):
+    """
+    Cantidad de notificaciones no leídas del usuario (badge).
+    Se responde desde el contador en caché; ver contador.py
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        return Response({'no_leidas': contador.obtener(request.user)})
+
+
 class EliminarNotificacionView(APIView):
     """Eliminar una notificación"""
     permission_classes = [IsAuthenticated]
     
     def delete(self, request, pk):
-        notificacion = get_object_or_404(Notificacion, pk=pk)
+        notificacion = get_object_or_404(Notificacion.objects.para_usuario(request.user), pk=pk)
         notificacion.delete()
         
         return Response({
@@ -146,46 +189,40 @@ class EstadisticasNotificacionesView(APIView):
     
     def get(self, request):
         # Notificaciones del usuario
-        notificaciones = Notificacion.objects.filter(
-            Q(usuario_destinatario=request.user) | Q(usuario_destinatario__isnull=True)
-        )
+        notificaciones = Notificacion.objects.para_usuario(request.user)
         
-        # FILTRO POR SUCURSAL
-        SUCURSAL_MAP = {
-            'casablanca': 'Casablanca',
-            'valparaiso_bif': 'Valparaíso – Planta BIF',
-            'valparaiso_bic': 'Valparaíso – Planta BIC',
-        }
+        # Una sola consulta agrupada por (tipo, prioridad); el resto se suma en memoria
+        grupos = notificaciones.order_by().values('tipo', 'prioridad').annotate(
+            count=Count('id'),
+            no_leidas=Count('id', filter=filtro_no_leida(request.user))
+        )
         
-        sucursal_usuario = getattr(request.user, 'sucursal', None)
-        if sucursal_usuario:
-            sucursal_nombre = SUCURSAL_MAP.get(sucursal_usuario, sucursal_usuario)
-            notificaciones = notificaciones.filter(
-                Q(datos_extra={}) |
-                Q(datos_extra__sucursal__isnull=True) |
-                Q(datos_extra__sucursal=sucursal_nombre) |
-                Q(datos_extra__sucursal=sucursal_usuario)
-            )
+        conteo_tipo = {}
+        conteo_prioridad = {}
+        for grupo in grupos:
+            count, no_leidas_tipo = conteo_tipo.get(grupo['tipo'], (0, 0))
+            conteo_tipo[grupo['tipo']] = (count + grupo['count'], no_leidas_tipo + grupo['no_leidas'])
+            conteo_prioridad[grupo['prioridad']] = conteo_prioridad.get(grupo['prioridad'], 0) + grupo['count']
         
         # Contar totales
-        total = notificaciones.count()
-        no_leidas = notificaciones.filter(leida=False).count()
+        total = sum(count for count, _ in conteo_tipo.values())
+        no_leidas = sum(no_leidas_tipo for _, no_leidas_tipo in conteo_tipo.values())
         
         # Contar por tipo
         por_tipo = {}
         for tipo, nombre in Notificacion.TIPO_CHOICES:
-            count = notificaciones.filter(tipo=tipo).count()
+            count, no_leidas_tipo = conteo_tipo.get(tipo, (0, 0))
             if count > 0:
                 por_tipo[tipo] = {
                     'nombre': nombre,
                     'count': count,
-                    'no_leidas': notificaciones.filter(tipo=tipo, leida=False).count()
+                    'no_leidas': no_leidas_tipo
                 }
         
         # Contar por prioridad
         por_prioridad = {}
         for prioridad, nombre in Notificacion.PRIORIDAD_CHOICES:
-            count = notificaciones.filter(prioridad=prioridad).count()
+            count = conteo_prioridad.get(prioridad, 0)
             if count > 0:
                 por_prioridad[prioridad] = {
                     'nombre': nombre,
@@ -204,43 +241,92 @@ class EstadisticasNotificacionesView(APIView):
 
 
 class LimpiarNotificacionesAntiguasView(APIView):
-    """Limpiar notificaciones leídas antiguas (filtradas por sucursal)"""
+    """
+    Aplica la retención de notificaciones (NOTIFICACIONES_RETENCION_DIAS).
+    Dentro de la petición se borra a lo más un lote además de las particiones
+    vencidas; `manage.py mantener_notificaciones` completa el resto.
+    """
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Eliminar notificaciones leídas de más de 30 días
-        fecha_limite = timezone.now() - timedelta(days=30)
-        
-        notificaciones = Notificacion.objects.filter(
-            Q(usuario_destinatario=request.user) | Q(usuario_destinatario__isnull=True),
-            leida=True,
-            leida_en__lt=fecha_limite
-        )
+        from .particiones import purgar
         
-        # FILTRO POR SUCURSAL
-        SUCURSAL_MAP = {
-            'casablanca': 'Casablanca',
-            'valparaiso_bif': 'Valparaíso – Planta BIF',
-            'valparaiso_bic': 'Valparaíso – Planta BIC',
-        }
-        
-        sucursal_usuario = getattr(request.user, 'sucursal', None)
-        if sucursal_usuario:
-            sucursal_nombre = SUCURSAL_MAP.get(sucursal_usuario, sucursal_usuario)
-            notificaciones = notificaciones.filter(
-                Q(datos_extra={}) |
-                Q(datos_extra__sucursal__isnull=True) |
-                Q(datos_extra__sucursal=sucursal_nombre) |
-                Q(datos_extra__sucursal=sucursal_usuario)
-            )
-        
-        count = notificaciones.count()
-        notificaciones.delete()
+        count = purgar(max_lotes=1)['eliminadas']
         
         return Response({
             'message': f'{count} notificaciones antiguas eliminadas',
             'total': count
-        })
\ No newline at end of file
+        })
+
+# ========== NOTIFICACIONES EN VIVO (SSE) ==========
+
+def _autenticar_stream(request):
+    """
+    Usuario del token JWT. EventSource no permite enviar cabeceras, así que
+    además del header Authorization se acepta ?token=<access>.
+    """
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    autenticacion = JWTAuthentication()
+    token = request.GET.get('token')
+    try:
+        if token:
+            return autenticacion.get_user(autenticacion.get_validated_token(token))
+        resultado = autenticacion.authenticate(request)
+        return resultado[0] if resultado else None
+    except (InvalidToken, TokenError):
+        return None
+
+
+def _evento_sse(tipo, datos):
+    return f"event: {tipo}\ndata: {json.dumps(datos, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def stream_notificaciones(request):
+    """
+    Stream Server-Sent Events con notificaciones nuevas, cambios en el
+    contador de no leídas y entregas realizadas.
+    
+    GET /api/notificaciones/stream/?token=<access>
+    
+    Eventos: 'no_leidas' ({"no_leidas": n}), 'notificacion' (igual que el
+    listado) y 'entrega'. Solo funciona servido con ASGI.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'El stream requiere servir la aplicación con ASGI'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    usuario = await sync_to_async(_autenticar_stream)(request)
+    if usuario is None or not usuario.is_active:
+        return JsonResponse(
+            {'error': 'No autenticado'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    
+    backend = eventos.obtener_backend()
+    
+    async def generar():
+        suscripcion = backend.suscribir(eventos.canales_de(usuario))
+        try:
+            no_leidas = await sync_to_async(contador.obtener)(usuario)
+            yield _evento_sse('no_leidas', {'no_leidas': no_leidas})
+            
+            while True:
+                evento = await suscripcion.siguiente(settings.NOTIFICACIONES_SSE_KEEPALIVE)
+                if evento is None:
+                    yield ': keepalive\n\n'
+                elif evento['tipo'] == 'no_leidas':
+                    no_leidas = await sync_to_async(contador.obtener)(usuario)
+                    yield _evento_sse('no_leidas', {'no_leidas': no_leidas})
+                else:
+                    yield _evento_sse(evento['tipo'], evento['datos'])
+        finally:
+            backend.cancelar(suscripcion)
+    
+    response = StreamingHttpResponse(generar(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Sin buffer en nginx
+    return response
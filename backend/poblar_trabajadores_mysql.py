@@ -20,7 +20,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -32,7 +31,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -44,7 +42,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'plazo_fijo',
         'periodo': 'Junio 2024 - Diciembre 2024',
         'sede': 'Sucursal Norte',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -56,7 +53,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Sucursal Sur',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -68,7 +64,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -80,7 +75,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'plazo_fijo',
         'periodo': 'Marzo 2024 - Septiembre 2024',
         'sede': 'Sucursal Norte',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -92,7 +86,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Sucursal Sur',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -104,7 +97,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'plazo_fijo',
         'periodo': 'Abril 2024 - Octubre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -116,7 +108,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Sucursal Norte',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -128,7 +119,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Sucursal Sur',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -140,7 +130,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'plazo_fijo',
         'periodo': 'Mayo 2024 - Noviembre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -152,7 +141,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Sucursal Norte',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -164,7 +152,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -176,7 +163,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'plazo_fijo',
         'periodo': 'Febrero 2024 - Agosto 2024',
         'sede': 'Sucursal Sur',
-        'estado': 'pendiente',
         'activo': True
     },
     {
@@ -188,7 +174,6 @@ trabajadores_prueba = [
         'tipo_contrato': 'indefinido',
         'periodo': 'Enero 2024 - Diciembre 2024',
         'sede': 'Casa Matriz',
-        'estado': 'pendiente',
         'activo': True
     }
 ]
@@ -233,8 +218,7 @@ for sede in sedes:
     
     for t in trabajadores_sede:
         contrato = "Indefinido" if t.tipo_contrato == 'indefinido' else "A Plazo"
-        estado = "✓ Retirado" if t.estado == 'retirado' else "○ Pendiente"
-        print(f"  {t.rut:<15} {t.nombre_completo:<40} {t.cargo:<30} [{contrato}] {estado}")
+        print(f"  {t.rut:<15} {t.nombre_completo:<40} {t.cargo:<30} [{contrato}]")
 
 print("\n" + "=" * 80)
 print("RUTs DISPONIBLES PARA GENERAR CÓDIGOS QR:")
@@ -0,0 +1,260 @@
+"""
+Despacho masivo de códigos QR por email.
+
+Los mensajes se envían en lotes sobre conexiones SMTP persistentes
+(una por hilo de trabajo), con concurrencia y tasa máxima configurables
+y reintentos con backoff exponencial para los errores transitorios; un
+rechazo permanente (SMTP 5xx) no se reintenta. El estado de los registros
+se actualiza en bloque al terminar cada lote.
+
+Las vistas de envío masivo lo ejecutan en la cola de tareas: a
+QR_EMAIL_MAX_POR_SEGUNDO, miles de correos toman minutos.
+
+Para probar sin un servidor real basta levantar un SMTP local, por ejemplo:
+
+    python -m aiosmtpd -n -l localhost:8025
+
+y configurar EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend,
+EMAIL_HOST=localhost y EMAIL_PORT=8025.
+"""
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import QRRegistro
+from .utils import contenido_qr, renderizar_qr
+
+
+# Errores que justifican reabrir la conexión antes de reintentar
+ERRORES_CONEXION = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def es_rechazo_permanente(error):
+    """True para respuestas SMTP 5xx: reintentar no cambia el resultado"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+class ResultadoEnvio:
+    """Resumen de un despacho masivo"""
+
+    def __init__(self):
+        self.enviados = 0
+        self.fallidos = 0
+        self.errores = []
+
+    def as_dict(self):
+        return {
+            'enviados': self.enviados,
+            'fallidos': self.fallidos,
+            'errores': self.errores[:10],
+            'mas_errores': len(self.errores) > 10,
+        }
+
+
+class _LimitadorTasa:
+    """Token bucket compartido entre hilos (max_por_segundo <= 0 desactiva el límite)"""
+
+    def __init__(self, max_por_segundo):
+        self.intervalo = 1.0 / max_por_segundo if max_por_segundo > 0 else 0
+        self.siguiente = time.monotonic()
+        self.lock = threading.Lock()
+
+    def esperar(self):
+        if not self.intervalo:
+            return
+        with self.lock:
+            ahora = time.monotonic()
+            turno = max(self.siguiente, ahora)
+            self.siguiente = turno + self.intervalo
+        if turno > ahora:
+            time.sleep(turno - ahora)
+
+
+class DespachadorQR:
+    """
+    Envía los QR de un queryset de QRRegistro reutilizando conexiones SMTP.
+
+    Uso:
+        resultado = DespachadorQR().enviar(registros)
+    """
+
+    def __init__(self, concurrencia=None, tamano_lote=None, max_por_segundo=None,
+                 reintentos=None, backoff=None, connection_factory=None):
+        self.concurrencia = concurrencia or settings.QR_EMAIL_CONCURRENCIA
+        self.tamano_lote = tamano_lote or settings.QR_EMAIL_TAMANO_LOTE
+        self.reintentos = settings.QR_EMAIL_REINTENTOS if reintentos is None else reintentos
+        self.backoff = settings.QR_EMAIL_BACKOFF if backoff is None else backoff
+        self.limitador = _LimitadorTasa(
+            settings.QR_EMAIL_MAX_POR_SEGUNDO if max_por_segundo is None else max_por_segundo
+        )
+        self.connection_factory = connection_factory or get_connection
+
+        self._local = threading.local()
+        self._conexiones = []
+        self._lock = threading.Lock()
+
+    # ========== API PÚBLICA ==========
+
+    def enviar(self, registros, progreso=None):
+        """
+        Envía el QR de cada registro y marca como ENVIADO los exitosos.
+
+        Args:
+            registros: QuerySet de QRRegistro
+            progreso: callable opcional progreso(procesados) llamado por lote
+
+        Returns:
+            ResultadoEnvio
+        """
+        resultado = ResultadoEnvio()
+        procesados = 0
+        pendientes = set()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrencia) as executor:
+                for lote in self._lotes(registros, resultado):
+                    # Limitar lotes en vuelo para no cargar todo en memoria
+                    if len(pendientes) >= self.concurrencia * 2:
+                        listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                        procesados += self._registrar(listos, resultado)
+                        if progreso:
+                            progreso(procesados)
+                    pendientes.add(executor.submit(self._enviar_lote, lote))
+
+                while pendientes:
+                    listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                    procesados += self._registrar(listos, resultado)
+                    if progreso:
+                        progreso(procesados)
+        finally:
+            self._cerrar_conexiones()
+
+        return resultado
+
+    # ========== PREPARACIÓN (hilo principal) ==========
+
+    def _lotes(self, registros, resultado):
+        """Genera lotes de mensajes ya construidos (sin acceso a BD en los hilos)"""
+        lote = []
+        for registro in registros.select_related('trabajador').iterator(chunk_size=self.tamano_lote):
+            trabajador = registro.trabajador
+
+            if not trabajador.email:
+                resultado.fallidos += 1
+                resultado.errores.append(f"{trabajador.rut}: sin email registrado")
+                continue
+
+            lote.append((registro.pk, trabajador.rut, self._construir_mensaje(registro)))
+            if len(lote) >= self.tamano_lote:
+                yield lote
+                lote = []
+
+        if lote:
+            yield lote
+
+    def _construir_mensaje(self, registro):
+        trabajador = registro.trabajador
+        mensaje = EmailMessage(
+            subject='Tu código QR para el retiro de caja',
+            body=(
+                f"Hola {trabajador.nombre},\n\n"
+                "Adjuntamos tu código QR personal. Preséntalo en portería "
+                "para retirar tu caja.\n\n"
+                "Tres Montes"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[trabajador.email],
+        )
+        mensaje.attach(
+            f"qr_{trabajador.rut}.png",
+            renderizar_qr(contenido_qr(registro), 'png'),
+            'image/png'
+        )
+        return mensaje
+
+    # ========== ENVÍO (hilos de trabajo) ==========
+
+    def _conexion(self):
+        """Conexión SMTP persistente del hilo actual"""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = self.connection_factory(fail_silently=False)
+            conexion.open()
+            self._local.conexion = conexion
+            with self._lock:
+                self._conexiones.append(conexion)
+        return conexion
+
+    def _reabrir_conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            try:
+                conexion.close()
+            except Exception:
+                pass
+            conexion.open()
+
+    def _enviar_lote(self, lote):
+        """Retorna (ids enviados, errores) del lote"""
+        enviados = []
+        errores = []
+
+        for registro_id, rut, mensaje in lote:
+            for intento in range(self.reintentos + 1):
+                try:
+                    self.limitador.esperar()
+                    self._conexion().send_messages([mensaje])
+                    enviados.append(registro_id)
+                    break
+                except Exception as e:
+                    if es_rechazo_permanente(e):
+                        errores.append(f"{rut}: rechazado por el servidor ({e})")
+                        break
+                    if intento >= self.reintentos:
+                        errores.append(f"{rut}: {e}")
+                        break
+                    time.sleep(self.backoff * (2 ** intento))
+                    if isinstance(e, ERRORES_CONEXION):
+                        try:
+                            self._reabrir_conexion()
+                        except Exception:
+                            pass
+
+        return enviados, errores
+
+    def _cerrar_conexiones(self):
+        for conexion in self._conexiones:
+            try:
+                conexion.close()
+            except Exception:
+                pass
+        self._conexiones = []
+
+    # ========== RESULTADOS (hilo principal) ==========
+
+    def _registrar(self, futuros, resultado):
+        """Actualiza en bloque los registros enviados. Retorna cantidad procesada"""
+        procesados = 0
+        for futuro in futuros:
+            enviados, errores = futuro.result()
+
+            if enviados:
+                QRRegistro.objects.filter(pk__in=enviados).update(
+                    estado='ENVIADO',
+                    enviado_email=True,
+                    fecha_enviado=timezone.now()
+                )
+
+            resultado.enviados += len(enviados)
+            resultado.fallidos += len(errores)
+            resultado.errores.extend(errores)
+            procesados += len(enviados) + len(errores)
+
+        return procesados
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qr_system', '0001_initial'),
+        ('trabajadores', '0003_trabajador_qr_codigo_trabajador_qr_fecha_generacion_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='qrregistro',
+            index=models.Index(fields=['estado', '-id'], name='qr_registro_estado_9a7533_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='qrregistro',
+            index=models.Index(fields=['enviado_email', '-id'], name='qr_registro_enviado_c2bbe3_idx'),
+        ),
+    ]
@@ -35,6 +35,10 @@ class QRRegistro(models.Model):
         db_table = 'qr_registros'
         verbose_name = 'Registro QR'
         verbose_name_plural = 'Registros QR'
+        indexes = [
+            models.Index(fields=['estado', '-id']),
+            models.Index(fields=['enviado_email', '-id']),
+        ]
 
     def __str__(self):
         return f"QR {self.trabajador.nombre} {self.trabajador.apellido_paterno}"
\ No newline at end of file
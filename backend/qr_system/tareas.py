@@ -0,0 +1,23 @@
+from tareas.registro import registrar_tarea
+from trabajadores.models import Trabajador
+
+from .envio import DespachadorQR
+from .models import QRRegistro
+from .utils import generar_qr_masivo
+
+
+@registrar_tarea('qr_generar_masivo')
+def tarea_generar_qr_masivo(tarea):
+    """Genera el QR de todos los trabajadores activos"""
+    trabajadores = Trabajador.objects.filter(activo=True)
+    generados = generar_qr_masivo(trabajadores, progreso=tarea.reportar_progreso)
+    return {'generados': generados, 'errores': 0}
+
+
+@registrar_tarea('qr_enviar_masivo')
+def tarea_enviar_qr_masivo(tarea):
+    """Envía por email los QR generados pendientes de envío"""
+    registros = QRRegistro.objects.filter(estado='GENERADO').exclude(hash_validacion='')
+    tarea.reportar_progreso(0, registros.count())
+    resultado = DespachadorQR().enviar(registros, progreso=tarea.reportar_progreso)
+    return resultado.as_dict()
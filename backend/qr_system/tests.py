@@ -0,0 +1,125 @@
+import socket
+import time
+from collections import Counter
+
+from aiosmtpd.controller import Controller
+from django.core.mail import get_connection
+from django.test import TestCase
+
+from trabajadores.models import Trabajador
+from .envio import DespachadorQR
+from .models import QRRegistro
+from .utils import asegurar_registros_qr
+
+
+class ServidorSMTP:
+    """Handler de aiosmtpd que registra lo recibido y simula rechazos"""
+
+    def __init__(self, rechazos_rcpt=(), respuestas_data=None):
+        self.rechazos_rcpt = set(rechazos_rcpt)
+        # destinatario -> respuestas a DATA de los primeros intentos
+        self.respuestas_data = {k: list(v) for k, v in (respuestas_data or {}).items()}
+        self.intentos = Counter()
+        self.sesiones = set()
+        self.recibidos = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.sesiones.add(session.peer)
+        self.intentos[address] += 1
+        if address in self.rechazos_rcpt:
+            return '550 5.1.1 Usuario inexistente'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        destinatario = envelope.rcpt_tos[0]
+        respuestas = self.respuestas_data.get(destinatario)
+        if respuestas:
+            return respuestas.pop(0)
+        self.recibidos.append(destinatario)
+        return '250 OK'
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class DespachadorQRTest(TestCase):
+
+    CORRECTOS = ['uno@tresmontes.cl', 'dos@tresmontes.cl', 'tres@tresmontes.cl']
+    RECHAZADO = 'rechazado@tresmontes.cl'
+    CONTENIDO_RECHAZADO = 'spam@tresmontes.cl'
+    TEMPORAL = 'temporal@tresmontes.cl'
+
+    def setUp(self):
+        self.servidor = ServidorSMTP(
+            rechazos_rcpt=[self.RECHAZADO],
+            respuestas_data={
+                self.CONTENIDO_RECHAZADO: ['554 5.7.1 Mensaje rechazado'] * 5,
+                self.TEMPORAL: ['451 4.3.0 Intente más tarde'],
+            }
+        )
+        self.controller = Controller(self.servidor, hostname='127.0.0.1', port=_puerto_libre())
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+
+        correos = self.CORRECTOS + [self.RECHAZADO, self.CONTENIDO_RECHAZADO, self.TEMPORAL]
+        for i, email in enumerate(correos):
+            Trabajador.objects.create(
+                rut=f'2700000{i}-{i}', nombre='Nombre', apellido_paterno='Apellido',
+                cargo='Operario', tipo_contrato='indefinido', periodo='2026',
+                sede='casablanca', email=email
+            )
+        self.registros = asegurar_registros_qr(Trabajador.objects.all())
+
+    def conexion(self, **kwargs):
+        return get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=self.controller.hostname,
+            port=self.controller.port,
+            use_tls=False,
+            username='',
+            password='',
+            **kwargs
+        )
+
+    def enviar(self, **opciones):
+        despachador = DespachadorQR(
+            concurrencia=2, tamano_lote=2, reintentos=2, backoff=0.01,
+            connection_factory=self.conexion, **opciones
+        )
+        return despachador.enviar(self.registros)
+
+    def test_envio_con_reintentos(self):
+        resultado = self.enviar(max_por_segundo=0)
+
+        self.assertEqual(resultado.enviados, 4)
+        self.assertEqual(resultado.fallidos, 2)
+        self.assertCountEqual(self.servidor.recibidos, self.CORRECTOS + [self.TEMPORAL])
+
+        # Un 4xx se reintenta; un 5xx (RCPT o DATA) se abandona al primer intento
+        self.assertEqual(self.servidor.intentos[self.TEMPORAL], 2)
+        self.assertEqual(self.servidor.intentos[self.RECHAZADO], 1)
+        self.assertEqual(self.servidor.intentos[self.CONTENIDO_RECHAZADO], 1)
+
+        enviados = QRRegistro.objects.filter(estado='ENVIADO', enviado_email=True)
+        self.assertCountEqual(
+            enviados.values_list('trabajador__email', flat=True),
+            self.CORRECTOS + [self.TEMPORAL]
+        )
+
+    def test_reutiliza_conexiones(self):
+        self.enviar(max_por_segundo=0)
+
+        # Una conexión por hilo, no una por mensaje
+        self.assertLessEqual(len(self.servidor.sesiones), 2)
+
+    def test_limite_de_tasa(self):
+        inicio = time.monotonic()
+        self.enviar(max_por_segundo=20)
+        transcurrido = time.monotonic() - inicio
+
+        # 7 envíos (6 + 1 reintento) a 20/s: al menos 6 intervalos de 50 ms
+        self.assertGreaterEqual(transcurrido, 0.3)
@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     QRListView,
     GenerarQRView,
+    RenderizarQRView,
     DescargarQRView,
     EnviarQREmailView,
     GenerarQRMasivoView,
@@ -13,6 +14,7 @@ urlpatterns = [
     
     # Operaciones individuales
     path('generar/<int:trabajador_id>/', GenerarQRView.as_view(), name='qr-generar'),
+    path('render/<int:trabajador_id>/', RenderizarQRView.as_view(), name='qr-render'),
     path('descargar/<int:trabajador_id>/', DescargarQRView.as_view(), name='qr-descargar'),
     path('enviar-email/<int:trabajador_id>/', EnviarQREmailView.as_view(), name='qr-enviar-email'),
     
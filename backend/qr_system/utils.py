@@ -1,8 +1,16 @@
 import qrcode
+import qrcode.image.svg
 import hashlib
 import uuid
+from functools import lru_cache
+from io import BytesIO
 from django.conf import settings
-import os
+
+
+FORMATOS_QR = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
 
 
 def generar_hash():
@@ -10,23 +18,119 @@ def generar_hash():
     return hashlib.sha256(uuid.uuid4().hex.encode()).hexdigest()
 
 
-def generar_qr_imagen(texto, filename):
+def asegurar_registros_qr(trabajadores):
+    """
+    Crea en bloque el QRRegistro (con hash) de los trabajadores que aún no lo tienen.
+    Retorna el queryset de registros de esos trabajadores.
+    """
+    from django.utils import timezone
+    from .models import QRRegistro
+
+    sin_registro = trabajadores.filter(qr_registro__isnull=True).values_list('id', flat=True)
+    ahora = timezone.now()
+
+    QRRegistro.objects.bulk_create(
+        [
+            QRRegistro(
+                trabajador_id=trabajador_id,
+                hash_validacion=generar_hash(),
+                fecha_generado=ahora,
+                estado='GENERADO'
+            )
+            for trabajador_id in sin_registro.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+
+    return QRRegistro.objects.filter(trabajador__in=trabajadores)
+
+
+def generar_qr_masivo(trabajadores, progreso=None, tamano_lote=1000):
     """
-    Genera una imagen QR y la guarda en MEDIA_ROOT/qr_codes/
-    
+    Genera (o regenera) en bloque el hash QR de los trabajadores.
+
     Args:
-        texto: Contenido a codificar en el QR
-        filename: Nombre del archivo (ej: qr_123.png)
-    
+        trabajadores: QuerySet de Trabajador
+        progreso: callable opcional progreso(procesados, total)
+
     Returns:
-        Ruta relativa para guardar en el campo ImageField
+        Cantidad de QR generados
     """
-    img = qrcode.make(texto)
+    from django.utils import timezone
+    from .models import QRRegistro
+
+    ids = list(trabajadores.values_list('id', flat=True))
+    total = len(ids)
+    generados = 0
+
+    for inicio in range(0, total, tamano_lote):
+        bloque = ids[inicio:inicio + tamano_lote]
+        ahora = timezone.now()
+        existentes = {
+            registro.trabajador_id: registro
+            for registro in QRRegistro.objects.filter(trabajador_id__in=bloque)
+        }
+
+        nuevos = []
+        for trabajador_id in bloque:
+            registro = existentes.get(trabajador_id)
+            if registro is None:
+                registro = QRRegistro(trabajador_id=trabajador_id)
+                nuevos.append(registro)
+            registro.hash_validacion = generar_hash()
+            registro.fecha_generado = ahora
+            registro.estado = 'GENERADO'
+
+        QRRegistro.objects.bulk_create(nuevos)
+        QRRegistro.objects.bulk_update(
+            existentes.values(),
+            ['hash_validacion', 'fecha_generado', 'estado']
+        )
+
+        generados += len(bloque)
+        if progreso:
+            progreso(generados, total)
+
+    return generados
 
-    output_path = os.path.join(settings.MEDIA_ROOT, "qr_codes")
-    os.makedirs(output_path, exist_ok=True)
 
-    full_path = os.path.join(output_path, filename)
-    img.save(full_path)
-    
-    return f"qr_codes/{filename}"
\ No newline at end of file
+def contenido_qr(registro):
+    """
+    Texto codificado en el QR: ID del trabajador + Hash de validación + RUT
+    """
+    trabajador = registro.trabajador
+    return f"ID:{trabajador.id}|HASH:{registro.hash_validacion}|RUT:{trabajador.rut}"
+
+
+def etag_qr(contenido, formato):
+    """
+    ETag fuerte del QR renderizado.
+    Solo cambia cuando cambia el contenido (nuevo hash) o el formato.
+    """
+    return hashlib.sha256(f"{formato}:{contenido}".encode()).hexdigest()
+
+
+@lru_cache(maxsize=getattr(settings, 'QR_RENDER_CACHE_SIZE', 2048))
+def renderizar_qr(contenido, formato='png'):
+    """
+    Genera la imagen QR en memoria y retorna sus bytes.
+
+    Los resultados se guardan en un LRU acotado (QR_RENDER_CACHE_SIZE),
+    así que no se escriben archivos en MEDIA_ROOT.
+
+    Args:
+        contenido: Texto a codificar en el QR
+        formato: 'png' o 'svg'
+
+    Returns:
+        bytes de la imagen
+    """
+    if formato == 'svg':
+        img = qrcode.make(contenido, image_factory=qrcode.image.svg.SvgPathImage)
+    else:
+        img = qrcode.make(contenido)
+
+    buffer = BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
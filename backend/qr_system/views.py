@@ -1,10 +1,9 @@
-import os
-import uuid
-import qrcode
-from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -13,20 +12,118 @@ from rest_framework.permissions import IsAuthenticated
 
 from .models import QRRegistro
 from trabajadores.models import Trabajador
-from .serializers import QRRegistroSerializer
-from .utils import generar_hash, generar_qr_imagen
+from cajas.models import Caja
+from .envio import DespachadorQR
+from tareas.utils import solicita_asincrono, encolar_y_responder
+from .utils import (
+    FORMATOS_QR,
+    generar_hash,
+    generar_qr_masivo,
+    contenido_qr,
+    etag_qr,
+    renderizar_qr,
+)
 
 
 # -------------------------
 # LISTAR REGISTROS QR
 # -------------------------
 class QRListView(APIView):
+    """
+    Listado paginado por cursor (keyset) de registros QR.
+
+    GET /api/qr/?estado=GENERADO&sucursal=casablanca&enviado_email=false&limit=50&cursor=123
+
+    Solo se seleccionan las columnas que muestra la página de QR, y el
+    cursor (id del último registro recibido) evita los OFFSET costosos.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
+    LIMITE_DEFECTO = 50
+    LIMITE_MAXIMO = 500
+
+    CAMPOS = (
+        "id",
+        "trabajador_id",
+        "trabajador__rut",
+        "trabajador__nombre",
+        "trabajador__apellido_paterno",
+        "trabajador__apellido_materno",
+        "trabajador__sede",
+        "trabajador__tipo_contrato",
+        "trabajador__activo",
+        "estado",
+        "fecha_generado",
+        "fecha_enviado",
+        "enviado_email",
+    )
+
     def get(self, request):
-        registros = QRRegistro.objects.select_related("trabajador").all()
-        serializer = QRRegistroSerializer(registros, many=True)
-        return Response(serializer.data)
+        registros = QRRegistro.objects.all()
+
+        # Filtro por estado
+        estado = request.query_params.get("estado")
+        if estado:
+            registros = registros.filter(estado=estado)
+
+        # Filtro por sucursal (acepta código o nombre de la sede)
+        sucursal = request.query_params.get("sucursal")
+        if sucursal:
+            nombre_sucursal = dict(Caja.SUCURSAL_CHOICES).get(sucursal, sucursal)
+            registros = registros.filter(
+                Q(trabajador__sede=sucursal) | Q(trabajador__sede=nombre_sucursal)
+            )
+
+        # Filtro por envío de email
+        enviado_email = request.query_params.get("enviado_email")
+        if enviado_email is not None:
+            registros = registros.filter(
+                enviado_email=enviado_email.lower() in ["true", "1", "yes"]
+            )
+
+        # Cursor y límite
+        try:
+            limite = min(
+                max(int(request.query_params.get("limit", self.LIMITE_DEFECTO)), 1),
+                self.LIMITE_MAXIMO
+            )
+            cursor = request.query_params.get("cursor")
+            if cursor:
+                registros = registros.filter(id__lt=int(cursor))
+        except ValueError:
+            return Response(
+                {"error": "Los parámetros limit y cursor deben ser numéricos"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Se pide un registro extra para saber si hay otra página
+        filas = list(registros.order_by("-id").values(*self.CAMPOS)[:limite + 1])
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+
+        data = [
+            {
+                "id": fila["id"],
+                "trabajador_id": fila["trabajador_id"],
+                "rut": fila["trabajador__rut"],
+                "nombre": fila["trabajador__nombre"],
+                "apellido_paterno": fila["trabajador__apellido_paterno"],
+                "apellido_materno": fila["trabajador__apellido_materno"],
+                "sede": fila["trabajador__sede"],
+                "tipo_contrato": fila["trabajador__tipo_contrato"],
+                "activo": fila["trabajador__activo"],
+                "estado": fila["estado"],
+                "fecha_generado": fila["fecha_generado"],
+                "fecha_enviado": fila["fecha_enviado"],
+                "enviado_email": fila["enviado_email"],
+            }
+            for fila in filas
+        ]
+
+        return Response({
+            "results": data,
+            "siguiente_cursor": filas[-1]["id"] if hay_mas else None,
+        })
 
 
 # -------------------------
@@ -46,13 +143,7 @@ class GenerarQRView(APIView):
         registro.fecha_generado = timezone.now()
         registro.estado = "GENERADO"
 
-        # Contenido del QR: ID del trabajador + Hash de validación
-        contenido = f"ID:{trabajador.id}|HASH:{registro.hash_validacion}|RUT:{trabajador.rut}"
-        filename = f"qr_{trabajador.id}.png"
-        
-        # Generar imagen QR
-        ruta = generar_qr_imagen(contenido, filename)
-        registro.qr_imagen = ruta
+        # La imagen se renderiza bajo demanda (ver RenderizarQRView)
         registro.save()
 
         return Response({
@@ -63,58 +154,99 @@ class GenerarQRView(APIView):
 
 
 # -------------------------
-# DESCARGAR QR INDIVIDUAL
+# RENDERIZAR QR (PNG / SVG)
 # -------------------------
-class DescargarQRView(APIView):
+class RenderizarQRView(APIView):
+    """
+    Genera la imagen QR del registro bajo demanda.
+
+    GET /api/qr/render/{trabajador_id}/?formato=png|svg
+
+    Usa un ETag fuerte derivado del contenido del QR, por lo que el
+    navegador revalida con If-None-Match y recibe 304 sin renderizar.
+    """
     permission_classes = [permissions.IsAuthenticated]
+    descargar = False
 
     def get(self, request, trabajador_id):
-        try:
-            registro = get_object_or_404(QRRegistro, trabajador_id=trabajador_id)
+        formato = request.query_params.get('formato', 'png').lower()
 
-            if not registro.qr_imagen:
-                return Response(
-                    {"error": "QR no generado para este trabajador"}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            return FileResponse(
-                open(registro.qr_imagen.path, "rb"), 
-                content_type="image/png",
-                as_attachment=True,
-                filename=f"qr_trabajador_{trabajador_id}.png"
+        if formato not in FORMATOS_QR:
+            return Response(
+                {"error": f"Formato inválido. Opciones: {', '.join(FORMATOS_QR)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except Exception as e:
+
+        registro = get_object_or_404(
+            QRRegistro.objects.select_related("trabajador"),
+            trabajador_id=trabajador_id
+        )
+
+        if not registro.hash_validacion:
             return Response(
-                {"error": str(e)}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": "QR no generado para este trabajador"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        contenido = contenido_qr(registro)
+        etag = f'"{etag_qr(contenido, formato)}"'
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                renderizar_qr(contenido, formato),
+                content_type=FORMATOS_QR[formato]
+            )
+            if self.descargar:
+                response["Content-Disposition"] = (
+                    f'attachment; filename="qr_trabajador_{trabajador_id}.{formato}"'
+                )
+
+        # Contenido privado: siempre revalidar contra el ETag
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
 
 # -------------------------
-# ENVIAR QR POR CORREO (SIMULADO)
+# DESCARGAR QR INDIVIDUAL
+# -------------------------
+class DescargarQRView(RenderizarQRView):
+    descargar = True
+
+
+# -------------------------
+# ENVIAR QR POR CORREO
 # -------------------------
 class EnviarQREmailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, trabajador_id):
-        registro = get_object_or_404(QRRegistro, trabajador_id=trabajador_id)
+        registro = get_object_or_404(
+            QRRegistro.objects.select_related("trabajador"),
+            trabajador_id=trabajador_id
+        )
 
-        if not registro.qr_imagen:
+        if not registro.hash_validacion:
             return Response(
                 {"error": "Primero debe generar el QR"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Simulación de envío de email
-        # En producción aquí iría la lógica real de envío (SMTP, SendGrid, etc.)
-        registro.fecha_enviado = timezone.now()
-        registro.enviado_email = True
-        registro.estado = "ENVIADO"
-        registro.save()
+        resultado = DespachadorQR(concurrencia=1).enviar(
+            QRRegistro.objects.filter(pk=registro.pk)
+        )
+
+        if not resultado.enviados:
+            return Response(
+                {"error": "No se pudo enviar el QR", "detalle": resultado.errores},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
 
+        registro.refresh_from_db()
         return Response({
-            "message": "QR enviado por email (modo simulado)",
+            "message": "QR enviado por email",
             "trabajador": f"{registro.trabajador.nombre} {registro.trabajador.apellido_paterno}",
             "estado": registro.estado
         }, status=status.HTTP_200_OK)
@@ -136,36 +268,11 @@ class GenerarQRMasivoView(APIView):
                 status=status.HTTP_200_OK
             )
 
-        count = 0
-        errores = 0
-
-        # Crear carpeta si no existe
-        qr_dir = os.path.join(settings.MEDIA_ROOT, "qr_codes")
-        os.makedirs(qr_dir, exist_ok=True)
+        if solicita_asincrono(request):
+            return encolar_y_responder(request, 'qr_generar_masivo')
 
-        for trabajador in trabajadores:
-            try:
-                # Crear o actualizar registro QR
-                registro, created = QRRegistro.objects.get_or_create(
-                    trabajador=trabajador
-                )
-
-                # Generar hash y QR
-                registro.hash_validacion = generar_hash()
-                registro.fecha_generado = timezone.now()
-                registro.estado = "GENERADO"
-
-                contenido = f"ID:{trabajador.id}|HASH:{registro.hash_validacion}|RUT:{trabajador.rut}"
-                filename = f"qr_{trabajador.id}.png"
-                
-                ruta = generar_qr_imagen(contenido, filename)
-                registro.qr_imagen = ruta
-                registro.save()
-
-                count += 1
-            except Exception as e:
-                print(f"Error generando QR para trabajador {trabajador.id}: {e}")
-                errores += 1
+        count = generar_qr_masivo(trabajadores)
+        errores = 0
 
         return Response({
             "message": f"QR generados correctamente",
@@ -175,7 +282,7 @@ class GenerarQRMasivoView(APIView):
 
 
 # -------------------------
-# ENVIAR QR MASIVO (SIMULADO)
+# ENVIAR QR MASIVO
 # -------------------------
 class EnviarQRMasivoView(APIView):
     permission_classes = [IsAuthenticated]
@@ -183,9 +290,8 @@ class EnviarQRMasivoView(APIView):
     def post(self, request):
         # Obtener registros QR generados pero no enviados
         registros = QRRegistro.objects.filter(
-            estado='GENERADO',
-            qr_imagen__isnull=False
-        )
+            estado='GENERADO'
+        ).exclude(hash_validacion='')
 
         if not registros.exists():
             return Response(
@@ -193,20 +299,14 @@ class EnviarQRMasivoView(APIView):
                 status=status.HTTP_200_OK
             )
 
-        enviados = 0
+        # En la cola por defecto: el envío está limitado por QR_EMAIL_MAX_POR_SEGUNDO
+        # y retendría el worker web por minutos (?asincrono=false lo fuerza en línea)
+        if solicita_asincrono(request, defecto=True):
+            return encolar_y_responder(request, 'qr_enviar_masivo')
 
-        for registro in registros:
-            try:
-                # Simulación de envío de email
-                registro.fecha_enviado = timezone.now()
-                registro.enviado_email = True
-                registro.estado = "ENVIADO"
-                registro.save()
-                enviados += 1
-            except Exception as e:
-                print(f"Error enviando QR para trabajador {registro.trabajador.id}: {e}")
+        resultado = DespachadorQR().enviar(registros)
 
         return Response({
-            "message": f"QR enviados por email (modo simulado)",
-            "enviados": enviados
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            "message": "QR enviados por email",
+            **resultado.as_dict()
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,115 @@
+import csv
+import io
+import openpyxl
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from entregas.models import Entrega
+
+
+COLUMNAS = ["RUT", "Nombre", "Sucursal", "Caja", "Guardia", "Fecha"]
+
+FORMATOS = {
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'pdf': ('pdf', 'application/pdf'),
+}
+
+
+def entregas_exportables():
+    return Entrega.objects.select_related("trabajador", "caja", "guardia").all()
+
+
+def _filas(qs):
+    for e in qs.iterator(chunk_size=2000):
+        yield e, [
+            e.trabajador.rut,
+            f"{e.trabajador.nombre} {e.trabajador.apellido_paterno}",
+            e.trabajador.sede,
+            e.caja.codigo if e.caja else "N/A",
+            e.guardia.username if e.guardia else "N/A",
+            e.fecha_entrega.strftime("%Y-%m-%d %H:%M"),
+        ]
+
+
+def escribir_excel(destino, qs):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte Entregas")
+
+    # Encabezados
+    ws.append(COLUMNAS)
+
+    # Datos
+    filas = 0
+    for _, fila in _filas(qs):
+        ws.append(fila)
+        filas += 1
+
+    wb.save(destino)
+    return filas
+
+
+def escribir_csv(destino, qs):
+    """destino debe aceptar texto (HttpResponse o io.StringIO)"""
+    writer = csv.writer(destino)
+    writer.writerow(COLUMNAS)
+
+    filas = 0
+    for _, fila in _filas(qs):
+        writer.writerow(fila)
+        filas += 1
+
+    return filas
+
+
+def escribir_pdf(destino, qs):
+    pdf = canvas.Canvas(destino, pagesize=letter)
+    width, height = letter
+
+    y = height - 40
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawString(50, y, "Reporte de Entregas - Tres Montes")
+    y -= 30
+
+    pdf.setFont("Helvetica", 9)
+
+    filas = 0
+    for e, _ in _filas(qs):
+        linea = (
+            f"{e.trabajador.rut} - "
+            f"{e.trabajador.nombre} {e.trabajador.apellido_paterno} - "
+            f"{e.trabajador.sede} - "
+            f"{e.caja.codigo if e.caja else 'N/A'} - "
+            f"{e.fecha_entrega.strftime('%Y-%m-%d')}"
+        )
+        pdf.drawString(50, y, linea)
+        y -= 15
+        filas += 1
+
+        if y < 50:
+            pdf.showPage()
+            y = height - 40
+            pdf.setFont("Helvetica", 9)
+
+    pdf.save()
+    return filas
+
+
+ESCRITORES = {
+    'excel': escribir_excel,
+    'csv': escribir_csv,
+    'pdf': escribir_pdf,
+}
+
+
+def exportar_a_bytes(formato, qs=None):
+    """Genera el reporte completo en memoria. Retorna (contenido, filas)"""
+    qs = qs if qs is not None else entregas_exportables()
+
+    if formato == 'csv':
+        buffer = io.StringIO()
+        filas = escribir_csv(buffer, qs)
+        return buffer.getvalue().encode('utf-8'), filas
+
+    buffer = io.BytesIO()
+    filas = ESCRITORES[formato](buffer, qs)
+    return buffer.getvalue(), filas
@@ -0,0 +1,21 @@
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from tareas.registro import registrar_tarea
+
+from .exportacion import FORMATOS, exportar_a_bytes
+
+
+@registrar_tarea('reporte_entregas_exportar')
+def tarea_exportar_entregas(tarea):
+    """Genera el reporte de entregas y lo adjunta a la tarea"""
+    formato = tarea.parametros.get('formato', 'excel')
+    extension, _ = FORMATOS[formato]
+
+    contenido, filas = exportar_a_bytes(formato)
+    tarea.reportar_progreso(filas, filas)
+
+    nombre = f"reporte_entregas_{timezone.now():%Y%m%d_%H%M%S}.{extension}"
+    tarea.archivo.save(nombre, ContentFile(contenido), save=False)
+
+    return {'archivo': nombre, 'filas': filas}
@@ -4,10 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from entregas.models import Entrega
 from django.http import HttpResponse
-import csv
-import openpyxl
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from tareas.utils import solicita_asincrono, encolar_y_responder
+from .exportacion import FORMATOS, ESCRITORES, entregas_exportables
 
 
 class ReporteEntregaListView(APIView):
@@ -44,99 +42,34 @@ class ReporteEntregaListView(APIView):
         return Response(data)
 
 
-class ExportarExcelView(APIView):
+class _ExportarEntregasView(APIView):
     permission_classes = [IsAuthenticated]
+    formato = None
 
     def get(self, request):
-        qs = Entrega.objects.select_related("trabajador", "caja", "guardia").all()
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Reporte Entregas"
-
-        # Encabezados
-        columnas = ["RUT", "Nombre", "Sucursal", "Caja", "Guardia", "Fecha"]
-        ws.append(columnas)
-
-        # Datos
-        for e in qs:
-            ws.append([
-                e.trabajador.rut,
-                f"{e.trabajador.nombre} {e.trabajador.apellido_paterno}",
-                e.trabajador.sede,
-                e.caja.codigo if e.caja else "N/A",
-                e.guardia.username if e.guardia else "N/A",
-                e.fecha_entrega.strftime("%Y-%m-%d %H:%M"),
-            ])
-
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="reporte_entregas.xlsx"'
-
-        wb.save(response)
-        return response
-
-
-class ExportarCSVView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        qs = Entrega.objects.select_related("trabajador", "caja", "guardia").all()
-
-        response = HttpResponse(content_type="text/csv; charset=utf-8")
-        response["Content-Disposition"] = 'attachment; filename="reporte_entregas.csv"'
+        if solicita_asincrono(request):
+            return encolar_y_responder(
+                request,
+                'reporte_entregas_exportar',
+                parametros={'formato': self.formato}
+            )
 
-        writer = csv.writer(response)
-        writer.writerow(["RUT", "Nombre", "Sucursal", "Caja", "Guardia", "Fecha"])
+        extension, content_type = FORMATOS[self.formato]
 
-        for e in qs:
-            writer.writerow([
-                e.trabajador.rut,
-                f"{e.trabajador.nombre} {e.trabajador.apellido_paterno}",
-                e.trabajador.sede,
-                e.caja.codigo if e.caja else "N/A",
-                e.guardia.username if e.guardia else "N/A",
-                e.fecha_entrega.strftime("%Y-%m-%d %H:%M"),
-            ])
+        response = HttpResponse(content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="reporte_entregas.{extension}"'
 
+        ESCRITORES[self.formato](response, entregas_exportables())
         return response
 
 
-class ExportarPDFView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        qs = Entrega.objects.select_related("trabajador", "caja", "guardia").all()
-
-        response = HttpResponse(content_type="application/pdf")
-        response["Content-Disposition"] = 'attachment; filename="reporte_entregas.pdf"'
-
-        pdf = canvas.Canvas(response, pagesize=letter)
-        width, height = letter
+class ExportarExcelView(_ExportarEntregasView):
+    formato = 'excel'
 
-        y = height - 40
-        pdf.setFont("Helvetica-Bold", 14)
-        pdf.drawString(50, y, "Reporte de Entregas - Tres Montes")
-        y -= 30
 
-        pdf.setFont("Helvetica", 9)
-
-        for e in qs:
-            linea = (
-                f"{e.trabajador.rut} - "
-                f"{e.trabajador.nombre} {e.trabajador.apellido_paterno} - "
-                f"{e.trabajador.sede} - "
-                f"{e.caja.codigo if e.caja else 'N/A'} - "
-                f"{e.fecha_entrega.strftime('%Y-%m-%d')}"
-            )
-            pdf.drawString(50, y, linea)
-            y -= 15
+class ExportarCSVView(_ExportarEntregasView):
+    formato = 'csv'
 
-            if y < 50:
-                pdf.showPage()
-                y = height - 40
-                pdf.setFont("Helvetica", 9)
 
-        pdf.save()
-        return response
\ No newline at end of file
+class ExportarPDFView(_ExportarEntregasView):
+    formato = 'pdf'
@@ -0,0 +1,97 @@
+"""
+Estadísticas de incidencias para el encabezado del panel de supervisor.
+
+Todo sale de una sola consulta agrupada por (tipo, prioridad, sucursal del
+guardia) con conteos condicionales por estado; los totales y los desgloses
+se suman en Python a partir de esas pocas filas.
+
+El resultado se guarda en la caché SUPERVISOR_ESTADISTICAS_TTL segundos y
+se descarta al guardar o eliminar una incidencia (ver signals.py). El TTL
+también acota cuánto tarda en reflejarse una incidencia que vence sin cambios.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from incidencias.models import ESTADOS_ABIERTOS, Incidencia
+from usuarios.models import Usuario
+from .serializers import ESTADO_APROBADO
+
+
+CLAVE = 'supervisor:estadisticas'
+
+# Conteo por estado: clave de la respuesta -> estado
+CONTEOS_ESTADO = {
+    'pendientes': 'pendiente',
+    'en_proceso': 'en_proceso',
+    'aprobados': ESTADO_APROBADO,
+    'rechazados': 'rechazado',
+}
+
+NOMBRES_SUCURSAL = dict(Usuario.SUCURSAL_CHOICES)
+
+
+def _grupo(nombre):
+    return {'nombre': nombre, 'total': 0, 'abiertas': 0, 'vencidas': 0}
+
+
+def calcular():
+    """Estadísticas calculadas con una consulta a la BD"""
+    ahora = timezone.now()
+    abiertas = Q(estado__in=ESTADOS_ABIERTOS)
+
+    filas = Incidencia.objects.order_by().values(
+        'tipo', 'prioridad', 'guardia__sucursal'
+    ).annotate(
+        total=Count('id'),
+        abiertas=Count('id', filter=abiertas),
+        vencidas=Count('id', filter=abiertas & Q(fecha_limite__lt=ahora)),
+        **{
+            clave: Count('id', filter=Q(estado=estado))
+            for clave, estado in CONTEOS_ESTADO.items()
+        }
+    )
+
+    tipos = dict(Incidencia.TIPO_CHOICES)
+    prioridades = dict(Incidencia.PRIORIDAD_CHOICES)
+
+    stats = {'total': 0, 'vencidas': 0, **{clave: 0 for clave in CONTEOS_ESTADO}}
+    por_tipo = {}
+    por_prioridad = {prioridad: _grupo(nombre) for prioridad, nombre in Incidencia.PRIORIDAD_CHOICES}
+    por_sucursal = {}
+
+    for fila in filas:
+        for clave in stats:
+            stats[clave] += fila[clave]
+
+        sucursal = fila['guardia__sucursal'] or 'sin_sucursal'
+        grupos = (
+            (por_tipo, fila['tipo'], tipos.get(fila['tipo'], fila['tipo'])),
+            (por_prioridad, fila['prioridad'], prioridades.get(fila['prioridad'], fila['prioridad'])),
+            (por_sucursal, sucursal, NOMBRES_SUCURSAL.get(sucursal, 'Sin sucursal')),
+        )
+        for desglose, clave, nombre in grupos:
+            grupo = desglose.setdefault(clave, _grupo(nombre))
+            grupo['total'] += fila['total']
+            grupo['abiertas'] += fila['abiertas']
+            grupo['vencidas'] += fila['vencidas']
+
+    return {
+        **stats,
+        'vencidas_por_prioridad': {
+            prioridad: grupo['vencidas'] for prioridad, grupo in por_prioridad.items()
+        },
+        'por_tipo': por_tipo,
+        'por_prioridad': por_prioridad,
+        'por_sucursal': por_sucursal,
+    }
+
+
+def obtener():
+    """Estadísticas desde la caché, calculándolas si no están"""
+    return cache.get_or_set(CLAVE, calcular, timeout=settings.SUPERVISOR_ESTADISTICAS_TTL)
+
+
+def invalidar():
+    cache.delete(CLAVE)
@@ -26,6 +26,7 @@ class IncidenciaSupervisorSerializer(serializers.ModelSerializer):
     guardia = GuardiaSimpleSerializer(read_only=True)
     tipo_nombre = serializers.CharField(source='get_tipo_display', read_only=True)
     prioridad_nombre = serializers.CharField(source='get_prioridad_display', read_only=True)
+    esta_vencida = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Incidencia
@@ -42,10 +43,17 @@ class IncidenciaSupervisorSerializer(serializers.ModelSerializer):
             'solucion',
             'fecha_reporte',
             'fecha_resolucion',
-            'imagen_evidencia'
+            'fecha_limite',
+            'esta_vencida',
+            'imagen_evidencia',
+            'imagen_miniatura'
         ]
 
 
+# El panel "aprueba" incidencias; en el modelo eso es resolverlas
+ESTADO_APROBADO = 'resuelto'
+
+
 class ActualizarIncidenciaSerializer(serializers.Serializer):
     estado = serializers.ChoiceField(choices=['pendiente', 'aprobado', 'rechazado', 'resuelto', 'en_proceso'])
     solucion = serializers.CharField(max_length=500, required=False, allow_blank=True)
@@ -64,6 +72,10 @@ class ActualizarIncidenciaSerializer(serializers.Serializer):
         # Siempre usar 'solucion' como nombre final
         data['solucion'] = solucion.strip()
         
+        # 'aprobado' no es un estado del modelo
+        if data['estado'] == 'aprobado':
+            data['estado'] = ESTADO_APROBADO
+        
         # Eliminar comentario_resolucion si existe
         data.pop('comentario_resolucion', None)
         
@@ -73,5 +85,11 @@ class ActualizarIncidenciaSerializer(serializers.Serializer):
 class SupervisorStatsSerializer(serializers.Serializer):
     total = serializers.IntegerField()
     pendientes = serializers.IntegerField()
+    en_proceso = serializers.IntegerField()
     aprobados = serializers.IntegerField()
-    rechazados = serializers.IntegerField()
\ No newline at end of file
+    rechazados = serializers.IntegerField()
+    vencidas = serializers.IntegerField()
+    vencidas_por_prioridad = serializers.DictField(child=serializers.IntegerField())
+    por_tipo = serializers.DictField()
+    por_prioridad = serializers.DictField()
+    por_sucursal = serializers.DictField()
\ No newline at end of file
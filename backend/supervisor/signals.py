@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from incidencias.models import Incidencia
+from . import estadisticas
+
+
+# ========== ESTADÍSTICAS ==========
+
+@receiver(post_save, sender=Incidencia)
+@receiver(post_delete, sender=Incidencia)
+def invalidar_estadisticas(sender, instance, **kwargs):
+    """Cualquier cambio en una incidencia puede mover los conteos del panel"""
+    transaction.on_commit(estadisticas.invalidar)
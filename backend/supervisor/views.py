@@ -3,11 +3,14 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
+from django.conf import settings
+from django.db.models import Count, Window
 from django.utils import timezone
 
 from incidencias.models import Incidencia
+from . import estadisticas
 from .serializers import (
+    ESTADO_APROBADO,
     IncidenciaSupervisorSerializer,
     ActualizarIncidenciaSerializer,
     SupervisorStatsSerializer
@@ -32,25 +35,29 @@ class SupervisorInfoView(APIView):
 
 
 class SupervisorEstadisticasView(APIView):
-    """Obtener estadísticas de incidencias"""
+    """
+    Obtener estadísticas de incidencias: totales por estado, vencidas y
+    desgloses por tipo, prioridad y sucursal (una consulta, cacheada; ver
+    estadisticas.py)
+    """
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        incidencias = Incidencia.objects.all()
-        
-        stats = {
-            'total': incidencias.count(),
-            'pendientes': incidencias.filter(estado='pendiente').count(),
-            'aprobados': incidencias.filter(estado='aprobado').count(),
-            'rechazados': incidencias.filter(estado='rechazado').count(),
-        }
-        
-        serializer = SupervisorStatsSerializer(stats)
+        serializer = SupervisorStatsSerializer(estadisticas.obtener())
         return Response(serializer.data)
 
 
 class IncidenciasListView(APIView):
-    """Listar todas las incidencias con filtros"""
+    """
+    Listar todas las incidencias con filtros, paginadas.
+
+    - ?busqueda=   texto completo (columna `busqueda`, índice GIN), por relevancia
+    - ?vencidas=true solo las abiertas fuera de plazo
+    - ?orden=vencimiento primero las vencidas y luego las de plazo más próximo
+    - ?pagina= / ?por_pagina= (SUPERVISOR_INCIDENCIAS_POR_PAGINA por defecto)
+
+    El total sale de la misma consulta (COUNT(*) OVER ()).
+    """
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
@@ -61,24 +68,48 @@ class IncidenciasListView(APIView):
         # Filtro por estado
         estado = request.query_params.get('estado', None)
         if estado:
-            incidencias = incidencias.filter(estado=estado)
+            incidencias = incidencias.filter(estado=ESTADO_APROBADO if estado == 'aprobado' else estado)
+        
+        # Filtro por SLA vencido
+        vencidas = request.query_params.get('vencidas', '')
+        if vencidas.lower() in ['true', '1', 'yes']:
+            incidencias = incidencias.vencidas().order_by('fecha_limite')
         
-        # Búsqueda por texto
+        # Búsqueda por texto (ordena por relevancia)
         busqueda = request.query_params.get('busqueda', None)
         if busqueda:
-            incidencias = incidencias.filter(
-                Q(descripcion__icontains=busqueda) |
-                Q(tipo__icontains=busqueda) |
-                Q(trabajador__rut__icontains=busqueda) |
-                Q(trabajador__nombre__icontains=busqueda) |
-                Q(trabajador__apellido_paterno__icontains=busqueda) |
-                Q(solucion__icontains=busqueda)
+            incidencias = incidencias.buscar(busqueda)
+        
+        # Orden por vencimiento
+        if request.query_params.get('orden') == 'vencimiento':
+            incidencias = incidencias.vencidas_primero()
+        
+        # Paginación
+        try:
+            pagina = max(int(request.query_params.get('pagina', 1)), 1)
+            por_pagina = int(request.query_params.get('por_pagina', settings.SUPERVISOR_INCIDENCIAS_POR_PAGINA))
+        except ValueError:
+            return Response(
+                {'error': 'pagina y por_pagina deben ser números'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        por_pagina = min(max(por_pagina, 1), settings.SUPERVISOR_INCIDENCIAS_POR_PAGINA_MAXIMA)
+        
+        inicio = (pagina - 1) * por_pagina
+        resultados = list(
+            incidencias.annotate(total_filas=Window(Count('id')))[inicio:inicio + por_pagina]
+        )
+        if resultados:
+            total = resultados[0].total_filas
+        else:
+            total = incidencias.count() if pagina > 1 else 0
         
-        serializer = IncidenciaSupervisorSerializer(incidencias, many=True)
+        serializer = IncidenciaSupervisorSerializer(resultados, many=True)
         return Response({
             'data': serializer.data,
-            'total': incidencias.count()
+            'total': total,
+            'pagina': pagina,
+            'por_pagina': por_pagina,
         })
 
 
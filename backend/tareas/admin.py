@@ -0,0 +1,25 @@
+from django.contrib import admin
+from .models import Tarea
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = [
+        'id',
+        'tipo',
+        'estado',
+        'progreso_actual',
+        'progreso_total',
+        'intentos',
+        'creado_en',
+        'finalizado_en',
+    ]
+    list_filter = ['estado', 'tipo', 'creado_en']
+    readonly_fields = [
+        'creado_en',
+        'iniciado_en',
+        'finalizado_en',
+        'actualizado_en',
+        'worker',
+    ]
+    list_per_page = 50
@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _proceso_worker(detener, intervalo, una_vez):
+    """Punto de entrada de cada proceso hijo (compatible con fork y spawn)"""
+    import django
+    django.setup()
+    connections.close_all()
+
+    # El proceso padre coordina el apagado
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from tareas.worker import procesar_cola
+    procesar_cola(detener=detener, intervalo=intervalo, una_vez=una_vez)
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta workers que procesan la cola de tareas en segundo plano'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Cantidad de procesos worker (por defecto: número de CPUs)'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando no hay tareas pendientes'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Procesar las tareas pendientes y terminar'
+        )
+
+    def handle(self, *args, **options):
+        procesos = max(1, options['procesos'])
+        intervalo = options['intervalo']
+        una_vez = options['una_vez']
+
+        if procesos == 1:
+            from tareas.worker import procesar_cola
+            self.stdout.write("Worker iniciado (1 proceso)")
+            try:
+                total = procesar_cola(intervalo=intervalo, una_vez=una_vez)
+            except KeyboardInterrupt:
+                total = None
+            if total is not None:
+                self.stdout.write(self.style.SUCCESS(f"Tareas procesadas: {total}"))
+            return
+
+        # Las conexiones abiertas no deben heredarse a los hijos
+        connections.close_all()
+
+        detener = multiprocessing.Event()
+        hijos = [
+            multiprocessing.Process(
+                target=_proceso_worker,
+                args=(detener, intervalo, una_vez),
+                name=f'worker-{i + 1}'
+            )
+            for i in range(procesos)
+        ]
+
+        def _apagar(signum, frame):
+            self.stdout.write("Deteniendo workers (se terminan las tareas en curso)...")
+            detener.set()
+
+        signal.signal(signal.SIGTERM, _apagar)
+        signal.signal(signal.SIGINT, _apagar)
+
+        for hijo in hijos:
+            hijo.start()
+
+        self.stdout.write(f"Workers iniciados ({procesos} procesos)")
+
+        for hijo in hijos:
+            hijo.join()
+
+        self.stdout.write(self.style.SUCCESS("Workers detenidos"))
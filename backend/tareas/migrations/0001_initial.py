@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(help_text='Nombre del handler registrado', max_length=50, verbose_name='Tipo de Tarea')),
+                ('parametros', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('archivo', models.FileField(blank=True, help_text='Archivo de entrada (importaciones) o de salida (exportaciones)', null=True, upload_to='tareas/%Y/%m/', verbose_name='Archivo')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En Proceso'), ('completada', 'Completada'), ('fallida', 'Fallida')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('progreso_actual', models.PositiveIntegerField(default=0, verbose_name='Progreso Actual')),
+                ('progreso_total', models.PositiveIntegerField(default=0, verbose_name='Progreso Total')),
+                ('resultado', models.JSONField(blank=True, default=dict, verbose_name='Resultado')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('worker', models.CharField(blank=True, help_text='host:pid del proceso que ejecuta la tarea', max_length=100, verbose_name='Worker')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Inicio')),
+                ('finalizado_en', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Fin')),
+                ('actualizado_en', models.DateTimeField(blank=True, help_text='Se actualiza al reportar progreso; permite recuperar tareas de workers caídos', null=True, verbose_name='Último Latido')),
+                ('creado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tareas', to=settings.AUTH_USER_MODEL, verbose_name='Creado Por')),
+            ],
+            options={
+                'verbose_name': 'Tarea',
+                'verbose_name_plural': 'Tareas',
+                'db_table': 'tareas',
+                'ordering': ['-creado_en'],
+                'indexes': [models.Index(fields=['estado', 'creado_en'], name='tareas_estado_e43930_idx'), models.Index(fields=['creado_por', '-creado_en'], name='tareas_creado__f2425f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,214 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from usuarios.models import Usuario
+
+
+class Tarea(models.Model):
+    """
+    Trabajo pesado encolado en BD y ejecutado por `manage.py run_workers`.
+
+    Cada tipo de tarea se registra con @registrar_tarea en el módulo
+    tareas.py de la app correspondiente.
+    """
+
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En Proceso'),
+        ('completada', 'Completada'),
+        ('fallida', 'Fallida'),
+    ]
+
+    # Definición
+    tipo = models.CharField(
+        max_length=50,
+        verbose_name='Tipo de Tarea',
+        help_text='Nombre del handler registrado'
+    )
+    parametros = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Parámetros'
+    )
+    archivo = models.FileField(
+        upload_to='tareas/%Y/%m/',
+        null=True,
+        blank=True,
+        verbose_name='Archivo',
+        help_text='Archivo de entrada (importaciones) o de salida (exportaciones)'
+    )
+
+    # Estado y progreso
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='pendiente',
+        verbose_name='Estado'
+    )
+    progreso_actual = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Progreso Actual'
+    )
+    progreso_total = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Progreso Total'
+    )
+    resultado = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Resultado'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Error'
+    )
+    intentos = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+    worker = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Worker',
+        help_text='host:pid del proceso que ejecuta la tarea'
+    )
+
+    # Auditoría
+    creado_por = models.ForeignKey(
+        Usuario,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tareas',
+        verbose_name='Creado Por'
+    )
+    creado_en = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    iniciado_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Inicio'
+    )
+    finalizado_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Fin'
+    )
+    actualizado_en = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Último Latido',
+        help_text='Se actualiza al reportar progreso; permite recuperar tareas de workers caídos'
+    )
+
+    class Meta:
+        db_table = 'tareas'
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        ordering = ['-creado_en']
+        indexes = [
+            models.Index(fields=['estado', 'creado_en']),
+            models.Index(fields=['creado_por', '-creado_en']),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.get_estado_display()})"
+
+    @property
+    def porcentaje(self):
+        """Porcentaje de avance (0-100)"""
+        if self.estado == 'completada':
+            return 100
+        if not self.progreso_total:
+            return 0
+        return min(100, round(self.progreso_actual / self.progreso_total * 100, 2))
+
+    @classmethod
+    def encolar(cls, tipo, parametros=None, usuario=None, archivo=None):
+        """
+        Crea una tarea pendiente.
+
+        Args:
+            tipo: Nombre del handler registrado
+            parametros: Dict serializable a JSON
+            usuario: Usuario que solicita la tarea
+            archivo: Archivo de entrada opcional (UploadedFile / File)
+        """
+        from .registro import obtener_handler
+        obtener_handler(tipo)  # Falla temprano si el tipo no existe
+
+        tarea = cls(
+            tipo=tipo,
+            parametros=parametros or {},
+            creado_por=usuario if usuario and usuario.is_authenticated else None
+        )
+        if archivo:
+            tarea.archivo.save(archivo.name, archivo, save=False)
+        tarea.save()
+        return tarea
+
+    @classmethod
+    def tomar_siguiente(cls, worker):
+        """
+        Reclama la tarea pendiente más antigua con SELECT ... FOR UPDATE SKIP LOCKED,
+        de modo que varios workers nunca toman la misma tarea.
+
+        También recupera tareas 'en_proceso' cuyo worker dejó de reportar
+        durante más de TAREAS_TIMEOUT_MINUTOS. Una tarea abandonada que ya
+        agotó TAREAS_MAX_INTENTOS queda fallida en vez de reintentarse.
+        """
+        ahora = timezone.now()
+        limite = ahora - timedelta(minutes=settings.TAREAS_TIMEOUT_MINUTOS)
+
+        with transaction.atomic():
+            candidatas = cls.objects.select_for_update(skip_locked=True).filter(
+                Q(estado='pendiente') |
+                Q(estado='en_proceso', actualizado_en__lt=limite)
+            ).order_by('creado_en')
+
+            while True:
+                tarea = candidatas.first()
+                if tarea is None:
+                    return None
+                if tarea.estado == 'pendiente' or tarea.intentos < settings.TAREAS_MAX_INTENTOS:
+                    break
+                # Probablemente tumba al worker que la ejecuta: no se vuelve a tomar
+                tarea.fallar(f'Abandonada sin terminar tras {tarea.intentos} intentos')
+
+            tarea.estado = 'en_proceso'
+            tarea.worker = worker
+            tarea.intentos += 1
+            tarea.iniciado_en = ahora
+            tarea.actualizado_en = ahora
+            tarea.save(update_fields=['estado', 'worker', 'intentos', 'iniciado_en', 'actualizado_en'])
+
+        return tarea
+
+    def reportar_progreso(self, actual, total=None):
+        """Actualiza el progreso sin reescribir la fila completa"""
+        self.progreso_actual = actual
+        self.actualizado_en = timezone.now()
+        campos = {'progreso_actual': actual, 'actualizado_en': self.actualizado_en}
+
+        if total is not None:
+            self.progreso_total = total
+            campos['progreso_total'] = total
+
+        Tarea.objects.filter(pk=self.pk).update(**campos)
+
+    def completar(self, resultado=None):
+        self.estado = 'completada'
+        self.resultado = resultado or {}
+        self.finalizado_en = timezone.now()
+        self.save(update_fields=['estado', 'resultado', 'finalizado_en', 'archivo'])
+
+    def fallar(self, error):
+        self.estado = 'fallida'
+        self.error = error
+        self.finalizado_en = timezone.now()
+        self.save(update_fields=['estado', 'error', 'finalizado_en'])
@@ -0,0 +1,36 @@
+"""
+Registro de handlers de tareas.
+
+Cada app declara sus tareas en <app>/tareas.py:
+
+    from tareas.registro import registrar_tarea
+
+    @registrar_tarea('qr_generar_masivo')
+    def generar_qr_masivo(tarea):
+        ...
+        return {'generados': 10}
+
+El handler recibe la instancia de Tarea (puede llamar a
+tarea.reportar_progreso) y retorna un dict con el resultado.
+"""
+
+_HANDLERS = {}
+
+
+def registrar_tarea(nombre):
+    """Decorador que registra un handler bajo `nombre`"""
+    def decorador(funcion):
+        _HANDLERS[nombre] = funcion
+        return funcion
+    return decorador
+
+
+def obtener_handler(nombre):
+    try:
+        return _HANDLERS[nombre]
+    except KeyError:
+        raise ValueError(f'Tipo de tarea no registrado: {nombre}')
+
+
+def tipos_registrados():
+    return sorted(_HANDLERS)
@@ -0,0 +1,35 @@
+from rest_framework import serializers
+from .models import Tarea
+
+
+class TareaSerializer(serializers.ModelSerializer):
+    estado_nombre = serializers.CharField(source='get_estado_display', read_only=True)
+    porcentaje = serializers.FloatField(read_only=True)
+    archivo_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Tarea
+        fields = [
+            'id',
+            'tipo',
+            'estado',
+            'estado_nombre',
+            'progreso_actual',
+            'progreso_total',
+            'porcentaje',
+            'resultado',
+            'error',
+            'intentos',
+            'archivo_url',
+            'creado_en',
+            'iniciado_en',
+            'finalizado_en',
+        ]
+    
+    def get_archivo_url(self, obj):
+        # Solo se expone el archivo generado por la tarea (exportaciones)
+        if obj.estado != 'completada' or not obj.archivo or not obj.resultado.get('archivo'):
+            return None
+        request = self.context.get('request')
+        url = obj.archivo.url
+        return request.build_absolute_uri(url) if request else url
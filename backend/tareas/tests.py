@@ -0,0 +1,179 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import registro
+from .models import Tarea
+from .worker import Latido, ejecutar_tarea, procesar_cola
+
+
+def _tarea_ok(tarea):
+    tarea.reportar_progreso(2, 2)
+    return {'filas': 2, 'parametro': tarea.parametros.get('x')}
+
+
+def _tarea_falla(tarea):
+    raise RuntimeError('sin archivo')
+
+
+HANDLERS = {'prueba_ok': _tarea_ok, 'prueba_falla': _tarea_falla}
+
+
+@mock.patch.dict(registro._HANDLERS, HANDLERS)
+@override_settings(TAREAS_TIMEOUT_MINUTOS=30, TAREAS_MAX_INTENTOS=3, TAREAS_LATIDO_SEGUNDOS=60)
+class ColaTareasTest(TestCase):
+
+    def abandonar(self, tarea, intentos):
+        """Simula una tarea cuyo worker murió hace una hora"""
+        Tarea.objects.filter(pk=tarea.pk).update(
+            estado='en_proceso',
+            worker='caido:1',
+            intentos=intentos,
+            actualizado_en=timezone.now() - timedelta(hours=1)
+        )
+
+    def test_encolar(self):
+        tarea = Tarea.encolar('prueba_ok', parametros={'x': 1})
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, 'pendiente')
+        self.assertEqual(tarea.parametros, {'x': 1})
+        self.assertEqual(tarea.intentos, 0)
+
+    def test_encolar_tipo_desconocido(self):
+        with self.assertRaises(ValueError):
+            Tarea.encolar('no_existe')
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_tomar_siguiente_en_orden(self):
+        primera = Tarea.encolar('prueba_ok')
+        segunda = Tarea.encolar('prueba_ok')
+
+        tomada = Tarea.tomar_siguiente('w:1')
+        self.assertEqual(tomada.pk, primera.pk)
+        self.assertEqual(tomada.estado, 'en_proceso')
+        self.assertEqual(tomada.worker, 'w:1')
+        self.assertEqual(tomada.intentos, 1)
+
+        self.assertEqual(Tarea.tomar_siguiente('w:2').pk, segunda.pk)
+        self.assertIsNone(Tarea.tomar_siguiente('w:3'))
+
+    def test_no_reclama_tarea_con_latido_reciente(self):
+        Tarea.encolar('prueba_ok')
+        Tarea.tomar_siguiente('w:1')
+
+        self.assertIsNone(Tarea.tomar_siguiente('w:2'))
+
+    def test_reclama_tarea_abandonada(self):
+        tarea = Tarea.encolar('prueba_ok')
+        self.abandonar(tarea, intentos=1)
+
+        tomada = Tarea.tomar_siguiente('w:2')
+        self.assertEqual(tomada.pk, tarea.pk)
+        self.assertEqual(tomada.worker, 'w:2')
+        self.assertEqual(tomada.intentos, 2)
+
+    def test_tarea_abandonada_agota_intentos(self):
+        agotada = Tarea.encolar('prueba_ok')
+        self.abandonar(agotada, intentos=3)
+        pendiente = Tarea.encolar('prueba_ok')
+
+        self.assertEqual(Tarea.tomar_siguiente('w:2').pk, pendiente.pk)
+
+        agotada.refresh_from_db()
+        self.assertEqual(agotada.estado, 'fallida')
+        self.assertEqual(agotada.intentos, 3)
+        self.assertIn('3 intentos', agotada.error)
+        self.assertIsNotNone(agotada.finalizado_en)
+
+    def test_ejecutar_handler(self):
+        Tarea.encolar('prueba_ok', parametros={'x': 7})
+
+        ejecutar_tarea(Tarea.tomar_siguiente('w:1'))
+
+        tarea = Tarea.objects.get()
+        self.assertEqual(tarea.estado, 'completada')
+        self.assertEqual(tarea.resultado, {'filas': 2, 'parametro': 7})
+        self.assertEqual((tarea.progreso_actual, tarea.progreso_total), (2, 2))
+        self.assertEqual(tarea.porcentaje, 100)
+
+    def test_handler_con_error(self):
+        Tarea.encolar('prueba_falla')
+        tarea = Tarea.tomar_siguiente('w:1')
+
+        with self.assertLogs('tareas.worker', level='ERROR'):
+            ejecutar_tarea(tarea)
+
+        tarea.refresh_from_db()
+        self.assertEqual(tarea.estado, 'fallida')
+        self.assertEqual(tarea.error, 'RuntimeError: sin archivo')
+
+
+@mock.patch.dict(registro._HANDLERS, HANDLERS)
+class WorkerTareasTest(TransactionTestCase):
+    """
+    Sin la transacción que envuelve cada TestCase: el worker cierra conexiones
+    y el latido y SKIP LOCKED usan conexiones de otros hilos.
+    """
+
+    def test_procesar_cola(self):
+        Tarea.encolar('prueba_ok')
+        Tarea.encolar('prueba_falla')
+
+        with self.assertLogs('tareas.worker', level='ERROR'):
+            self.assertEqual(procesar_cola(una_vez=True), 2)
+
+        self.assertEqual(
+            sorted(Tarea.objects.values_list('tipo', 'estado')),
+            [('prueba_falla', 'fallida'), ('prueba_ok', 'completada')]
+        )
+
+    def test_skip_locked(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('SKIP LOCKED requiere PostgreSQL')
+
+        bloqueada = Tarea.encolar('prueba_ok')
+        libre = Tarea.encolar('prueba_ok')
+        bloqueo_tomado = threading.Event()
+        liberar = threading.Event()
+
+        def otro_worker():
+            try:
+                with transaction.atomic():
+                    Tarea.objects.select_for_update().get(pk=bloqueada.pk)
+                    bloqueo_tomado.set()
+                    liberar.wait(10)
+            finally:
+                connection.close()
+
+        hilo = threading.Thread(target=otro_worker)
+        hilo.start()
+        try:
+            self.assertTrue(bloqueo_tomado.wait(10))
+            self.assertEqual(Tarea.tomar_siguiente('w:1').pk, libre.pk)
+        finally:
+            liberar.set()
+            hilo.join()
+
+    def test_latido_refresca_tarea_en_curso(self):
+        Tarea.encolar('prueba_ok')
+        tarea = Tarea.tomar_siguiente('w:1')
+        Tarea.objects.filter(pk=tarea.pk).update(actualizado_en=timezone.now() - timedelta(hours=1))
+
+        latido = Latido(tarea, intervalo=0.05)
+        latido.start()
+        try:
+            limite = timezone.now() - timedelta(minutes=1)
+            for _ in range(100):
+                if Tarea.objects.get(pk=tarea.pk).actualizado_en > limite:
+                    break
+                time.sleep(0.05)
+        finally:
+            latido.detener()
+
+        self.assertGreater(Tarea.objects.get(pk=tarea.pk).actualizado_en, limite)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import TareasListView, TareaDetalleView
+
+urlpatterns = [
+    path('', TareasListView.as_view(), name='tareas-list'),
+    path('<int:pk>/', TareaDetalleView.as_view(), name='tarea-detalle'),
+]
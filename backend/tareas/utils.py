@@ -0,0 +1,27 @@
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import Tarea
+from .serializers import TareaSerializer
+
+
+def solicita_asincrono(request, defecto=False):
+    """
+    True si la operación debe ejecutarse como tarea (?asincrono=true).
+    Sin el parámetro se usa `defecto`.
+    """
+    valor = request.query_params.get('asincrono')
+    if valor is None and hasattr(request.data, 'get'):
+        valor = request.data.get('asincrono')
+    if valor is None:
+        return defecto
+    return str(valor).lower() in ['true', '1', 'yes']
+
+
+def encolar_y_responder(request, tipo, parametros=None, archivo=None):
+    """Encola la tarea y responde 202 con su estado inicial"""
+    tarea = Tarea.encolar(tipo, parametros=parametros, usuario=request.user, archivo=archivo)
+    return Response(
+        TareaSerializer(tarea, context={'request': request}).data,
+        status=status.HTTP_202_ACCEPTED
+    )
@@ -0,0 +1,43 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from django.shortcuts import get_object_or_404
+
+from .models import Tarea
+from .serializers import TareaSerializer
+
+
+def _tareas_visibles(user):
+    """RRHH ve todas las tareas; el resto solo las propias"""
+    if user.rol == 'rrhh':
+        return Tarea.objects.all()
+    return Tarea.objects.filter(creado_por=user)
+
+
+class TareasListView(APIView):
+    """Listar las tareas recientes"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        tareas = _tareas_visibles(request.user)
+        
+        estado = request.query_params.get('estado', None)
+        if estado:
+            tareas = tareas.filter(estado=estado)
+        
+        tipo = request.query_params.get('tipo', None)
+        if tipo:
+            tareas = tareas.filter(tipo=tipo)
+        
+        serializer = TareaSerializer(tareas[:50], many=True, context={'request': request})
+        return Response(serializer.data)
+
+
+class TareaDetalleView(APIView):
+    """Estado y progreso de una tarea"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        tarea = get_object_or_404(_tareas_visibles(request.user), pk=pk)
+        serializer = TareaSerializer(tarea, context={'request': request})
+        return Response(serializer.data)
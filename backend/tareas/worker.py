@@ -0,0 +1,112 @@
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection
+from django.utils import timezone
+
+from .models import Tarea
+from .registro import obtener_handler
+
+
+logger = logging.getLogger(__name__)
+
+
+def nombre_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Latido(threading.Thread):
+    """
+    Refresca actualizado_en de la tarea cada TAREAS_LATIDO_SEGUNDOS mientras
+    corre el handler, para que otro worker no la reclame por abandonada.
+
+    Usa su propia conexión: el handler puede tener abierta una transacción
+    larga (p. ej. la importación) y sus escrituras no se verían hasta el commit.
+    """
+
+    def __init__(self, tarea, intervalo=None):
+        super().__init__(name=f'latido-tarea-{tarea.pk}', daemon=True)
+        self.tarea = tarea
+        self.intervalo = settings.TAREAS_LATIDO_SEGUNDOS if intervalo is None else intervalo
+        self._detener = threading.Event()
+
+    def run(self):
+        try:
+            while not self._detener.wait(self.intervalo):
+                try:
+                    Tarea.objects.filter(
+                        pk=self.tarea.pk,
+                        estado='en_proceso',
+                        worker=self.tarea.worker
+                    ).update(actualizado_en=timezone.now())
+                except DatabaseError:
+                    logger.exception('No se pudo registrar el latido de la tarea %s', self.tarea.pk)
+        finally:
+            connection.close()
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+
+
+def ejecutar_tarea(tarea):
+    """Ejecuta el handler de la tarea y registra el resultado o el error"""
+    latido = Latido(tarea)
+    latido.start()
+    try:
+        handler = obtener_handler(tarea.tipo)
+        resultado = handler(tarea)
+        tarea.completar(resultado)
+    except Exception as e:
+        logger.exception('Falló la tarea %s (%s)', tarea.pk, tarea.tipo)
+        tarea.fallar(f"{e.__class__.__name__}: {e}")
+    finally:
+        latido.detener()
+
+
+def _esperar(detener, segundos):
+    if detener:
+        detener.wait(segundos)
+    else:
+        time.sleep(segundos)
+
+
+def procesar_cola(detener=None, intervalo=2.0, una_vez=False):
+    """
+    Bucle principal de un worker.
+
+    Args:
+        detener: threading/multiprocessing Event para terminar ordenadamente
+        intervalo: Segundos de espera cuando la cola está vacía
+        una_vez: Termina cuando no quedan tareas pendientes
+
+    Returns:
+        Cantidad de tareas procesadas
+    """
+    worker = nombre_worker()
+    procesadas = 0
+
+    while not (detener and detener.is_set()):
+        close_old_connections()
+        try:
+            tarea = Tarea.tomar_siguiente(worker)
+        except DatabaseError:
+            # Error transitorio de BD: reintentar en el siguiente ciclo
+            logger.exception('Error reclamando tarea en %s', worker)
+            _esperar(detener, intervalo)
+            continue
+
+        if tarea is None:
+            if una_vez:
+                break
+            _esperar(detener, intervalo)
+            continue
+
+        ejecutar_tarea(tarea)
+        procesadas += 1
+
+    return procesadas
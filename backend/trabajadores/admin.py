@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db import transaction
 from .models import Trabajador
 
 
@@ -14,14 +15,12 @@ class TrabajadorAdmin(admin.ModelAdmin):
         'cargo',
         'sede',
         'tipo_contrato_display',
-        'estado_display',
         'activo',
     ]
     
     list_filter = [
         'sede',
         'tipo_contrato',
-        'estado',
         'activo',
         'fecha_creacion',
     ]
@@ -60,7 +59,6 @@ class TrabajadorAdmin(admin.ModelAdmin):
         }),
         ('Estado', {
             'fields': (
-                'estado',
                 'activo',
             )
         }),
@@ -85,33 +83,28 @@ class TrabajadorAdmin(admin.ModelAdmin):
         return obj.get_tipo_contrato_display()
     tipo_contrato_display.short_description = 'Tipo Contrato'
     
-    def estado_display(self, obj):
-        """Muestra el estado legible"""
-        return obj.get_estado_display()
-    estado_display.short_description = 'Estado'
+    actions = ['activar_trabajadores', 'desactivar_trabajadores']
     
-    actions = ['marcar_como_retirado', 'marcar_como_pendiente', 'activar_trabajadores', 'desactivar_trabajadores']
-    
-    def marcar_como_retirado(self, request, queryset):
-        """Marca trabajadores seleccionados como retirados"""
-        updated = queryset.update(estado='retirado')
-        self.message_user(request, f'{updated} trabajador(es) marcado(s) como retirado(s).')
-    marcar_como_retirado.short_description = 'Marcar como retirado'
-    
-    def marcar_como_pendiente(self, request, queryset):
-        """Marca trabajadores seleccionados como pendientes"""
-        updated = queryset.update(estado='pendiente')
-        self.message_user(request, f'{updated} trabajador(es) marcado(s) como pendiente(s).')
-    marcar_como_pendiente.short_description = 'Marcar como pendiente'
+    def _cambiar_activo(self, queryset, activo):
+        """
+        save() por trabajador en vez de update(): la señal de campañas ajusta
+        elegibles y miembros (activo es criterio de elegibilidad).
+        """
+        with transaction.atomic():
+            trabajadores = list(queryset.exclude(activo=activo))
+            for trabajador in trabajadores:
+                trabajador.activo = activo
+                trabajador.save(update_fields=['activo', 'fecha_actualizacion'])
+        return len(trabajadores)
     
     def activar_trabajadores(self, request, queryset):
         """Activa trabajadores seleccionados"""
-        updated = queryset.update(activo=True)
+        updated = self._cambiar_activo(queryset, True)
         self.message_user(request, f'{updated} trabajador(es) activado(s).')
     activar_trabajadores.short_description = 'Activar trabajadores'
     
     def desactivar_trabajadores(self, request, queryset):
         """Desactiva trabajadores seleccionados"""
-        updated = queryset.update(activo=False)
+        updated = self._cambiar_activo(queryset, False)
         self.message_user(request, f'{updated} trabajador(es) desactivado(s).')
     desactivar_trabajadores.short_description = 'Desactivar trabajadores'
\ No newline at end of file
@@ -0,0 +1,174 @@
+import pandas as pd
+from io import BytesIO
+from django.db import transaction
+
+from .models import Trabajador
+
+
+class ImportacionError(Exception):
+    """Error que invalida el archivo completo (formato, columnas, etc.)"""
+
+
+COLUMNAS_REQUERIDAS = ['rut', 'nombre', 'apellido_paterno', 'cargo', 'tipo_contrato', 'sede']
+
+SEDES_VALIDAS = {
+    'casablanca': 'Casablanca',
+    'valparaiso_bif': 'Valparaíso – Planta BIF',
+    'valparaiso bif': 'Valparaíso – Planta BIF',
+    'valparaiso_bic': 'Valparaíso – Planta BIC',
+    'valparaiso bic': 'Valparaíso – Planta BIC',
+}
+
+
+def leer_archivo(archivo, nombre_archivo):
+    """
+    Lee un archivo Excel o CSV a un DataFrame.
+
+    Raises:
+        ImportacionError si el formato no es soportado o no se puede leer
+    """
+    nombre_archivo = nombre_archivo.lower()
+
+    try:
+        if nombre_archivo.endswith('.xlsx') or nombre_archivo.endswith('.xls'):
+            return pd.read_excel(BytesIO(archivo.read()))
+        elif nombre_archivo.endswith('.csv'):
+            return pd.read_csv(BytesIO(archivo.read()))
+    except Exception as e:
+        raise ImportacionError(f'Error al leer el archivo: {str(e)}')
+
+    raise ImportacionError('Formato de archivo no soportado. Use .xlsx, .xls o .csv')
+
+
+def importar_trabajadores(archivo, nombre_archivo, progreso=None):
+    """
+    Importa trabajadores desde un archivo Excel o CSV.
+
+    Args:
+        archivo: Objeto tipo archivo (UploadedFile, File)
+        nombre_archivo: Nombre original (define el formato por extensión)
+        progreso: callable opcional progreso(filas_procesadas, total_filas)
+
+    Returns:
+        Dict con el resumen de la importación
+
+    Raises:
+        ImportacionError si el archivo no es válido
+    """
+    df = leer_archivo(archivo, nombre_archivo)
+
+    # Normalizar nombres de columnas (quitar espacios, lowercase)
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+
+    # Validar columnas requeridas
+    columnas_faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in df.columns]
+
+    if columnas_faltantes:
+        raise ImportacionError(f'Faltan columnas requeridas: {", ".join(columnas_faltantes)}')
+
+    # Reemplazar NaN por valores por defecto
+    df = df.fillna({
+        'apellido_materno': '',
+        'email': '',
+        'telefono': '',
+        'departamento': '',
+    })
+
+    # RUTs ya registrados (una sola consulta en lugar de una por fila)
+    ruts_existentes = set(
+        Trabajador.objects.filter(
+            rut__in=[str(rut).strip() for rut in df['rut']]
+        ).values_list('rut', flat=True)
+    )
+
+    # Validar y preparar datos
+    trabajadores_validos = []
+    errores = []
+    total_filas = len(df)
+
+    for index, row in df.iterrows():
+        fila_num = index + 2  # +2 porque Excel empieza en 1 y tiene header
+
+        try:
+            # Validar RUT
+            rut = str(row['rut']).strip()
+            if not rut or rut == 'nan':
+                errores.append({'fila': fila_num, 'error': 'RUT vacío'})
+                continue
+
+            # Validar que RUT no exista
+            if rut in ruts_existentes:
+                errores.append({'fila': fila_num, 'rut': rut, 'error': 'RUT ya existe en el sistema'})
+                continue
+
+            # Validar tipo_contrato
+            tipo_contrato = str(row['tipo_contrato']).strip().lower()
+            if tipo_contrato not in ['indefinido', 'plazo_fijo', 'plazo fijo']:
+                errores.append({'fila': fila_num, 'rut': rut, 'error': f'Tipo de contrato inválido: {tipo_contrato}'})
+                continue
+
+            # Normalizar tipo_contrato
+            if tipo_contrato == 'plazo fijo':
+                tipo_contrato = 'plazo_fijo'
+
+            # Validar sede
+            sede = str(row['sede']).strip().lower()
+
+            if sede not in SEDES_VALIDAS:
+                errores.append({'fila': fila_num, 'rut': rut, 'error': f'Sede inválida: {sede}'})
+                continue
+
+            # Normalizar sede
+            sede_normalizada = sede.replace(' ', '_')
+            if sede_normalizada not in ['casablanca', 'valparaiso_bif', 'valparaiso_bic']:
+                if 'bif' in sede:
+                    sede_normalizada = 'valparaiso_bif'
+                elif 'bic' in sede:
+                    sede_normalizada = 'valparaiso_bic'
+                else:
+                    sede_normalizada = 'casablanca'
+
+            # Crear objeto trabajador
+            trabajador_data = {
+                'rut': rut,
+                'nombre': str(row['nombre']).strip(),
+                'apellido_paterno': str(row['apellido_paterno']).strip(),
+                'apellido_materno': str(row.get('apellido_materno', '')).strip(),
+                'email': str(row.get('email', '')).strip() if str(row.get('email', '')).strip() != 'nan' else None,
+                'cargo': str(row['cargo']).strip(),
+                'tipo_contrato': tipo_contrato,
+                'sede': sede_normalizada,
+                'periodo': 'Importado masivamente',
+                'area': 'produccion_manufactura',  # Valor por defecto
+                'activo': True,
+            }
+
+            trabajadores_validos.append(trabajador_data)
+            ruts_existentes.add(rut)
+
+        except Exception as e:
+            errores.append({'fila': fila_num, 'error': str(e)})
+
+    if progreso:
+        progreso(0, len(trabajadores_validos))
+
+    # Insertar trabajadores válidos
+    trabajadores_creados = 0
+
+    if trabajadores_validos:
+        with transaction.atomic():
+            for data in trabajadores_validos:
+                Trabajador.objects.create(**data)
+                trabajadores_creados += 1
+
+    if progreso:
+        progreso(trabajadores_creados)
+
+    return {
+        'message': 'Importación completada',
+        'total_filas': total_filas,
+        'importados': trabajadores_creados,
+        'errores': len(errores),
+        'detalle_errores': errores[:10] if len(errores) > 10 else errores,  # Máximo 10 errores
+        'mas_errores': len(errores) > 10
+    }
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0003_trabajador_qr_codigo_trabajador_qr_fecha_generacion_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='trabajador',
+            name='estado',
+        ),
+    ]
@@ -11,11 +11,6 @@ class Trabajador(models.Model):
         ('plazo_fijo', 'A Plazo Fijo'),
     ]
     
-    ESTADO_CHOICES = [
-        ('pendiente', 'Pendiente'),  # No ha retirado caja
-        ('retirado', 'Retirado'),    # Ya retiró caja
-    ]
-    
     AREA_CHOICES = [
         ('produccion_manufactura', 'Producción y Manufactura'),
         ('logistica_distribucion', 'Logística y Distribución'),
@@ -80,13 +75,7 @@ class Trabajador(models.Model):
         help_text='Ej: Casa Matriz, Sucursal Norte'
     )
     
-    # Estado de Entrega
-    estado = models.CharField(
-        max_length=20,
-        choices=ESTADO_CHOICES,
-        default='pendiente',
-        verbose_name='Estado'
-    )
+    # El estado de retiro es por campaña (campanas.MiembroCampana), no global
     
     # ✅ NUEVOS CAMPOS: QR
     qr_generado = models.BooleanField(
@@ -141,16 +130,6 @@ class Trabajador(models.Model):
         """Retorna ambos apellidos"""
         return f"{self.apellido_paterno} {self.apellido_materno}"
     
-    def marcar_como_retirado(self):
-        """Marca al trabajador como que ya retiró su caja"""
-        self.estado = 'retirado'
-        self.save()
-    
-    def marcar_como_pendiente(self):
-        """Marca al trabajador como pendiente de retiro"""
-        self.estado = 'pendiente'
-        self.save()
-    
     def generar_qr(self):
         """Marca al trabajador como que tiene QR generado"""
         from django.utils import timezone
@@ -0,0 +1,33 @@
+from tareas.registro import registrar_tarea
+
+from .importacion import importar_trabajadores
+from .models import Trabajador
+
+
+@registrar_tarea('trabajadores_importar')
+def tarea_importar_trabajadores(tarea):
+    """Importa trabajadores desde el archivo adjunto a la tarea"""
+    nombre_archivo = tarea.parametros.get('nombre_archivo') or tarea.archivo.name
+
+    # Un ImportacionError deja la tarea como fallida con el mensaje
+    with tarea.archivo.open('rb') as archivo:
+        return importar_trabajadores(archivo, nombre_archivo, progreso=tarea.reportar_progreso)
+
+
+@registrar_tarea('trabajadores_enviar_qr_masivo')
+def tarea_enviar_qr_masivo(tarea):
+    """Envía por email el QR de los trabajadores activos con email y QR generado"""
+    from qr_system.envio import DespachadorQR
+    from qr_system.utils import asegurar_registros_qr
+
+    trabajadores = Trabajador.objects.filter(
+        activo=True,
+        qr_generado=True,
+        email__isnull=False
+    ).exclude(email='')
+
+    registros = asegurar_registros_qr(trabajadores).exclude(estado='ENVIADO')
+    tarea.reportar_progreso(0, registros.count())
+    resultado = DespachadorQR().enviar(registros, progreso=tarea.reportar_progreso)
+
+    return {'total': trabajadores.count(), **resultado.as_dict()}
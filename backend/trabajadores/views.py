@@ -1,15 +1,15 @@
-import pandas as pd
-from io import BytesIO
-from django.db import transaction
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.utils import timezone
 
 from .models import Trabajador
 from .serializers import TrabajadorSerializer
+from .importacion import importar_trabajadores, ImportacionError
+from tareas.utils import solicita_asincrono, encolar_y_responder
 
 
 class TrabajadorViewSet(viewsets.ModelViewSet):
@@ -109,6 +109,8 @@ class TrabajadorViewSet(viewsets.ModelViewSet):
         Envía códigos QR por email a todos los trabajadores
         
         POST /api/trabajadores/enviar_qr_masivo/
+        
+        Responde 202 con la tarea encolada; ?asincrono=false envía en la petición.
         """
         try:
             # Obtener trabajadores activos con QR generado y email
@@ -126,14 +128,23 @@ class TrabajadorViewSet(viewsets.ModelViewSet):
                     'total': 0
                 })
             
-            # TODO: Implementar envío de emails real
-            enviados = total  # Simulado por ahora
+            # En la cola por defecto (ver qr_system.views.EnviarQRMasivoView)
+            if solicita_asincrono(request, defecto=True):
+                return encolar_y_responder(request, 'trabajadores_enviar_qr_masivo')
+            
+            from qr_system.envio import DespachadorQR
+            from qr_system.utils import asegurar_registros_qr
+            
+            registros = asegurar_registros_qr(trabajadores).exclude(estado='ENVIADO')
+            resultado = DespachadorQR().enviar(registros)
+            enviados = resultado.enviados
             
             return Response({
                 'message': f'QRs enviados correctamente: {enviados} de {total}',
                 'total': total,
                 'enviados': enviados,
-                'fallidos': total - enviados
+                'fallidos': resultado.fallidos,
+                'errores': resultado.errores[:10]
             })
             
         except Exception as e:
@@ -161,155 +172,30 @@ class TrabajadorViewSet(viewsets.ModelViewSet):
         - tipo_contrato (indefinido o plazo_fijo)
         - sede (casablanca, valparaiso_bif, valparaiso_bic)
         """
+        # Obtener archivo
+        archivo = request.FILES.get('archivo')
+        
+        if not archivo:
+            return Response(
+                {'error': 'No se proporcionó ningún archivo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if solicita_asincrono(request):
+            return encolar_y_responder(
+                request,
+                'trabajadores_importar',
+                parametros={'nombre_archivo': archivo.name},
+                archivo=archivo
+            )
+        
         try:
-            # Obtener archivo
-            archivo = request.FILES.get('archivo')
-            
-            if not archivo:
-                return Response(
-                    {'error': 'No se proporcionó ningún archivo'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Leer archivo según extensión
-            nombre_archivo = archivo.name.lower()
-            
-            try:
-                if nombre_archivo.endswith('.xlsx') or nombre_archivo.endswith('.xls'):
-                    df = pd.read_excel(BytesIO(archivo.read()))
-                elif nombre_archivo.endswith('.csv'):
-                    df = pd.read_csv(BytesIO(archivo.read()))
-                else:
-                    return Response(
-                        {'error': 'Formato de archivo no soportado. Use .xlsx, .xls o .csv'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            except Exception as e:
-                return Response(
-                    {'error': f'Error al leer el archivo: {str(e)}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Normalizar nombres de columnas (quitar espacios, lowercase)
-            df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
-            
-            # Validar columnas requeridas
-            columnas_requeridas = ['rut', 'nombre', 'apellido_paterno', 'cargo', 'tipo_contrato', 'sede']
-            columnas_faltantes = [col for col in columnas_requeridas if col not in df.columns]
-            
-            if columnas_faltantes:
-                return Response(
-                    {'error': f'Faltan columnas requeridas: {", ".join(columnas_faltantes)}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Reemplazar NaN por valores por defecto
-            df = df.fillna({
-                'apellido_materno': '',
-                'email': '',
-                'telefono': '',
-                'departamento': '',
-            })
-            
-            # Validar y preparar datos
-            trabajadores_validos = []
-            errores = []
-            
-            for index, row in df.iterrows():
-                fila_num = index + 2  # +2 porque Excel empieza en 1 y tiene header
-                
-                try:
-                    # Validar RUT
-                    rut = str(row['rut']).strip()
-                    if not rut or rut == 'nan':
-                        errores.append({'fila': fila_num, 'error': 'RUT vacío'})
-                        continue
-                    
-                    # Validar que RUT no exista
-                    if Trabajador.objects.filter(rut=rut).exists():
-                        errores.append({'fila': fila_num, 'rut': rut, 'error': 'RUT ya existe en el sistema'})
-                        continue
-                    
-                    # Validar tipo_contrato
-                    tipo_contrato = str(row['tipo_contrato']).strip().lower()
-                    if tipo_contrato not in ['indefinido', 'plazo_fijo', 'plazo fijo']:
-                        errores.append({'fila': fila_num, 'rut': rut, 'error': f'Tipo de contrato inválido: {tipo_contrato}'})
-                        continue
-                    
-                    # Normalizar tipo_contrato
-                    if tipo_contrato == 'plazo fijo':
-                        tipo_contrato = 'plazo_fijo'
-                    
-                    # Validar sede
-                    sede = str(row['sede']).strip().lower()
-                    sedes_validas = {
-                        'casablanca': 'Casablanca',
-                        'valparaiso_bif': 'Valparaíso – Planta BIF',
-                        'valparaiso bif': 'Valparaíso – Planta BIF',
-                        'valparaiso_bic': 'Valparaíso – Planta BIC',
-                        'valparaiso bic': 'Valparaíso – Planta BIC',
-                    }
-                    
-                    if sede not in sedes_validas:
-                        errores.append({'fila': fila_num, 'rut': rut, 'error': f'Sede inválida: {sede}'})
-                        continue
-                    
-                    # Normalizar sede
-                    sede_normalizada = sede.replace(' ', '_')
-                    if sede_normalizada not in ['casablanca', 'valparaiso_bif', 'valparaiso_bic']:
-                        if 'bif' in sede:
-                            sede_normalizada = 'valparaiso_bif'
-                        elif 'bic' in sede:
-                            sede_normalizada = 'valparaiso_bic'
-                        else:
-                            sede_normalizada = 'casablanca'
-                    
-                    # Crear objeto trabajador
-                    trabajador_data = {
-                        'rut': rut,
-                        'nombre': str(row['nombre']).strip(),
-                        'apellido_paterno': str(row['apellido_paterno']).strip(),
-                        'apellido_materno': str(row.get('apellido_materno', '')).strip(),
-                        'email': str(row.get('email', '')).strip() if str(row.get('email', '')).strip() != 'nan' else None,
-                        'telefono': str(row.get('telefono', '')).strip() if str(row.get('telefono', '')).strip() != 'nan' else None,
-                        'cargo': str(row['cargo']).strip(),
-                        'departamento': str(row.get('departamento', '')).strip(),
-                        'tipo_contrato': tipo_contrato,
-                        'sede': sede_normalizada,
-                        'periodo': 'Importado masivamente',
-                        'area': 'produccion_manufactura',  # Valor por defecto
-                        'activo': True,
-                    }
-                    
-                    trabajadores_validos.append(trabajador_data)
-                    
-                except Exception as e:
-                    errores.append({'fila': fila_num, 'error': str(e)})
-            
-            # Insertar trabajadores válidos
-            trabajadores_creados = 0
-            
-            if trabajadores_validos:
-                try:
-                    with transaction.atomic():
-                        for data in trabajadores_validos:
-                            Trabajador.objects.create(**data)
-                            trabajadores_creados += 1
-                except Exception as e:
-                    return Response(
-                        {'error': f'Error al guardar trabajadores: {str(e)}'},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
-            
-            return Response({
-                'message': f'Importación completada',
-                'total_filas': len(df),
-                'importados': trabajadores_creados,
-                'errores': len(errores),
-                'detalle_errores': errores[:10] if len(errores) > 10 else errores,  # Máximo 10 errores
-                'mas_errores': len(errores) > 10
-            })
-            
+            return Response(importar_trabajadores(archivo, archivo.name))
+        except ImportacionError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
             return Response(
                 {'error': f'Error inesperado: {str(e)}'},
@@ -331,9 +217,18 @@ class TrabajadorViewSet(viewsets.ModelViewSet):
         indefinidos = Trabajador.objects.filter(tipo_contrato='indefinido').count()
         plazo_fijo = Trabajador.objects.filter(tipo_contrato='plazo_fijo').count()
         
-        # Por estado de retiro
-        pendientes = Trabajador.objects.filter(estado='pendiente').count()
-        retirados = Trabajador.objects.filter(estado='retirado').count()
+        # Por estado de retiro en las campañas vigentes (una consulta agrupada)
+        from campanas.models import MiembroCampana
+        hoy = timezone.now().date()
+        por_estado = dict(
+            MiembroCampana.objects.filter(
+                campana__activa=True,
+                campana__fecha_inicio__lte=hoy,
+                campana__fecha_fin__gte=hoy
+            ).order_by().values_list('estado').annotate(total=Count('id'))
+        )
+        pendientes = por_estado.get(MiembroCampana.PENDIENTE, 0)
+        retirados = por_estado.get(MiembroCampana.ENTREGADO, 0)
         
         # QR generados
         qr_generados = Trabajador.objects.filter(qr_generado=True).count()
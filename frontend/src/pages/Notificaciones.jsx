@@ -45,22 +45,29 @@ const Notificaciones = () => {
   const [filtroTipo, setFiltroTipo] = useState('todas');
   const [estadisticas, setEstadisticas] = useState(null);
   const [confirmDialog, setConfirmDialog] = useState({ open: false, action: null });
+  // Cursor de la página siguiente (más antiguas); null si no hay más
+  const [siguiente, setSiguiente] = useState(null);
+  const [cargandoMas, setCargandoMas] = useState(false);
 
   useEffect(() => {
     cargarNotificaciones();
     cargarEstadisticas();
   }, [filtroTipo]);
 
+  const paramsFiltro = () => {
+    const params = {};
+    if (filtroTipo !== 'todas') {
+      params.tipo = filtroTipo;
+    }
+    return params;
+  };
+
   const cargarNotificaciones = async () => {
     try {
       setLoading(true);
-      const params = {};
-      if (filtroTipo !== 'todas') {
-        params.tipo = filtroTipo;
-      }
-      
-      const response = await api.get('/notificaciones/', { params });
-      setNotificaciones(response.data);
+      const response = await api.get('/notificaciones/', { params: paramsFiltro() });
+      setNotificaciones(response.data.results);
+      setSiguiente(response.data.siguiente);
     } catch (error) {
       console.error('Error cargando notificaciones:', error);
       toast.error('Error cargando notificaciones');
@@ -69,6 +76,22 @@ const Notificaciones = () => {
     }
   };
 
+  const cargarMas = async () => {
+    try {
+      setCargandoMas(true);
+      const response = await api.get('/notificaciones/', {
+        params: { ...paramsFiltro(), cursor: siguiente }
+      });
+      setNotificaciones((anteriores) => [...anteriores, ...response.data.results]);
+      setSiguiente(response.data.siguiente);
+    } catch (error) {
+      console.error('Error cargando más notificaciones:', error);
+      toast.error('Error cargando notificaciones');
+    } finally {
+      setCargandoMas(false);
+    }
+  };
+
   const cargarEstadisticas = async () => {
     try {
       const response = await api.get('/notificaciones/estadisticas/');
@@ -432,6 +455,18 @@ const Notificaciones = () => {
               </React.Fragment>
             ))}
           </List>
+          {siguiente && (
+            <Box sx={{ p: 2, textAlign: 'center', borderTop: '1px solid rgba(255,255,255,0.1)' }}>
+              <Button
+                variant="outlined"
+                onClick={cargarMas}
+                disabled={cargandoMas}
+                sx={{ color: 'white', borderColor: 'rgba(255,255,255,0.3)' }}
+              >
+                {cargandoMas ? 'Cargando...' : 'Cargar más'}
+              </Button>
+            </Box>
+          )}
         </Paper>
       )}
 
@@ -107,8 +107,9 @@ export default function QRManager() {
   const enviarMasivo = async () => {
     try {
       // ✅ URL CORRECTA
-      await api.post("/trabajadores/enviar_qr_masivo/");
-      toast.success("QR enviados masivamente por email");
+      // Se envía en segundo plano: la respuesta es la tarea encolada (202)
+      const { data } = await api.post("/trabajadores/enviar_qr_masivo/");
+      toast.success(data.id ? `Envío masivo de QR en curso (tarea #${data.id})` : (data.message || "QR enviados masivamente por email"));
       cargarTrabajadores();
     } catch (err) {
       console.error("Error enviando QR masivo", err);
@@ -46,8 +46,8 @@ export default function RRHHDashboard() {
       });
 
       // Cargar últimas notificaciones
-      const notificacionesRes = await api.get('/notificaciones/');
-      setNotificaciones(notificacionesRes.data.slice(0, 5));
+      const notificacionesRes = await api.get('/notificaciones/', { params: { limit: 5 } });
+      setNotificaciones(notificacionesRes.data.results);
 
     } catch (error) {
       console.error('Error cargando datos:', error);
@@ -27,6 +27,7 @@ import {
   DialogContent,
   DialogActions,
   Alert,
+  TablePagination,
 } from '@mui/material';
 import {
   Assignment as AssignmentIcon,
@@ -124,6 +125,10 @@ const SupervisorDashboard = () => {
   const [incidencias, setIncidencias] = useState([]);
   const [filtroEstado, setFiltroEstado] = useState('');
   const [busquedaTexto, setBusquedaTexto] = useState('');
+  // Paginación del backend (pagina empieza en 1)
+  const [pagina, setPagina] = useState(1);
+  const [porPagina, setPorPagina] = useState(50);
+  const [total, setTotal] = useState(0);
   
   // Modal states
   const [modalOpen, setModalOpen] = useState(false);
@@ -139,7 +144,12 @@ const SupervisorDashboard = () => {
     if (supervisor) {
       cargarIncidencias();
     }
-  }, [filtroEstado, supervisor]);
+  }, [filtroEstado, supervisor, pagina, porPagina]);
+
+  const cambiarFiltroEstado = (estado) => {
+    setFiltroEstado(estado);
+    setPagina(1);
+  };
 
   const cargarDatos = async () => {
     try {
@@ -147,12 +157,13 @@ const SupervisorDashboard = () => {
       const [supervisorRes, statsRes, incidenciasRes] = await Promise.all([
         api.get('/supervisor/info/'),
         api.get('/supervisor/estadisticas/'),
-        api.get('/supervisor/incidencias/')
+        api.get('/supervisor/incidencias/', { params: { pagina: 1, por_pagina: porPagina } })
       ]);
 
       setSupervisor(supervisorRes.data);
       setStats(statsRes.data);
       setIncidencias(incidenciasRes.data.data || []);
+      setTotal(incidenciasRes.data.total || 0);
     } catch (error) {
       console.error('Error cargando datos:', error);
       toast.error('Error cargando estadísticas');
@@ -163,12 +174,13 @@ const SupervisorDashboard = () => {
 
   const cargarIncidencias = async () => {
     try {
-      const params = {};
+      const params = { pagina, por_pagina: porPagina };
       if (filtroEstado) params.estado = filtroEstado;
       if (busquedaTexto) params.busqueda = busquedaTexto;
 
       const response = await api.get('/supervisor/incidencias/', { params });
       setIncidencias(response.data.data || []);
+      setTotal(response.data.total || 0);
     } catch (error) {
       console.error('Error cargando incidencias:', error);
       toast.error('Error cargando incidencias');
@@ -176,12 +188,17 @@ const SupervisorDashboard = () => {
   };
 
   const aplicarFiltros = () => {
-    cargarIncidencias();
+    // Volver a la primera página recarga por el efecto
+    if (pagina !== 1) {
+      setPagina(1);
+    } else {
+      cargarIncidencias();
+    }
     toast.success('Filtros aplicados');
   };
 
   const limpiarFiltros = () => {
-    setFiltroEstado('');
+    cambiarFiltroEstado('');
     setBusquedaTexto('');
     setSearchParams({});
     cargarIncidencias();
@@ -244,7 +261,8 @@ const SupervisorDashboard = () => {
   const getEstadoColor = (estado) => {
     switch(estado) {
       case 'pendiente': return 'warning';
-      case 'aprobado': return 'success';
+      case 'aprobado':
+      case 'resuelto': return 'success';
       case 'rechazado': return 'error';
       default: return 'default';
     }
@@ -253,7 +271,8 @@ const SupervisorDashboard = () => {
   const getEstadoTexto = (estado) => {
     switch(estado) {
       case 'pendiente': return 'Pendiente';
-      case 'aprobado': return 'Aprobado';
+      case 'aprobado':
+      case 'resuelto': return 'Aprobado';
       case 'rechazado': return 'Rechazado';
       default: return estado;
     }
@@ -276,19 +295,6 @@ const SupervisorDashboard = () => {
     );
   }
 
-  // Filtrar incidencias por búsqueda de texto
-  const incidenciasFiltradas = incidencias.filter(inc => {
-    if (!busquedaTexto) return true;
-    
-    const texto = busquedaTexto.toLowerCase();
-    return (
-      inc.descripcion?.toLowerCase().includes(texto) ||
-      inc.tipo_nombre?.toLowerCase().includes(texto) ||
-      inc.trabajador?.rut?.includes(texto) ||
-      inc.trabajador?.nombre_completo?.toLowerCase().includes(texto) ||
-      inc.solucion?.toLowerCase().includes(texto)
-    );
-  });
 
   return (
     <Box>
@@ -311,7 +317,7 @@ const SupervisorDashboard = () => {
             color="#3b82f6"
             subtitle="Casos asignados"
             onClick={() => {
-              setFiltroEstado('');
+              cambiarFiltroEstado('');
               cargarIncidencias();
             }}
           />
@@ -325,7 +331,7 @@ const SupervisorDashboard = () => {
             color="#f59e0b"
             subtitle="Requieren atención"
             onClick={() => {
-              setFiltroEstado('pendiente');
+              cambiarFiltroEstado('pendiente');
               setTimeout(() => cargarIncidencias(), 100);
             }}
           />
@@ -339,7 +345,7 @@ const SupervisorDashboard = () => {
             color="#10b981"
             subtitle="Casos aprobados"
             onClick={() => {
-              setFiltroEstado('aprobado');
+              cambiarFiltroEstado('aprobado');
               setTimeout(() => cargarIncidencias(), 100);
             }}
           />
@@ -353,7 +359,7 @@ const SupervisorDashboard = () => {
             color="#8b5cf6"
             subtitle="Casos rechazados"
             onClick={() => {
-              setFiltroEstado('rechazado');
+              cambiarFiltroEstado('rechazado');
               setTimeout(() => cargarIncidencias(), 100);
             }}
           />
@@ -375,7 +381,7 @@ const SupervisorDashboard = () => {
             <FormControl fullWidth>
               <Select
                 value={filtroEstado}
-                onChange={(e) => setFiltroEstado(e.target.value)}
+                onChange={(e) => cambiarFiltroEstado(e.target.value)}
                 displayEmpty
                 sx={{
                   color: 'white',
@@ -497,7 +503,7 @@ const SupervisorDashboard = () => {
         }}>
           <Box>
             <Typography variant="body2" sx={{ color: 'rgba(255,255,255,0.9)', fontWeight: '500' }}>
-              Mostrando <strong style={{ color: '#4caf50' }}>{incidenciasFiltradas.length}</strong> de <strong>{incidencias.length}</strong> incidencias
+              Mostrando <strong style={{ color: '#4caf50' }}>{incidencias.length}</strong> de <strong>{total}</strong> incidencias
             </Typography>
             {filtroEstado && (
               <Typography variant="caption" sx={{ color: 'rgba(255,255,255,0.5)' }}>
@@ -533,7 +539,7 @@ const SupervisorDashboard = () => {
         Gestiona el estado de cada caso asignado a tu área
       </Typography>
 
-      {incidenciasFiltradas.length === 0 ? (
+      {incidencias.length === 0 ? (
         <Alert severity="info">No hay incidencias para mostrar con los filtros aplicados</Alert>
       ) : (
         <TableContainer component={Paper} sx={{ bgcolor: '#102010' }}>
@@ -550,7 +556,7 @@ const SupervisorDashboard = () => {
               </TableRow>
             </TableHead>
             <TableBody>
-              {incidenciasFiltradas.map((inc) => (
+              {incidencias.map((inc) => (
                 <TableRow key={inc.id} sx={{ '&:hover': { bgcolor: 'rgba(255,255,255,0.05)' } }}>
                   <TableCell sx={{ color: 'white' }}>{inc.id}</TableCell>
                   <TableCell>
@@ -609,6 +615,18 @@ const SupervisorDashboard = () => {
               ))}
             </TableBody>
           </Table>
+          <TablePagination
+            component="div"
+            count={total}
+            page={pagina - 1}
+            onPageChange={(e, nuevaPagina) => setPagina(nuevaPagina + 1)}
+            rowsPerPage={porPagina}
+            onRowsPerPageChange={(e) => { setPorPagina(parseInt(e.target.value, 10)); setPagina(1); }}
+            rowsPerPageOptions={[25, 50, 100]}
+            labelRowsPerPage="Por página:"
+            labelDisplayedRows={({ from, to, count }) => `${from}-${to} de ${count}`}
+            sx={{ color: 'white', '& .MuiSvgIcon-root': { color: 'white' } }}
+          />
         </TableContainer>
       )}
 
@@ -25,6 +25,7 @@ import {
   Grid,
   CircularProgress,
   Alert,
+  TablePagination,
 } from '@mui/material';
 import {
   CheckCircle as ApproveIcon,
@@ -74,6 +75,10 @@ const SupervisorIncidencias = () => {
   const [loading, setLoading] = useState(true);
   const [filtroEstado, setFiltroEstado] = useState(searchParams.get('estado') || '');
   const [busquedaTexto, setBusquedaTexto] = useState('');
+  // Paginación del backend (pagina empieza en 1)
+  const [pagina, setPagina] = useState(1);
+  const [porPagina, setPorPagina] = useState(50);
+  const [total, setTotal] = useState(0);
   const [modalOpen, setModalOpen] = useState(false);
   const [incidenciaSeleccionada, setIncidenciaSeleccionada] = useState(null);
   const [accionPendiente, setAccionPendiente] = useState(null);
@@ -81,17 +86,18 @@ const SupervisorIncidencias = () => {
 
   useEffect(() => {
     cargarIncidencias();
-  }, [filtroEstado, busquedaTexto]);
+  }, [filtroEstado, busquedaTexto, pagina, porPagina]);
 
   const cargarIncidencias = async () => {
     try {
       setLoading(true);
-      const params = {};
+      const params = { pagina, por_pagina: porPagina };
       if (filtroEstado) params.estado = filtroEstado;
       if (busquedaTexto) params.busqueda = busquedaTexto;
 
       const response = await api.get('/supervisor/incidencias/', { params });
       setIncidencias(response.data.data || []);
+      setTotal(response.data.total || 0);
     } catch (error) {
       console.error('Error cargando incidencias:', error);
       toast.error('Error cargando incidencias');
@@ -158,7 +164,8 @@ const SupervisorIncidencias = () => {
   const getEstadoColor = (estado) => {
     switch(estado) {
       case 'pendiente': return 'warning';
-      case 'aprobado': return 'success';
+      case 'aprobado':
+      case 'resuelto': return 'success';
       case 'rechazado': return 'error';
       default: return 'default';
     }
@@ -167,7 +174,8 @@ const SupervisorIncidencias = () => {
   const getEstadoTexto = (estado) => {
     switch(estado) {
       case 'pendiente': return 'Pendiente';
-      case 'aprobado': return 'Aprobado';
+      case 'aprobado':
+      case 'resuelto': return 'Aprobado';
       case 'rechazado': return 'Rechazado';
       default: return estado;
     }
@@ -185,6 +193,7 @@ const SupervisorIncidencias = () => {
   const limpiarFiltros = () => {
     setFiltroEstado('');
     setBusquedaTexto('');
+    setPagina(1);
     setSearchParams({});
   };
 
@@ -217,7 +226,7 @@ const SupervisorIncidencias = () => {
             <FormControl fullWidth>
               <Select
                 value={filtroEstado}
-                onChange={(e) => setFiltroEstado(e.target.value)}
+                onChange={(e) => { setFiltroEstado(e.target.value); setPagina(1); }}
                 displayEmpty
                 sx={{
                   color: 'white',
@@ -264,7 +273,7 @@ const SupervisorIncidencias = () => {
               fullWidth
               placeholder="Ingrese RUT, nombre del trabajador o descripción..."
               value={busquedaTexto}
-              onChange={(e) => setBusquedaTexto(e.target.value)}
+              onChange={(e) => { setBusquedaTexto(e.target.value); setPagina(1); }}
               sx={{
                 '& .MuiInputBase-root': {
                   color: 'white',
@@ -339,7 +348,7 @@ const SupervisorIncidencias = () => {
         }}>
           <Box>
             <Typography variant="body2" sx={{ color: 'rgba(255,255,255,0.9)', fontWeight: '500' }}>
-              Mostrando <strong style={{ color: '#4caf50' }}>{incidencias.length}</strong> de <strong>{incidencias.length}</strong> incidencias
+              Mostrando <strong style={{ color: '#4caf50' }}>{incidencias.length}</strong> de <strong>{total}</strong> incidencias
             </Typography>
             {filtroEstado && (
               <Typography variant="caption" sx={{ color: 'rgba(255,255,255,0.5)' }}>
@@ -461,6 +470,18 @@ const SupervisorIncidencias = () => {
               ))}
             </TableBody>
           </Table>
+          <TablePagination
+            component="div"
+            count={total}
+            page={pagina - 1}
+            onPageChange={(e, nuevaPagina) => setPagina(nuevaPagina + 1)}
+            rowsPerPage={porPagina}
+            onRowsPerPageChange={(e) => { setPorPagina(parseInt(e.target.value, 10)); setPagina(1); }}
+            rowsPerPageOptions={[25, 50, 100]}
+            labelRowsPerPage="Por página:"
+            labelDisplayedRows={({ from, to, count }) => `${from}-${to} de ${count}`}
+            sx={{ color: 'white', '& .MuiSvgIcon-root': { color: 'white' } }}
+          />
         </TableContainer>
       )}
 